@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Persistent Classification Memo
+SQLite store of derived requirement fields keyed by a hash of the normalised
+description and the rule-set version, with size-bounded LRU eviction
+"""
+
+import json
+import sqlite3
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200000
+
+def normalise_description(description):
+    """Whitespace-insensitive form of a description used for keys and classification"""
+    return ' '.join((description or '').split())
+
+class ClassificationMemo:
+    """Maps (normalised description, rule-set version) to the derived requirement fields"""
+
+    def __init__(self, path, rule_version, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.rule_version = rule_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._touched = {}
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS memo ("
+            "key TEXT PRIMARY KEY, fields TEXT NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS memo_last_used ON memo (last_used)")
+        self.connection.commit()
+
+        # Logical clock for recency; avoids wall-clock ties inside one run
+        self._clock = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM memo").fetchone()[0]
+
+    def key(self, description):
+        """Hash of the normalised description under the current rule-set version"""
+        payload = f"{self.rule_version}\0{normalise_description(description)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, descriptions):
+        """Return {description: fields} for the descriptions already memoised"""
+        keys = {}
+        for description in descriptions:
+            keys.setdefault(self.key(description), []).append(description)
+
+        found = {}
+        found_keys = set()
+        key_list = list(keys)
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, fields FROM memo WHERE key IN ({placeholders})", chunk
+            )
+            for key, fields in rows:
+                values = json.loads(fields)
+                for description in keys[key]:
+                    found[description] = values
+                found_keys.add(key)
+                self._touched[key] = self._tick()
+
+        self.hits += len(found)
+        self.misses += sum(len(items) for key, items in keys.items() if key not in found_keys)
+        return found
+
+    def put_many(self, derived):
+        """Store {description: fields} for newly classified descriptions"""
+        rows = []
+        for description, fields in derived.items():
+            key = self.key(description)
+            clock = self._tick()
+            self._touched.pop(key, None)
+            rows.append((key, json.dumps(fields, ensure_ascii=False), clock))
+        self.connection.executemany("INSERT OR REPLACE INTO memo VALUES (?, ?, ?)", rows)
+        self.connection.commit()
+
+    def flush(self):
+        """Persist recency of memo hits and evict least recently used entries"""
+        if self._touched:
+            self.connection.executemany(
+                "UPDATE memo SET last_used = ? WHERE key = ?",
+                [(clock, key) for key, clock in self._touched.items()]
+            )
+            self._touched = {}
+
+        size = self.size()
+        if self.max_entries and size > self.max_entries:
+            excess = size - self.max_entries
+            self.connection.execute(
+                "DELETE FROM memo WHERE key IN (SELECT key FROM memo ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+        self.connection.commit()
+
+    def size(self):
+        return self.connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+
+    def stats(self):
+        """Hit/miss statistics for this session"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': self.size(),
+            'max_entries': self.max_entries
+        }
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the RTM classification memo")
+    parser.add_argument('path', help="Memo database file")
+    parser.add_argument('--clear', action='store_true', help="Remove all memoised classifications")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.path)
+    try:
+        if args.clear:
+            connection.execute("DELETE FROM memo")
+            connection.commit()
+            connection.execute("VACUUM")
+            print(f"🧹 Cleared {args.path}")
+        count = connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+        print(f"📦 Memoised classifications: {count}")
+    except sqlite3.OperationalError as e:
+        print(f"❌ Not a classification memo: {e}")
+        return False
+    finally:
+        connection.close()
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Keyword rule tables for RTM requirement classification
+Built from config/classification_rules.yml and shared by the scalar
+classifiers and the batch classifier; the first matching rule of a table
+wins, the default applies when none matches
+"""
+
+from rule_engine import WordKeyword, load_rule_config
+
+_TABLES = {table['name']: table for table in load_rule_config()}
+
+def _rules(name):
+    return [(rule['value'], tuple(rule['keywords'])) for rule in _TABLES[name]['rules']]
+
+SBS_L0_RULES = _rules('sbs_l0')
+SBS_L0_DEFAULT = _TABLES['sbs_l0']['default']
+
+SBS_L1_RULES = _rules('sbs_l1')
+SBS_L1_DEFAULT = _TABLES['sbs_l1']['default']
+
+SBS_L2_RULES = _rules('sbs_l2')
+# L2 falls back by L1 component (WCS only for QPLANT requirements)
+SBS_L2_DEFAULT_BY_L1 = dict((_TABLES['sbs_l2']['default_by'] or {}).get('values', {}))
+
+# L3 rules only apply below the assigned L2 component
+SBS_L3_RULES = {}
+for _rule in _TABLES['sbs_l3']['rules']:
+    SBS_L3_RULES.setdefault(_rule['when'], []).append((_rule['value'], tuple(_rule['keywords'])))
+SBS_L3_DEFAULT = _TABLES['sbs_l3']['default']
+
+VERIFICATION_RULES = _rules('verification_method')
+VERIFICATION_DEFAULT = _TABLES['verification_method']['default']
+
+TYPE_RULES = _rules('requirement_type')
+TYPE_DEFAULT = _TABLES['requirement_type']['default']
+
+PRIORITY_RULES = _rules('priority')
+PRIORITY_DEFAULT = _TABLES['priority']['default']
+
+RATIONALE_RULES = _rules('rationale')
+RATIONALE_DEFAULT = _TABLES['rationale']['default']
+
+def keyword_found(keyword, text_lower):
+    """Substring match, or whole-word match for {word: ...} keywords"""
+    if isinstance(keyword, WordKeyword):
+        return keyword.found_in(text_lower)
+    return keyword in text_lower
+
+def first_match(text_lower, rules, default):
+    """Return the value of the first rule with a keyword contained in the text"""
+    for value, keywords in rules:
+        if any(keyword_found(keyword, text_lower) for keyword in keywords):
+            return value
+    return default
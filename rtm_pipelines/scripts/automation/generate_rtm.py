@@ -9,18 +9,187 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+from classification_memo import ClassificationMemo, DEFAULT_MAX_ENTRIES
+from rtm_diff import diff_requirements, plan_outputs, affected_categories, change_report
+from rtm_statistics import RequirementStatistics
+from requirement_record import json_default
+from requirement_extractor import specification_key
+import argparse
 import json
 import logging
+import yaml
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+OUTPUTS = ('excel', 'markdown', 'json')
+PROJECT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config', 'project.yml')
+
+def find_source_documents(source_dir, config_path=PROJECT_CONFIG):
+    """Resolve rtm.source_documents from project.yml against the source directory
+    
+    Revisions are listed oldest first; only the last available revision of
+    each specification is read, so requirements are not extracted twice.
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    latest = {}
+    for name in config.get('rtm', {}).get('source_documents', []):
+        path = os.path.join(source_dir, name)
+        if not os.path.exists(path):
+            logger.warning(f"Source document not found: {path}")
+            continue
+        key = specification_key(name)
+        if key in latest:
+            logger.info(f"Skipping {latest[key]}, superseded by revision {path}")
+        latest[key] = path
+    return list(latest.values())
+
+def load_previous_requirements(json_path):
+    """Requirements from the last run, None when unavailable"""
+    if not os.path.exists(json_path):
+        return None
+    try:
+        with open(json_path, 'r') as f:
+            return json.load(f)
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable {json_path}: {e}")
+        return None
+
+def write_excel(generator, requirements, excel_path, statistics, excel_writer='streaming'):
+    """Write the workbook with the selected writer"""
+    if excel_writer == 'streaming':
+        generator.generate_rtm_excel_streaming(requirements, excel_path, statistics=statistics)
+    else:
+        generator.generate_rtm_excel(requirements, excel_path, statistics=statistics)
+
+def write_incremental(generator, previous, requirements, excel_path, markdown_path, json_path, report_path,
+                      statistics=None, excel_writer='streaming', selected=OUTPUTS):
+    """Rebuild only the selected outputs (and Markdown sections) touched by the requirement diff"""
+    diff = diff_requirements(previous, requirements)
+    outputs = plan_outputs(diff)
+    outputs['excel'] = outputs['excel'] or not os.path.exists(excel_path)
+    outputs['markdown'] = outputs['markdown'] or not os.path.exists(markdown_path)
+    outputs = {name: rebuild and name in selected for name, rebuild in outputs.items()}
+    
+    rebuilt_sections = []
+    if outputs['excel']:
+        write_excel(generator, requirements, excel_path, statistics, excel_writer)
+    if outputs['markdown']:
+        affected = set(affected_categories(previous, requirements, diff))
+        reuse = {category: section for category, section in generator.load_markdown_sections(markdown_path).items()
+                 if category not in affected}
+        generator.create_markdown_document(requirements, markdown_path, reuse_sections=reuse,
+                                           statistics=statistics)
+        rebuilt_sections = [category for category in generator._group_by_category(requirements)
+                            if category not in reuse]
+    if outputs['json']:
+        with open(json_path, 'w') as f:
+            json.dump(requirements, f, indent=2, default=json_default)
+    
+    statuses = {name: 'rebuilt' if rebuild else 'unchanged' if name in selected else 'skipped'
+                for name, rebuild in outputs.items()}
+    report = change_report(diff, statuses, rebuilt_sections)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    logger.info(f"Incremental RTM: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+                f"{len(diff['modified'])} modified, {diff['unchanged']} unchanged")
+    logger.info(f"Change report written to {report_path}")
+    return report
+
+def deduplicate(requirements, mode, threshold, report_path):
+    """Cluster near-duplicate requirements, write the report and link or merge them"""
+    from requirement_dedup import DEFAULT_THRESHOLD, DuplicateDetector, apply_duplicates
+    
+    report = DuplicateDetector(DEFAULT_THRESHOLD if threshold is None else threshold).find(requirements)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    duplicates = sum(len(cluster['members']) for cluster in report['clusters'])
+    logger.info(f"Duplicate detection: {len(report['clusters'])} clusters, {duplicates} duplicates "
+                f"({report['candidate_pairs']} candidate pairs checked), report written to {report_path}")
+    if mode == 'report':
+        return requirements
+    return apply_duplicates(requirements, report, mode)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Regenerate the QPLANT RTM")
+    parser.add_argument('--source-dir', default='docs/specs',
+                        help="Directory containing the specifications listed in project.yml")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for PDF page extraction (projects in parallel with --batch)")
+    parser.add_argument('--memo', default='data/rtm/classification_memo.sqlite',
+                        help="SQLite memo of derived fields reused across runs")
+    parser.add_argument('--memo-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Maximum memoised descriptions before LRU eviction")
+    parser.add_argument('--no-memo', action='store_true',
+                        help="Classify every requirement without the memo")
+    parser.add_argument('--excel-writer', choices=['streaming', 'pandas'], default='streaming',
+                        help="Write the workbook row by row (constant memory) or through pandas")
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, default=list(OUTPUTS),
+                        help="Outputs to write; 'json' alone skips pandas and openpyxl entirely")
+    parser.add_argument('--columnar', choices=['parquet', 'arrow'],
+                        help="Also export the RTM and SBS tables for analytics jobs")
+    parser.add_argument('--compact-records', action='store_true',
+                        help="Hold requirements as slotted records instead of dicts (less memory for large RTMs)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Diff against the previous requirements.json and rebuild only what changed")
+    parser.add_argument('--change-report', default='data/rtm/rtm_changes.json',
+                        help="Where the incremental mode writes its change report")
+    parser.add_argument('--batch', nargs='*', metavar='PATH',
+                        help="Generate every project whose project.yml is found under these paths "
+                             "(default: the config directory) in a process pool")
+    parser.add_argument('--output-root', default='data/rtm/projects',
+                        help="Where --batch writes one directory per project and the cross-project index")
+    parser.add_argument('--dedup', choices=['report', 'link', 'merge'],
+                        help="Detect reworded duplicate requirements; link marks them, merge drops them")
+    parser.add_argument('--dedup-threshold', type=float,
+                        help="Minimum estimated description similarity for --dedup (default 0.7)")
+    parser.add_argument('--dedup-report', default='data/rtm/duplicates.json',
+                        help="Where --dedup writes the duplicate clusters")
+    return parser.parse_args()
+
+def run_batch_mode(args):
+    """Generate all discovered projects; True when none failed"""
+    from rtm_batch import discover_projects, run_batch
+    
+    config_paths = discover_projects(args.batch or [os.path.dirname(PROJECT_CONFIG)])
+    if not config_paths:
+        logger.error("No project.yml found")
+        return False
+    logger.info(f"Batch RTM generation for {len(config_paths)} projects...")
+    index = run_batch(config_paths, args.source_dir, args.output_root, args.workers,
+                      args.excel_writer, not args.no_memo)
+    for summary in index['projects']:
+        conflicts = len(summary['conflicts'])
+        logger.info(f"  {summary['code']}: {summary['status']}, {summary['requirements']} requirements"
+                    f"{f', {conflicts} ID conflicts' if conflicts else ''}")
+    logger.info(f"Batch complete in {index['seconds']} s with {index['workers']} workers")
+    return all(summary['status'] != 'failed' for summary in index['projects'])
+
 def main():
+    args = parse_args()
+    if args.batch is not None:
+        return run_batch_mode(args)
     logger.info("Starting RTM generation...")
     
+    memo = None
     try:
         generator = ImprovedCryoplantRTMGenerator()
-        requirements = generator.extract_requirements_from_pdf_text()
+        generator.compact_records = args.compact_records
+        if not args.no_memo:
+            memo = ClassificationMemo(args.memo, generator.classification_version, args.memo_size)
+            generator.memo = memo
+        
+        source_documents = find_source_documents(args.source_dir)
+        if source_documents:
+            requirements = generator.extract_requirements_from_documents(source_documents, workers=args.workers)
+        else:
+            logger.warning("No source documents available, using the curated requirement list")
+            requirements = generator.extract_requirements_from_pdf_text()
+        if args.dedup:
+            requirements = deduplicate(requirements, args.dedup, args.dedup_threshold, args.dedup_report)
         requirements = generator.establish_parent_child_relationships(requirements)
         
         # Generate outputs
@@ -28,18 +197,42 @@ def main():
         markdown_path = "docs/rtm/QPLANT_RTM.md"
         json_path = "data/rtm/requirements.json"
         
-        generator.generate_rtm_excel(requirements, excel_path)
-        generator.create_markdown_document(requirements, markdown_path)
+        # One aggregation pass shared by the workbook, the document and the log
+        statistics = RequirementStatistics.from_requirements(requirements)
         
-        with open(json_path, 'w') as f:
-            json.dump(requirements, f, indent=2)
+        previous = load_previous_requirements(json_path) if args.incremental else None
+        if previous is not None:
+            write_incremental(generator, previous, requirements,
+                              excel_path, markdown_path, json_path, args.change_report, statistics,
+                              args.excel_writer, args.outputs)
+        else:
+            if 'excel' in args.outputs:
+                write_excel(generator, requirements, excel_path, statistics, args.excel_writer)
+            if 'markdown' in args.outputs:
+                generator.create_markdown_document(requirements, markdown_path, statistics=statistics)
+            if 'json' in args.outputs:
+                with open(json_path, 'w') as f:
+                    json.dump(requirements, f, indent=2, default=json_default)
         
-        logger.info(f"RTM generation complete. Generated {len(requirements)} requirements.")
+        if args.columnar:
+            generator.export_columnar(requirements, os.path.dirname(json_path), args.columnar)
+        
+        logger.info(f"RTM generation complete. Generated {statistics.total} requirements "
+                    f"({statistics.count('priority', 'High')} high priority, "
+                    f"{statistics.count('requirement_type', 'Safety')} safety).")
         return True
         
     except Exception as e:
         logger.error(f"RTM generation failed: {e}")
         return False
+    
+    finally:
+        if memo is not None:
+            memo.flush()
+            stats = memo.stats()
+            memo.close()
+            logger.info(f"Classification memo: {stats['hits']} hits, {stats['misses']} misses, "
+                        f"{stats['evictions']} evicted, {stats['entries']} stored")
 
 if __name__ == "__main__":
     success = main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Imports each RTM tool in a fresh interpreter under python -X importtime and
+checks its cumulative import time against a budget. Heavy dependencies
+(pandas, openpyxl, numpy, pyarrow) must stay out of tools that do not need
+them to parse arguments; they are imported inside the functions using them.
+End-to-end runs of the JSON-only generation and validation paths are timed
+too, and must not load those dependencies at any point
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Entry module -> (import budget in ms, modules its import must not pull in)
+HEAVY_MODULES = ('pandas', 'openpyxl', 'numpy', 'pyarrow')
+BUDGETS = {
+    'generate_rtm': (150, HEAVY_MODULES),
+    'validate_requirements': (80, HEAVY_MODULES + ('yaml',)),
+    'rtm_validation': (120, HEAVY_MODULES),
+    'incremental_validation': (120, HEAVY_MODULES),
+    'requirement_extractor': (80, HEAVY_MODULES),
+    'rtm_batch': (100, HEAVY_MODULES),
+    'rtm_workbook': (80, HEAVY_MODULES),
+    'rtm_diff': (60, HEAVY_MODULES),
+    # Query and matrix tools index with numpy but must not load pandas or openpyxl
+    'rtm_query': (250, ('pandas', 'openpyxl', 'pyarrow')),
+    'rtm_coverage': (250, ('pandas', 'openpyxl', 'pyarrow')),
+    'requirement_dedup': (250, ('pandas', 'openpyxl', 'pyarrow')),
+}
+
+# Command runs, executed in order in one scratch directory:
+# name -> (script and arguments, wall-clock budget in ms, modules the run must not load)
+RUN_BUDGETS = {
+    'generate_rtm --outputs json': (['generate_rtm.py', '--outputs', 'json', '--no-memo'], 500, HEAVY_MODULES),
+    'validate_requirements': (['validate_requirements.py', os.path.join('data', 'rtm', 'requirements.json')],
+                              250, HEAVY_MODULES),
+}
+
+# "import time: self [us] | cumulative | imported package", nesting shown by indentation
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\| ( *)(\S+)$')
+
+def measure(module, repeat=3):
+    """Best-of-n import profile of a module in fresh interpreters
+
+    Returns {'ms', 'modules': {name: cumulative ms}, 'top': [(name, self ms)]}.
+    """
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=SCRIPT_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1]}")
+        entries = [match.groups() for match in map(IMPORTTIME_PATTERN.match, result.stderr.splitlines()) if match]
+        total = next(int(cumulative) for _, cumulative, indent, name in reversed(entries)
+                     if name == module and not indent) / 1000
+        if best is None or total < best['ms']:
+            best = {
+                'ms': round(total, 1),
+                'modules': {name: int(cumulative) / 1000 for _, cumulative, _, name in entries},
+                'top': sorted(((name, int(own) / 1000) for own, _, _, name in entries),
+                              key=lambda item: item[1], reverse=True)[:5]
+            }
+    return best
+
+def check(module, budget_ms, forbidden, repeat=3):
+    """Benchmark result of one module with the reasons it fails its budget"""
+    profile = measure(module, repeat)
+    loaded = sorted(name for name in forbidden if name in profile['modules'])
+    problems = [f"imports {', '.join(loaded)}"] if loaded else []
+    if profile['ms'] > budget_ms:
+        problems.append(f"{profile['ms']:.0f} ms over the {budget_ms} ms budget")
+    return {
+        'module': module,
+        'ms': profile['ms'],
+        'budget_ms': budget_ms,
+        'heavy_imports': loaded,
+        'top': [{'module': name, 'ms': round(ms, 1)} for name, ms in profile['top']],
+        'problems': problems
+    }
+
+def check_runs(runs, repeat=3):
+    """Best-of-n wall-clock time and loaded modules of each command run"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix='rtm-startup-') as workdir:
+        os.makedirs(os.path.join(workdir, 'data', 'rtm'))
+        os.makedirs(os.path.join(workdir, 'docs', 'rtm'))
+        for name in runs:
+            arguments, budget_ms, forbidden = RUN_BUDGETS[name]
+            command = [sys.executable, '-X', 'importtime', os.path.join(SCRIPT_DIR, arguments[0])] + arguments[1:]
+            best = None
+            modules = set()
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+                elapsed = (time.perf_counter() - start) * 1000
+                if result.returncode != 0:
+                    raise RuntimeError(f"{name} failed: {result.stderr.strip().splitlines()[-1]}")
+                modules.update(match.group(4) for match in map(IMPORTTIME_PATTERN.match, result.stderr.splitlines())
+                               if match)
+                best = elapsed if best is None else min(best, elapsed)
+            loaded = sorted(module for module in forbidden if module in modules)
+            problems = [f"loads {', '.join(loaded)}"] if loaded else []
+            if best > budget_ms:
+                problems.append(f"{best:.0f} ms over the {budget_ms} ms budget")
+            results.append({
+                'run': name,
+                'ms': round(best, 1),
+                'budget_ms': budget_ms,
+                'heavy_imports': loaded,
+                'problems': problems
+            })
+    return results
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check RTM tool import times against their budgets")
+    parser.add_argument('modules', nargs='*', help="Modules to benchmark (default: every budgeted tool)")
+    parser.add_argument('--no-runs', action='store_true', help="Only time imports, skip the command runs")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per module, best one counts")
+    parser.add_argument('--output', help="Write the JSON results here")
+    args = parser.parse_args()
+
+    unknown = [module for module in args.modules if module not in BUDGETS]
+    if unknown:
+        print(f"❌ No budget for {', '.join(unknown)}; known: {', '.join(BUDGETS)}")
+        return False
+
+    results = []
+    for module in args.modules or BUDGETS:
+        budget_ms, forbidden = BUDGETS[module]
+        result = check(module, budget_ms, forbidden, args.repeat)
+        results.append(result)
+        slowest = ', '.join(f"{entry['module']} {entry['ms']:.0f}" for entry in result['top'][:3])
+        print(f"{'❌' if result['problems'] else '✅'} {module}: {result['ms']:.0f} ms "
+              f"(budget {budget_ms} ms; slowest: {slowest})")
+        for problem in result['problems']:
+            print(f"   {problem}")
+
+    if not args.no_runs and not args.modules:
+        for result in check_runs(RUN_BUDGETS, args.repeat):
+            results.append(result)
+            print(f"{'❌' if result['problems'] else '✅'} {result['run']}: {result['ms']:.0f} ms "
+                  f"(budget {result['budget_ms']} ms)")
+            for problem in result['problems']:
+                print(f"   {problem}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return not any(result['problems'] for result in results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
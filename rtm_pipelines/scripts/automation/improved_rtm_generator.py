@@ -1,15 +1,37 @@
 #!/usr/bin/env python3
 
-import pandas as pd
 import re
 import json
 from datetime import datetime
 import os
 
+from classification_memo import normalise_description
+from requirement_extractor import RequirementExtractor, merge_records
+from quantity_extraction import acceptance_criteria, extract_batch, extract_quantities
+from rule_engine import RuleEngine
+from requirement_graph import RequirementGraph, load_hierarchy_rules
+from requirement_record import RequirementRecord, json_default
+from rtm_statistics import RequirementStatistics
+from sbs_index import SBSIndex
+from rtm_workbook import NAVIGATION_ROWS, RTM_COLUMNS, SBS_COLUMNS, rtm_row, sbs_rows, write_streaming_workbook
+
+# Bump when the code deriving acceptance criteria changes so memoised fields are recomputed
+DERIVED_FIELDS_VERSION = 3
+
+def _scalar_rules():
+    """Rule tables of the scalar classifiers, parsed on first use only"""
+    import classification_rules
+    return classification_rules
+
 class ImprovedCryoplantRTMGenerator:
-    def __init__(self):
+    def __init__(self, rule_engine=None):
         self.requirements = []
         self.sbs_structure = self._initialize_sbs_structure()
+        self.sbs_index = SBSIndex(self.sbs_structure)
+        self.rule_engine = rule_engine or RuleEngine()  # batch workers share one compiled rule set
+        self.memo = None  # optional ClassificationMemo shared across runs
+        self.requirement_graph = None
+        self.compact_records = False  # build slotted RequirementRecords instead of dicts
         
     def _initialize_sbs_structure(self):
         """Initialize the hierarchical SBS structure as specified"""
@@ -124,10 +146,6 @@ class ImprovedCryoplantRTMGenerator:
     def extract_requirements_from_pdf_text(self):
         """Extract requirements directly from the PDF content we already read"""
         
-        # Read the PDF content that was already processed
-        with open('/home/ubuntu/Uploads/cryoplant_requirements.pdf', 'r', errors='ignore') as f:
-            content = f.read()
-        
         # Manual extraction of known RTM requirements from the document analysis
         requirements_data = [
             {
@@ -245,301 +263,162 @@ class ImprovedCryoplantRTMGenerator:
         ]
         
         # Convert to standardized format
-        processed_requirements = []
-        for req_data in requirements_data:
-            sbs_assignment = self._assign_to_sbs(req_data['req_id'], req_data['description'])
-            verification_method = self._determine_verification_method(req_data['description'])
-            acceptance_criteria = self._generate_acceptance_criteria(req_data['description'])
-            req_type = self._determine_requirement_type(req_data['description'])
-            
-            requirement = {
+        return self.build_requirements(requirements_data)
+    
+    def extract_requirements_from_documents(self, document_paths, workers=None):
+        """Stream requirements out of the source DOCX/PDF specifications, merging revisions"""
+        extractor = RequirementExtractor(workers=workers)
+        records, conflicts = merge_records(extractor.iter_requirements(document_paths), extractor.id_prefix)
+        for conflict in conflicts:
+            print(f"⚠️ {conflict['req_id']}: {conflict['kept']} replaces the differing text "
+                  f"from {conflict['replaced']}")
+        return self.build_requirements(records)
+    
+    @property
+    def classification_version(self):
+        """Version of everything the derived fields depend on"""
+        return f"{self.rule_engine.digest}:{DERIVED_FIELDS_VERSION}"
+    
+    def derive_fields(self, descriptions):
+        """Return {normalised description: derived fields}, classifying only memo misses"""
+        distinct = list(dict.fromkeys(normalise_description(text) for text in descriptions))
+        derived = self.memo.get_many(distinct) if self.memo is not None else {}
+        
+        missing = [text for text in distinct if text not in derived]
+        if missing:
+            # One compiled-rule scan per distinct description
+            quantities = extract_batch(missing)
+            fresh = {}
+            for text, text_quantities in zip(missing, quantities):
+                fields = self.rule_engine.classify(text)
+                fields['acceptance_criteria'] = acceptance_criteria(text_quantities)
+                fresh[text] = fields
+            if self.memo is not None:
+                self.memo.put_many(fresh)
+            derived.update(fresh)
+        
+        return derived
+    
+    def build_requirements(self, records):
+        """Convert extracted records in bulk, classifying each distinct description once"""
+        records = list(records)
+        if not records:
+            return []
+        
+        derived = self.derive_fields(req_data['description'] for req_data in records)
+        
+        requirements = []
+        for req_data in records:
+            fields = derived[normalise_description(req_data['description'])]
+            req = {
                 'req_id': req_data['req_id'],
                 'description': req_data['description'],
                 'full_description': req_data['description'],
-                'sbs_l0': sbs_assignment['l0'],
-                'sbs_l1': sbs_assignment['l1'], 
-                'sbs_l2': sbs_assignment['l2'],
-                'sbs_l3': sbs_assignment['l3'],
-                'requirement_type': req_type,
-                'verification_method': verification_method,
-                'acceptance_criteria': acceptance_criteria,
-                'priority': self._determine_priority(req_data['description']),
+                'sbs_l0': fields['sbs_l0'],
+                'sbs_l1': fields['sbs_l1'],
+                'sbs_l2': fields['sbs_l2'],
+                'sbs_l3': fields['sbs_l3'],
+                'requirement_type': fields['requirement_type'],
+                'verification_method': fields['verification_method'],
+                'acceptance_criteria': fields['acceptance_criteria'],
+                'priority': fields['priority'],
                 'source_section': req_data['section'],
                 'parent_requirements': [],
                 'child_requirements': [],
                 'status': 'Active',
-                'rationale': self._generate_rationale(req_data['description']),
+                'rationale': fields['rationale'],
                 'category': req_data['category'],
                 'numerical_value': req_data['numerical_value']
             }
-            
-            processed_requirements.append(requirement)
+            requirements.append(RequirementRecord(req) if self.compact_records else req)
         
-        return processed_requirements
+        return requirements
     
     def _assign_to_sbs(self, req_id, req_text):
         """Assign requirement to SBS levels based on content analysis"""
         text_lower = req_text.lower()
+        rules = _scalar_rules()
         
-        # Level 0 assignment
-        if any(keyword in text_lower for keyword in ['lifetime', 'project', 'overall', 'system']):
-            l0 = 'QSYS-PR'
-        else:
-            l0 = 'QSYS'
-            
-        # Level 1 assignment  
-        if any(keyword in text_lower for keyword in ['compressor', 'compression', 'wcs']):
-            l1 = 'QPLANT'
-        elif any(keyword in text_lower for keyword in ['distribution', 'line', 'header']):
-            l1 = 'QDIST'
-        elif any(keyword in text_lower for keyword in ['qcell', 'cell', 'cryomodule', 'qvb']):
-            l1 = 'QCELL'
-        elif any(keyword in text_lower for keyword in ['infrastructure', 'utility']):
-            l1 = 'QINFRA'
-        else:
-            l1 = 'QPLANT'
-            
-        # Level 2 assignment
-        if any(keyword in text_lower for keyword in ['warm compressor', 'wcs']):
-            l2 = 'WCS'
-        elif any(keyword in text_lower for keyword in ['cold box', 'qrb', 'refrigeration']):
-            l2 = 'QRB'
-        else:
-            l2 = 'WCS' if l1 == 'QPLANT' else ''
-            
-        # Level 3 assignment
-        l3 = ''
-        if l2 == 'WCS':
-            if any(keyword in text_lower for keyword in ['pressure vessel', 'piping', 'safety']):
-                l3 = 'PVPS'
-            elif any(keyword in text_lower for keyword in ['high pressure', 'hp']):
-                l3 = 'HP'
-        elif l2 == 'QRB':
-            if any(keyword in text_lower for keyword in ['turbine', 'expander']):
-                l3 = 'TURBINES'
-            elif '4k' in text_lower or '4.5k' in text_lower:
-                l3 = 'BATH-4K'  
-            elif '2k' in text_lower:
-                l3 = 'BATH-2K'
-            elif any(keyword in text_lower for keyword in ['cold compressor', 'cc']):
-                l3 = 'CC'
+        l0 = rules.first_match(text_lower, rules.SBS_L0_RULES, rules.SBS_L0_DEFAULT)
+        l1 = rules.first_match(text_lower, rules.SBS_L1_RULES, rules.SBS_L1_DEFAULT)
+        l2 = rules.first_match(text_lower, rules.SBS_L2_RULES, rules.SBS_L2_DEFAULT_BY_L1.get(l1, ''))
+        l3 = rules.first_match(text_lower, rules.SBS_L3_RULES.get(l2, []), rules.SBS_L3_DEFAULT)
                 
         return {'l0': l0, 'l1': l1, 'l2': l2, 'l3': l3}
     
+    def explain_classification(self, req_text):
+        """Report which configured rule decided each classification field"""
+        return self.rule_engine.explain(req_text)
+    
     def _determine_verification_method(self, req_text):
         """Determine verification method based on requirement content"""
-        text_lower = req_text.lower()
-        
-        if any(keyword in text_lower for keyword in ['test', 'testing', 'acceptance']):
-            return 'Test'
-        elif any(keyword in text_lower for keyword in ['analysis', 'calculation', 'design']):
-            return 'Analysis'  
-        elif any(keyword in text_lower for keyword in ['inspection', 'review', 'document']):
-            return 'Inspection'
-        elif any(keyword in text_lower for keyword in ['demonstration', 'operation', 'functional']):
-            return 'Demonstration'
-        else:
-            return 'Test'  # Default for operational requirements
+        rules = _scalar_rules()
+        return rules.first_match(req_text.lower(), rules.VERIFICATION_RULES, rules.VERIFICATION_DEFAULT)
     
     def _generate_acceptance_criteria(self, req_text):
-        """Generate acceptance criteria based on requirement text"""
-        text_lower = req_text.lower()
-        
-        # Extract numerical values if present
-        numbers = re.findall(r'(\d+(?:\.\d+)?)\s*([kmgtw]?[wvapk]?|bar|days?|years?|hours?|%|cycles?)', text_lower)
-        
-        if numbers:
-            criteria = []
-            for num, unit in numbers[:3]:  # Limit to first 3 matches to avoid clutter
-                if unit in ['days', 'day']:
-                    criteria.append(f"Duration shall be ≤ {num} days")
-                elif unit in ['years', 'year']:
-                    criteria.append(f"Lifetime shall be ≥ {num} years")
-                elif unit in ['cycles', 'cycle']:
-                    criteria.append(f"Cycle count shall be ≥ {num}")
-                elif unit == '%':
-                    criteria.append(f"Performance shall be ≥ {num}%")
-                elif unit in ['k']:
-                    criteria.append(f"Temperature condition: {num}K")
-                else:
-                    criteria.append(f"Value shall meet {num} {unit}")
-            return '; '.join(criteria) if criteria else "Compliance with requirement as specified"
-        else:
-            return "Compliance with requirement as specified"
+        """Generate acceptance criteria from the quantities in the requirement text"""
+        return acceptance_criteria(extract_quantities(req_text))
     
     def _determine_requirement_type(self, req_text):
         """Determine type of requirement"""
-        text_lower = req_text.lower()
-        
-        if any(keyword in text_lower for keyword in ['performance', 'capacity', 'power', 'efficiency', 'flow', 'rate']):
-            return 'Performance'
-        elif any(keyword in text_lower for keyword in ['safety', 'protection', 'interlock', 'purge']):
-            return 'Safety'
-        elif any(keyword in text_lower for keyword in ['interface', 'connection', 'compatibility']):
-            return 'Interface'
-        elif any(keyword in text_lower for keyword in ['operation', 'control', 'function', 'scenarios', 'transition']):
-            return 'Functional'
-        elif any(keyword in text_lower for keyword in ['design', 'construction', 'material', 'lifetime']):
-            return 'Design'
-        else:
-            return 'Functional'
+        rules = _scalar_rules()
+        return rules.first_match(req_text.lower(), rules.TYPE_RULES, rules.TYPE_DEFAULT)
     
     def _determine_priority(self, req_text):
         """Determine requirement priority"""
-        text_lower = req_text.lower()
-        
-        if any(keyword in text_lower for keyword in ['critical', 'safety', 'shall', 'must']):
-            return 'High'
-        elif any(keyword in text_lower for keyword in ['should', 'recommended', 'may']):
-            return 'Medium'
-        else:
-            return 'High'  # Default for QPLANT requirements
+        rules = _scalar_rules()
+        return rules.first_match(req_text.lower(), rules.PRIORITY_RULES, rules.PRIORITY_DEFAULT)
     
     def _generate_rationale(self, req_text):
         """Generate rationale for the requirement"""
-        text_lower = req_text.lower()
-        
-        if 'safety' in text_lower or 'purge' in text_lower:
-            return "Required for safe operation of cryogenic system"
-        elif any(keyword in text_lower for keyword in ['performance', 'capacity', 'flow']):
-            return "Required to meet operational performance targets"  
-        elif 'lifetime' in text_lower:
-            return "Required to meet project lifetime objectives"
-        elif any(keyword in text_lower for keyword in ['operational', 'operation', 'scenario']):
-            return "Required for proper operational flexibility and system control"
-        else:
-            return "Required for proper system functionality"
-
-    def establish_parent_child_relationships(self, requirements):
-        """Establish parent-child relationships between requirements"""
-        # Group requirements by operational categories
-        operational_groups = {
-            'lifetime': ['RTM-01', 'RTM-02', 'RTM-03', 'RTM-04'],
-            'steady_state': ['RTM-05'],
-            'transient': ['RTM-06', 'RTM-07', 'RTM-08', 'RTM-09', 'RTM-010', 'RTM-011', 'RTM-012'],
-            'other_ops': ['RTM-013', 'RTM-014', 'RTM-015', 'RTM-016']
-        }
+        rules = _scalar_rules()
+        return rules.first_match(req_text.lower(), rules.RATIONALE_RULES, rules.RATIONALE_DEFAULT)
+
+    def establish_parent_child_relationships(self, requirements, rules=None):
+        """Establish parent-child relationships between requirements
         
-        # Establish relationships within groups
-        for group_name, req_ids in operational_groups.items():
-            if len(req_ids) > 1:
-                # First requirement in group is parent to others
-                parent_id = req_ids[0]
-                for req in requirements:
-                    if req['req_id'] == parent_id:
-                        req['child_requirements'] = req_ids[1:]
-                    elif req['req_id'] in req_ids[1:]:
-                        req['parent_requirements'] = [parent_id]
+        The hierarchy comes from source section numbers and the grouping rules
+        in config/requirement_hierarchy.yml; the graph stays available as
+        self.requirement_graph for impact queries.
+        """
+        graph = RequirementGraph.from_requirements(requirements, keep_links=False)
+        graph.apply_rules(load_hierarchy_rules() if rules is None else rules, requirements)
+        self.requirement_graph = graph
         
-        return requirements
+        return graph.write_links(requirements)
 
     def create_rtm_dataframe(self, requirements):
         """Create RTM DataFrame"""
-        rtm_data = []
-        
-        for req in requirements:
-            rtm_data.append({
-                'Requirement ID': req['req_id'],
-                'Description': req['description'], 
-                'Full Description': req['full_description'],
-                'SBS Level 0': req['sbs_l0'],
-                'SBS Level 1': req['sbs_l1'],
-                'SBS Level 2': req['sbs_l2'], 
-                'SBS Level 3': req['sbs_l3'],
-                'Requirement Type': req['requirement_type'],
-                'Category': req.get('category', 'General'),
-                'Priority': req['priority'],
-                'Verification Method': req['verification_method'],
-                'Acceptance Criteria': req['acceptance_criteria'],
-                'Source Section': req['source_section'],
-                'Parent Requirements': ', '.join(req['parent_requirements']),
-                'Child Requirements': ', '.join(req['child_requirements']),
-                'Status': req['status'],
-                'Rationale': req['rationale'],
-                'Numerical Value': req.get('numerical_value', 'N/A')
-            })
-        
-        return pd.DataFrame(rtm_data)
+        import pandas as pd
+        return pd.DataFrame([rtm_row(req) for req in requirements],
+                            columns=[label for label, _ in RTM_COLUMNS])
+
+    def sbs_rollup(self, requirements):
+        """Direct and subtree requirement counts for every SBS node"""
+        return self.sbs_index.rollup(requirements)
 
     def create_sbs_dataframe(self):
         """Create SBS structure DataFrame"""
-        sbs_data = []
-        
-        for sbs_id, sbs_info in self.sbs_structure.items():
-            sbs_data.append({
-                'SBS ID': sbs_id,
-                'Name': sbs_info['name'], 
-                'Level': sbs_info['level'],
-                'Parent': sbs_info['parent'] if sbs_info['parent'] else '',
-                'Children': ', '.join(sbs_info['children']),
-                'Description': sbs_info['description']
-            })
-        
-        return pd.DataFrame(sbs_data)
+        import pandas as pd
+        return pd.DataFrame(list(sbs_rows(self.sbs_structure)), columns=SBS_COLUMNS)
 
-    def generate_rtm_excel(self, requirements, output_path):
+    def generate_rtm_excel(self, requirements, output_path, statistics=None):
         """Generate comprehensive RTM Excel workbook"""
-        # Disable pandas truncation
-        pd.set_option('display.max_columns', None)
-        pd.set_option('display.max_rows', None)
-        pd.set_option('display.max_colwidth', None)
+        import pandas as pd
+        from rtm_coverage import compute_coverage
+        
+        statistics = statistics or RequirementStatistics.from_requirements(requirements)
         
         # Create DataFrames
         rtm_df = self.create_rtm_dataframe(requirements)
         sbs_df = self.create_sbs_dataframe()
-        
-        # Create summary statistics
-        summary_data = {
-            'Metric': [
-                'Total Requirements',
-                'High Priority Requirements', 
-                'Medium Priority Requirements',
-                'Safety Requirements',
-                'Performance Requirements',
-                'Functional Requirements',
-                'Design Requirements',
-                'Interface Requirements',
-                'Requirements Needing Test Verification',
-                'Requirements Needing Analysis Verification',
-                'Requirements Needing Demonstration',
-                'Operational Requirements',
-                'Maintenance Requirements',
-                'Lifetime Requirements'
-            ],
-            'Count': [
-                len(requirements),
-                len([r for r in requirements if r['priority'] == 'High']),
-                len([r for r in requirements if r['priority'] == 'Medium']),
-                len([r for r in requirements if r['requirement_type'] == 'Safety']),
-                len([r for r in requirements if r['requirement_type'] == 'Performance']), 
-                len([r for r in requirements if r['requirement_type'] == 'Functional']),
-                len([r for r in requirements if r['requirement_type'] == 'Design']),
-                len([r for r in requirements if r['requirement_type'] == 'Interface']),
-                len([r for r in requirements if r['verification_method'] == 'Test']),
-                len([r for r in requirements if r['verification_method'] == 'Analysis']),
-                len([r for r in requirements if r['verification_method'] == 'Demonstration']),
-                len([r for r in requirements if r.get('category') == 'Operational']),
-                len([r for r in requirements if r.get('category') == 'Maintenance']),
-                len([r for r in requirements if r.get('category') == 'Lifetime'])
-            ]
-        }
-        summary_df = pd.DataFrame(summary_data)
+        summary_df = pd.DataFrame(statistics.summary_rows(), columns=['Metric', 'Count'])
         
         # Write to Excel with multiple sheets
         with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
             # Navigation sheet
-            nav_data = {
-                'Sheet Name': ['Requirements_Traceability_Matrix', 'SBS_Structure', 'Summary_Statistics', 'Requirements_by_SBS', 'Requirements_by_Type'],
-                'Description': [
-                    'Complete RTM with all requirements and traceability',
-                    'System Breakdown Structure hierarchy', 
-                    'Summary statistics and metrics',
-                    'Requirements organized by SBS levels',
-                    'Requirements organized by type and category'
-                ]
-            }
-            nav_df = pd.DataFrame(nav_data)
-            nav_df.to_excel(writer, sheet_name='Navigation', index=False)
+            nav_data = pd.DataFrame(NAVIGATION_ROWS, columns=['Sheet Name', 'Description'])
+            nav_data.to_excel(writer, sheet_name='Navigation', index=False)
             
             # Main RTM sheet
             rtm_df.to_excel(writer, sheet_name='RTM', index=False)
@@ -551,21 +430,38 @@ class ImprovedCryoplantRTMGenerator:
             summary_df.to_excel(writer, sheet_name='Summary', index=False)
             
             # Requirements by SBS Level 1
-            if len(rtm_df) > 0:
-                sbs_pivot = rtm_df.groupby(['SBS Level 1', 'Requirement Type']).size().unstack(fill_value=0)
+            if statistics.total > 0:
+                sbs_pivot = statistics.crosstab_frame('sbs_l1', 'requirement_type')
                 sbs_pivot.to_excel(writer, sheet_name='BySystem')
                 
                 # Requirements by Type and Category
-                type_pivot = rtm_df.groupby(['Category', 'Requirement Type']).size().unstack(fill_value=0)
+                type_pivot = statistics.crosstab_frame('category', 'requirement_type')
                 type_pivot.to_excel(writer, sheet_name='ByType')
+
+                # SBS coverage matrices and gaps
+                for sheet_name, rows in compute_coverage(requirements, self.sbs_index).sheets():
+                    header = next(rows)
+                    pd.DataFrame(list(rows), columns=header).to_excel(writer, sheet_name=sheet_name, index=False)
         
         print(f"RTM Excel workbook created: {output_path}")
         return output_path
 
-    def create_markdown_document(self, requirements, output_path):
-        """Create structured markdown document for engineering handover"""
-        
-        markdown_content = f"""# QPLANT Cryogenic System - Requirements Traceability Matrix
+    def generate_rtm_excel_streaming(self, requirements, output_path, statistics=None):
+        """Generate the RTM workbook row by row with constant memory; returns the statistics"""
+        statistics = write_streaming_workbook(requirements, output_path, self.sbs_structure, statistics)
+        print(f"RTM Excel workbook created: {output_path}")
+        return statistics
+
+    def export_columnar(self, requirements, output_dir, fmt='parquet'):
+        """Export the RTM and SBS tables as Parquet or Arrow IPC (requires pyarrow)"""
+        from rtm_columnar import export_rtm
+        paths = export_rtm(requirements, self.sbs_structure, output_dir, fmt)
+        print(f"Columnar RTM exported: {paths['requirements']}, {paths['sbs']}")
+        return paths
+
+    def _markdown_header(self, statistics):
+        """Document header, SBS overview and key metrics"""
+        return f"""# QPLANT Cryogenic System - Requirements Traceability Matrix
 ## Engineering Handover Document
 
 **Document Version:** 1.0  
@@ -580,10 +476,10 @@ class ImprovedCryoplantRTMGenerator:
 This Requirements Traceability Matrix (RTM) provides a comprehensive breakdown of the QPLANT cryogenic system requirements extracted from the technical specification document "Addendum II - Cryoplant Technical Requirements". The RTM establishes clear traceability from high-level system requirements down to specific component-level requirements through a hierarchical System Breakdown Structure (SBS).
 
 ### Key Metrics
-- **Total Requirements:** {len(requirements)}
-- **High Priority Requirements:** {len([r for r in requirements if r['priority'] == 'High'])}
-- **Safety Requirements:** {len([r for r in requirements if r['requirement_type'] == 'Safety'])}
-- **Performance Requirements:** {len([r for r in requirements if r['requirement_type'] == 'Performance'])}
+- **Total Requirements:** {statistics.total}
+- **High Priority Requirements:** {statistics.count('priority', 'High')}
+- **Safety Requirements:** {statistics.count('requirement_type', 'Safety')}
+- **Performance Requirements:** {statistics.count('requirement_type', 'Performance')}
 
 ---
 
@@ -618,61 +514,50 @@ The QPLANT system is organized according to the following hierarchical structure
 ## Requirements Breakdown
 
 """
+    
+    def _markdown_category_section(self, category, reqs):
+        """One "### <category> Requirements" section"""
+        section = f"### {category} Requirements\n\n"
         
-        # Group requirements by category
-        categories = {}
-        for req in requirements:
-            cat = req.get('category', 'General')
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(req)
-        
-        for category, reqs in categories.items():
-            markdown_content += f"### {category} Requirements\n\n"
+        for req in reqs:
+            section += f"#### {req['req_id']}\n"
+            section += f"**Description:** {req['description']}\n\n"
+            section += f"**SBS Assignment:** {req['sbs_l0']} → {req['sbs_l1']} → {req['sbs_l2']}"
+            if req['sbs_l3']:
+                section += f" → {req['sbs_l3']}"
+            section += f"\n\n"
+            section += f"**Type:** {req['requirement_type']}  \n"
+            section += f"**Priority:** {req['priority']}  \n"
+            section += f"**Verification Method:** {req['verification_method']}  \n"
+            section += f"**Acceptance Criteria:** {req['acceptance_criteria']}  \n"
+            section += f"**Rationale:** {req['rationale']}\n\n"
             
-            for req in reqs:
-                markdown_content += f"#### {req['req_id']}\n"
-                markdown_content += f"**Description:** {req['description']}\n\n"
-                markdown_content += f"**SBS Assignment:** {req['sbs_l0']} → {req['sbs_l1']} → {req['sbs_l2']}"
-                if req['sbs_l3']:
-                    markdown_content += f" → {req['sbs_l3']}"
-                markdown_content += f"\n\n"
-                markdown_content += f"**Type:** {req['requirement_type']}  \n"
-                markdown_content += f"**Priority:** {req['priority']}  \n"
-                markdown_content += f"**Verification Method:** {req['verification_method']}  \n"
-                markdown_content += f"**Acceptance Criteria:** {req['acceptance_criteria']}  \n"
-                markdown_content += f"**Rationale:** {req['rationale']}\n\n"
-                
-                if req['parent_requirements']:
-                    markdown_content += f"**Parent Requirements:** {', '.join(req['parent_requirements'])}  \n"
-                if req['child_requirements']:
-                    markdown_content += f"**Child Requirements:** {', '.join(req['child_requirements'])}  \n"
-                
-                markdown_content += "---\n\n"
+            if req['parent_requirements']:
+                section += f"**Parent Requirements:** {', '.join(req['parent_requirements'])}  \n"
+            if req['child_requirements']:
+                section += f"**Child Requirements:** {', '.join(req['child_requirements'])}  \n"
+            if req.get('duplicate_of'):
+                section += f"**Duplicate Of:** {req['duplicate_of']}  \n"
+            if req.get('merged_from'):
+                section += f"**Merged From:** {', '.join(req['merged_from'])}  \n"
+            
+            section += "---\n\n"
         
-        # Add traceability matrix section
-        markdown_content += """
+        return section
+    
+    def _markdown_footer(self, statistics):
+        """Traceability summary table and document control"""
+        footer = """
 ## Traceability Matrix Summary
 
 | SBS Level 1 | Requirements Count | High Priority | Safety Critical |
 |-------------|-------------------|---------------|-----------------|
 """
         
-        sbs_summary = {}
-        for req in requirements:
-            sbs_l1 = req['sbs_l1']
-            if sbs_l1 not in sbs_summary:
-                sbs_summary[sbs_l1] = {'total': 0, 'high': 0, 'safety': 0}
-            sbs_summary[sbs_l1]['total'] += 1
-            if req['priority'] == 'High':
-                sbs_summary[sbs_l1]['high'] += 1
-            if req['requirement_type'] == 'Safety':
-                sbs_summary[sbs_l1]['safety'] += 1
-        
-        for sbs, counts in sbs_summary.items():
-            markdown_content += f"| {sbs} | {counts['total']} | {counts['high']} | {counts['safety']} |\n"
+        for sbs, counts in statistics.sbs_rollup['sbs_l1'].items():
+            footer += f"| {sbs} | {counts['total']} | {counts['high']} | {counts['safety']} |\n"
         
-        markdown_content += f"""
+        footer += f"""
 
 ---
 
@@ -705,7 +590,61 @@ This RTM is prepared for integration with the existing GitHub infrastructure:
 
 *This document was generated automatically from the QPLANT technical requirements specification. For questions or updates, please contact the project technical team.*
 """
-
+        
+        return footer
+    
+    @staticmethod
+    def _group_by_category(requirements):
+        """Group requirements by category in order of first appearance"""
+        categories = {}
+        for req in requirements:
+            cat = req.get('category', 'General')
+            if cat not in categories:
+                categories[cat] = []
+            categories[cat].append(req)
+        return categories
+    
+    @staticmethod
+    def load_markdown_sections(path):
+        """Split a previously generated document into {category: section text}"""
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        start_marker = "## Requirements Breakdown\n\n"
+        end_marker = "\n## Traceability Matrix Summary"
+        start = content.find(start_marker)
+        end = content.find(end_marker)
+        if start < 0 or end < 0:
+            return {}
+        breakdown = content[start + len(start_marker):end]
+        
+        sections = {}
+        headings = list(re.finditer(r'^### (.+) Requirements\n\n', breakdown, re.MULTILINE))
+        for index, heading in enumerate(headings):
+            stop = headings[index + 1].start() if index + 1 < len(headings) else len(breakdown)
+            sections[heading.group(1)] = breakdown[heading.start():stop]
+        return sections
+    
+    def create_markdown_document(self, requirements, output_path, reuse_sections=None, statistics=None):
+        """Create structured markdown document for engineering handover
+        
+        reuse_sections maps categories to already rendered sections (see
+        load_markdown_sections); those categories are not rendered again.
+        """
+        reuse_sections = reuse_sections or {}
+        statistics = statistics or RequirementStatistics.from_requirements(requirements)
+        
+        parts = [self._markdown_header(statistics)]
+        for category, reqs in self._group_by_category(requirements).items():
+            if category in reuse_sections:
+                parts.append(reuse_sections[category])
+            else:
+                parts.append(self._markdown_category_section(category, reqs))
+        parts.append(self._markdown_footer(statistics))
+        markdown_content = ''.join(parts)
+        
         # Write markdown file
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
@@ -732,17 +671,18 @@ def main():
     # Generate Excel RTM
     print("📊 Generating Excel RTM workbook...")
     excel_path = "/home/ubuntu/QPLANT_Requirements_Traceability_Matrix_v2.xlsx"
-    generator.generate_rtm_excel(requirements, excel_path)
+    statistics = RequirementStatistics.from_requirements(requirements)
+    generator.generate_rtm_excel(requirements, excel_path, statistics=statistics)
     
     # Generate Markdown document
     print("📝 Generating Markdown engineering handover document...")
     markdown_path = "/home/ubuntu/QPLANT_RTM_Engineering_Handover.md"
-    generator.create_markdown_document(requirements, markdown_path)
+    generator.create_markdown_document(requirements, markdown_path, statistics=statistics)
     
     # Save requirements as JSON for further processing
     json_path = "/home/ubuntu/qplant_requirements_v2.json"
     with open(json_path, 'w') as f:
-        json.dump(requirements, f, indent=2)
+        json.dump(requirements, f, indent=2, default=json_default)
     
     print("✨ RTM Generation Complete!")
     print(f"📁 Excel RTM: {excel_path}")
@@ -751,10 +691,10 @@ def main():
     
     # Display summary
     print("\n📋 Summary:")
-    print(f"   Total Requirements: {len(requirements)}")
-    print(f"   High Priority: {len([r for r in requirements if r['priority'] == 'High'])}")
-    print(f"   Safety Requirements: {len([r for r in requirements if r['requirement_type'] == 'Safety'])}")
-    print(f"   Performance Requirements: {len([r for r in requirements if r['requirement_type'] == 'Performance'])}")
+    print(f"   Total Requirements: {statistics.total}")
+    print(f"   High Priority: {statistics.count('priority', 'High')}")
+    print(f"   Safety Requirements: {statistics.count('requirement_type', 'Safety')}")
+    print(f"   Performance Requirements: {statistics.count('requirement_type', 'Performance')}")
     
     return requirements, excel_path, markdown_path
 
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Incremental Requirement Validation
+Caches a content hash and the verdicts of every requirement between runs so
+only changed records are re-checked, and the global checks (uniqueness,
+parent/child references, cycles) only revisit the IDs touched by the change
+"""
+
+import os
+import json
+import hashlib
+import logging
+from collections.abc import Mapping
+
+from requirement_graph import RequirementGraph
+from requirement_record import json_default
+from rtm_validation import REQUIREMENTS_CONFIG, ConformanceContext
+from validate_requirements import record_errors
+
+logger = logging.getLogger(__name__)
+
+# Bump when the checks change so cached verdicts are discarded
+VALIDATION_VERSION = 2
+
+DEFAULT_CACHE = "data/rtm/validation_cache.json"
+
+def record_hash(req, text=None):
+    """Content hash of a requirement; pass its JSON source text to skip re-serialising it"""
+    # Key order is kept as written; a reordered record is merely re-checked
+    if text is None:
+        text = json.dumps(req, ensure_ascii=False, default=json_default)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def context_digest(sbs_structure, config_path=REQUIREMENTS_CONFIG):
+    """Digest of everything the verdicts depend on besides the requirements themselves"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(VALIDATION_VERSION).encode())
+    digest.update(json.dumps(sbs_structure, sort_keys=True).encode('utf-8'))
+    with open(config_path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+def _links(req, field):
+    value = req.get(field, []) if isinstance(req, Mapping) else []
+    return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
+
+def _empty_cache():
+    return {'records': {}, 'cycles': [], 'cyclic': []}
+
+def _cache_record(key, entry):
+    """[hash, local errors, reference errors(, req_id when it differs from the key)]"""
+    record = [entry['hash'], entry['local'], entry['links']]
+    if entry['id'] != key:
+        record.append(entry['id'])
+    return record
+
+
+class IncrementalValidator:
+    """Validates requirements against the verdicts cached by the previous run"""
+
+    def __init__(self, sbs_structure, cache_path=DEFAULT_CACHE, config_path=REQUIREMENTS_CONFIG):
+        self.context = ConformanceContext.load(sbs_structure, config_path)
+        self.digest = context_digest(sbs_structure, config_path)
+        self.cache_path = cache_path
+
+    def load_cache(self):
+        """Cached entries, empty when missing, unreadable or built for other rules"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return _empty_cache()
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable validation cache {self.cache_path}: {e}")
+            return _empty_cache()
+        if cache.get('digest') != self.digest:
+            logger.info("Validation rules changed since the cache was written, re-validating everything")
+            return _empty_cache()
+        return cache
+
+    def save_cache(self, records, cycles, cyclic):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.cache_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            # dumps runs the C encoder; dump to a file falls back to the pure Python one
+            f.write(json.dumps({'digest': self.digest, 'records': records, 'cycles': cycles,
+                               'cyclic': cyclic}, ensure_ascii=False))
+        os.replace(temporary, self.cache_path)
+
+    def local_errors(self, req, position):
+        """Field, SBS and enum checks of one requirement"""
+        errors = record_errors(req, position)
+        if isinstance(req, Mapping):
+            label = req.get('req_id') or f"UNKNOWN (entry {position})"
+            for check in (self.context.check_enums, self.context.check_sbs_path, self.context.check_links):
+                errors.extend(f"{label}: {violation['message']}" for violation in check(req, position))
+        return errors
+
+    @staticmethod
+    def link_errors(req_id, entry, entries, keys_by_id):
+        """References of one requirement must resolve and be listed on the other side too"""
+        errors = []
+        for field, other_field, relation, other_relation in (
+                ('parents', 'children', 'parent', 'child'), ('children', 'parents', 'child', 'parent')):
+            for other_id in entry[field]:
+                if other_id == req_id:
+                    continue  # reported by the local self-link check
+                other_keys = keys_by_id.get(other_id)
+                if not other_keys:
+                    errors.append(f"Unknown {relation} requirement '{other_id}' in {req_id}")
+                elif not any(req_id in entries[key][other_field] for key in other_keys):
+                    errors.append(f"{req_id} lists {other_id} as a {relation} but {other_id} "
+                                  f"does not list it as a {other_relation}")
+        return errors
+
+    def validate_path(self, path, full=False):
+        """Validate requirements.json (hashing the raw element text) or a columnar export"""
+        from requirement_stream import iter_json_array, iter_requirement_records
+        from rtm_columnar import is_columnar
+        if is_columnar(path):
+            return self.validate(iter_requirement_records(path), full)
+        return self.validate(iter_json_array(path, with_text=True), full, with_text=True)
+
+    def validate(self, records, full=False, with_text=False):
+        """Validate requirements (or (requirement, JSON text) pairs); returns the report plus what was re-checked"""
+        cache = _empty_cache() if full else self.load_cache()
+        previous = cache['records']
+
+        entries = {}
+        keys_by_id = {}
+        changed = set()
+        count = 0
+        occurrences = {}
+
+        for position, req in enumerate(records):
+            text = None
+            if with_text:
+                req, text = req
+            count += 1
+            req_id = req.get('req_id', '') if isinstance(req, Mapping) else ''
+            occurrences[req_id] = occurrences.get(req_id, 0) + 1
+            key = req_id if occurrences[req_id] == 1 else f"{req_id}#{occurrences[req_id]}"
+            if not req_id:
+                key = f"#entry{position}"
+
+            content_hash = record_hash(req, text)
+            cached = previous.get(key)
+            # Records without an ID name their position in messages, so never reuse them
+            if cached is not None and cached[0] == content_hash and req_id:
+                local = cached[1]
+            else:
+                local = self.local_errors(req, position)
+                changed.add(key)
+            entries[key] = {
+                'id': req_id,
+                'position': position,
+                'hash': content_hash,
+                'local': local,
+                'parents': _links(req, 'parent_requirements'),
+                'children': _links(req, 'child_requirements'),
+                'links': cached[2] if cached is not None and key not in changed else None
+            }
+            if req_id:
+                keys_by_id.setdefault(req_id, []).append(key)
+
+        removed = [key for key in previous if key not in entries]
+        # IDs whose records appeared, disappeared or changed
+        touched = {entries[key]['id'] for key in changed}
+        touched.update(previous[key][3] if len(previous[key]) > 3 else key for key in removed)
+        touched.discard('')
+
+        # References: a verdict only depends on the record and the records it names
+        relinked = 0
+        for key, entry in entries.items():
+            if not entry['id']:
+                entry['links'] = []
+                continue
+            if entry['links'] is None or any(other in touched for other in entry['parents']) \
+                    or any(other in touched for other in entry['children']):
+                entry['links'] = self.link_errors(entry['id'], entry, entries, keys_by_id)
+                relinked += 1
+
+        cycles, cyclic = self._cycles(entries, keys_by_id, cache, touched)
+
+        errors = []
+        for entry in entries.values():
+            errors.extend(entry['local'])
+            errors.extend(entry['links'])
+        for req_id, keys in keys_by_id.items():
+            if len(keys) > 1:
+                positions = ', '.join(str(entries[key]['position']) for key in keys)
+                errors.append(f"Duplicate requirement ID {req_id} at positions {positions}")
+        errors.extend(f"Hierarchy cycle: {' -> '.join(cycle + cycle[:1])}" for cycle in cycles)
+
+        unchanged = not (changed or removed or relinked) and (cycles, cyclic) == (cache['cycles'], cache['cyclic'])
+        if self.cache_path and not unchanged:
+            self.save_cache({key: _cache_record(key, entry) for key, entry in entries.items()}, cycles, cyclic)
+
+        return {
+            'requirements': count,
+            'errors': errors,
+            'error_count': len(errors),
+            'rechecked': len(changed),
+            'relinked': relinked,
+            'removed': len(removed),
+            'full': full or not previous
+        }
+
+    @staticmethod
+    def _cycles(entries, keys_by_id, cache, touched):
+        """Cycles and the IDs in cyclic tangles, searching only where a cycle can have changed
+
+        A cycle in the new hierarchy either passes through a touched ID or is
+        made of unchanged links, in which case all its IDs were cyclic last time.
+        """
+        if not touched:
+            return cache['cycles'], cache['cyclic']
+
+        graph = RequirementGraph(keys_by_id)
+        for entry in entries.values():
+            for parent_id in entry['parents']:
+                graph.add_edge(parent_id, entry['id'])
+            for child_id in entry['children']:
+                graph.add_edge(entry['id'], child_id)
+
+        # A cycle through the touched set lies both above and below it
+        starts = [req_id for req_id in touched if req_id in graph]
+        above = set(graph.upstream(*starts)).union(starts)
+        candidates = above.intersection(graph.downstream(*starts)).union(
+            req_id for req_id in starts if graph.parents[req_id])
+        candidates.update(req_id for req_id in cache['cyclic'] if req_id in graph)
+        if not candidates:
+            return [], []
+
+        subgraph = RequirementGraph(req_id for req_id in graph.index if req_id in candidates)
+        for parent_id in subgraph.index:
+            for child_id in graph.children[parent_id]:
+                subgraph.add_edge(parent_id, child_id)
+        return subgraph.find_cycles(), subgraph.cyclic_nodes()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Quantity Extraction Engine
+Finds the physical quantities mentioned in requirement text with one
+precompiled pattern, reads thousands separators correctly, resolves units
+against a local unit table and normalises every value to SI, so quantities
+can drive acceptance criteria and numeric range queries
+"""
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import accumulate
+
+# Unit as written -> (quantity kind, SI unit, factor to SI)
+UNITS = {
+    'K': ('temperature', 'K', 1.0),
+    'W': ('power', 'W', 1.0),
+    'kW': ('power', 'W', 1e3),
+    'MW': ('power', 'W', 1e6),
+    'mbar': ('pressure', 'Pa', 1e2),
+    'bar': ('pressure', 'Pa', 1e5),
+    'L': ('volume', 'm3', 1e-3),
+    'g/s': ('mass_flow', 'kg/s', 1e-3),
+    'kg/s': ('mass_flow', 'kg/s', 1.0),
+    'hour': ('time', 's', 3600.0),
+    'day': ('time', 's', 86400.0),
+    'month': ('time', 's', 2629800.0),
+    'year': ('time', 's', 31557600.0),
+    'cycle': ('count', '', 1.0),
+    '%': ('ratio', '', 1e-2),
+}
+# Spelled-out units are matched case-insensitively and in the plural too
+WORD_UNITS = ('hour', 'day', 'month', 'year', 'cycle')
+# Words allowed between a number and a spelled-out unit ('90 consecutive days'); any
+# hyphenated or slashed word is too ('50 warm-up/cool-down cycles'), up to MAX_QUALIFIERS
+UNIT_QUALIFIERS = ('consecutive', 'calendar', 'working', 'operating', 'full', 'thermal')
+MAX_QUALIFIERS = 3
+
+# Kinds in a fixed order; persisted indexes store the position
+QUANTITY_KINDS = ('temperature', 'power', 'pressure', 'volume', 'mass_flow', 'time', 'count', 'ratio')
+
+# Leading bound as written -> symbol
+COMPARATORS = {
+    '≥': '≥', '>=': '≥', 'at least': '≥', 'no less than': '≥', 'minimum of': '≥',
+    '≤': '≤', '<=': '≤', 'at most': '≤', 'no more than': '≤', 'up to': '≤', 'maximum of': '≤',
+    'within': '≤',
+    '<': '<', 'less than': '<', 'below': '<',
+    '>': '>', 'more than': '>', 'above': '>', 'exceeding': '>',
+    '~': '~', 'approximately': '~',
+}
+
+def _alternation(options):
+    # Longest first so 'kW' wins over 'K' and 'mbar' over 'bar'
+    return '|'.join(re.escape(option) for option in sorted(options, key=len, reverse=True))
+
+QUANTITY_PATTERN = re.compile(
+    r'(?:(?P<comparator>' + _alternation(COMPARATORS) + r')\s*)?'
+    # '2,900' is a thousands group; any other comma is a decimal comma ('1,5 bar', '0,800 bar')
+    r'(?<![\w.,])(?P<number>[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?)'
+    r'\s*(?P<unit>' + _alternation(set(UNITS) - set(WORD_UNITS)) +
+    r'|(?i:(?:(?:' + '|'.join(UNIT_QUALIFIERS) + r'|[a-z]+(?:[-/][a-z]+)+)\s+){0,' + str(MAX_QUALIFIERS) + r'}'
+    r'(?:' + '|'.join(WORD_UNITS) + r')s?))(?![A-Za-z0-9])'
+)
+
+# Separates descriptions in a batch; no part of a quantity can match it
+_BATCH_SEPARATOR = '\n\x00\n'
+
+Quantity = namedtuple('Quantity', ['text', 'comparator', 'number', 'value', 'unit', 'kind', 'si_value', 'si_unit'])
+
+def _number(text):
+    if re.fullmatch(r'[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?', text):
+        return float(text.replace(',', ''))
+    return float(text.replace(',', '.'))
+
+def _unit_key(unit):
+    if unit in UNITS:
+        return unit
+    word = unit.lower()
+    return word[:-1] if word.endswith('s') and word[:-1] in WORD_UNITS else word
+
+def _quantity(match):
+    unit = match.group('unit').split()[-1]
+    kind, si_unit, factor = UNITS[_unit_key(unit)]
+    value = _number(match.group('number'))
+    comparator = match.group('comparator')
+    return Quantity(
+        text=' '.join(match.group(0).split()),
+        comparator=COMPARATORS[comparator.lower()] if comparator else None,
+        number=match.group('number'),
+        value=value,
+        unit=unit,
+        kind=kind,
+        si_value=value * factor,
+        si_unit=si_unit
+    )
+
+def extract_quantities(text):
+    """Quantities in one text, in order of appearance"""
+    return [_quantity(match) for match in QUANTITY_PATTERN.finditer(text or '')]
+
+def extract_batch(texts):
+    """Quantities of many texts with a single scan over their concatenation; one list per text"""
+    texts = [text or '' for text in texts]
+    results = [[] for _ in texts]
+    if not texts:
+        return results
+    starts = list(accumulate((len(text) + len(_BATCH_SEPARATOR) for text in texts[:-1]), initial=0))
+    for match in QUANTITY_PATTERN.finditer(_BATCH_SEPARATOR.join(texts)):
+        results[bisect_right(starts, match.start()) - 1].append(_quantity(match))
+    return results
+
+def parse_quantity(text):
+    """'5 kW' -> (kind, SI value); a bare number is taken as already in SI units"""
+    text = text.strip()
+    match = QUANTITY_PATTERN.fullmatch(text)
+    if match and not match.group('comparator'):
+        quantity = _quantity(match)
+        return quantity.kind, quantity.si_value
+    if re.fullmatch(r'\d+(?:\.\d+)?', text):
+        return None, float(text)
+    raise ValueError(f"Not a quantity: {text!r}; expected a number with one of {', '.join(UNITS)}")
+
+def acceptance_criterion(quantity):
+    """Acceptance criterion sentence for one quantity"""
+    number = quantity.number
+    bound = quantity.comparator
+    if quantity.kind == 'temperature':
+        return f"Temperature condition: {bound + ' ' if bound else ''}{number}K"
+    if quantity.kind == 'time':
+        if _unit_key(quantity.unit) == 'year':
+            return f"Lifetime shall be {bound or '≥'} {number} {quantity.unit}"
+        return f"Duration shall be {bound or '≤'} {number} {quantity.unit}"
+    if quantity.kind == 'count':
+        return f"Cycle count shall be {bound or '≥'} {number}"
+    if quantity.kind == 'ratio':
+        return f"Performance shall be {bound or '≥'} {number}%"
+    return f"Value shall {'be ' + bound if bound else 'meet'} {number} {quantity.unit}"
+
+def acceptance_criteria(quantities):
+    """Criteria for every quantity of a requirement, without repeats"""
+    criteria = dict.fromkeys(acceptance_criterion(quantity) for quantity in quantities)
+    return '; '.join(criteria) if criteria else "Compliance with requirement as specified"
+
+def quantity_columns(texts):
+    """Flat numeric columns over many texts: row offsets, kind codes and SI values
+
+    Quantities of text i are entries offsets[i]:offsets[i + 1].
+    """
+    import numpy as np
+
+    kind_codes = {kind: code for code, kind in enumerate(QUANTITY_KINDS)}
+    batches = extract_batch(texts)
+    offsets = np.zeros(len(batches) + 1, dtype=np.int64)
+    np.cumsum([len(quantities) for quantities in batches], out=offsets[1:])
+    kinds = np.fromiter((kind_codes[quantity.kind] for quantities in batches for quantity in quantities),
+                        dtype=np.uint8, count=int(offsets[-1]))
+    values = np.fromiter((quantity.si_value for quantities in batches for quantity in quantities),
+                         dtype=np.float64, count=int(offsets[-1]))
+    return offsets, kinds, values
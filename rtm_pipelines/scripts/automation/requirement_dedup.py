@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Requirement Detection
+Shingles descriptions into byte n-grams, computes MinHash signatures with
+array operations and buckets signature bands (locality-sensitive hashing) so
+only requirements sharing a bucket are compared. Matches are grouped into
+clusters that the RTM can link or merge
+"""
+
+import sys
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5          # bytes per shingle, at most 8 so a shingle fits one integer
+NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.7   # estimated Jaccard similarity of the shingle sets
+DEFAULT_SEED = 1
+
+# Shingles hashed per block; keeps the (permutations x shingles) work array cache-sized
+BLOCK_SHINGLES = 10000
+# Chance that a pair exactly at the threshold shares a bucket; verification removes the extra candidates
+CANDIDATE_RECALL = 0.95
+# Buckets larger than this (boilerplate) are chained to their first member instead of paired exhaustively
+MAX_BUCKET_PAIRS = 64
+
+_EMPTY = np.uint32(0xFFFFFFFF)  # marks documents without shingles
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_BAND_MULTIPLIER = np.uint64(0x100000001B3)
+
+DUPLICATE_STATUS = 'Duplicate'
+
+def _normalise(text):
+    return ' '.join((text or '').lower().split()).encode('utf-8')
+
+def _permutations(num_perm, seed):
+    """(a, b) of the multiply-add-shift hashes ((a*x + b) mod 2^64) >> 32 over 32-bit x"""
+    generator = np.random.default_rng(seed)
+    a = generator.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = generator.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+def _blocks(encoded, shingle_size):
+    """Consecutive document ranges holding about BLOCK_SHINGLES shingles each"""
+    start = 0
+    total = 0
+    for position, text in enumerate(encoded):
+        total += max(len(text) - shingle_size + 1, 0)
+        if total >= BLOCK_SHINGLES:
+            yield start, position + 1
+            start = position + 1
+            total = 0
+    if start < len(encoded):
+        yield start, len(encoded)
+
+def _shingles(encoded, shingle_size):
+    """Shingle values of a block of documents and the first shingle of each non-empty document
+
+    Every shingle is its bytes packed into one integer, built for the whole
+    block at once from shifted views of the concatenated text.
+    """
+    lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+    count = max(len(blob) - shingle_size + 1, 0)
+    document = np.repeat(np.arange(len(encoded)), lengths)
+    # Drop windows that run into the next document
+    valid = np.flatnonzero(document[:count] == document[shingle_size - 1:shingle_size - 1 + count])
+    values = np.zeros(len(valid), dtype=np.uint64)
+    for offset in range(shingle_size):
+        values |= blob[valid + offset] << np.uint64(8 * offset)
+    owners = document[valid]
+    documents, starts = np.unique(owners, return_index=True)
+    return values, documents, starts
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=DEFAULT_SEED):
+    """(documents x num_perm) signatures; documents shorter than one shingle keep the empty marker"""
+    encoded = [_normalise(text) for text in texts]
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(encoded), num_perm), _EMPTY, dtype=np.uint32)
+    for start, stop in _blocks(encoded, shingle_size):
+        values, documents, starts = _shingles(encoded[start:stop], shingle_size)
+        if not len(values):
+            continue
+        # Fold each shingle to 32 bits, then apply every permutation at once; uint64 arithmetic wraps
+        mixed = (values * _GOLDEN) >> np.uint64(32)
+        hashed = np.multiply(a, mixed[None, :])
+        hashed += b
+        hashed >>= np.uint64(32)
+        signatures[start + documents] = np.minimum.reduceat(hashed, starts, axis=1).T
+    return signatures
+
+def lsh_parameters(threshold, num_perm=NUM_PERM):
+    """Bands and rows per band: the most selective split that still buckets a pair at the threshold
+    together with probability CANDIDATE_RECALL (1 - (1 - t^rows)^bands)"""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    recalled = [(bands, rows) for bands, rows in options
+                if 1 - (1 - threshold ** rows) ** bands >= CANDIDATE_RECALL]
+    return max(recalled, key=lambda option: option[1]) if recalled else options[0]
+
+def _band_candidates(signatures, present, band, rows):
+    """Pairs of documents whose signatures agree on every row of one band"""
+    keys = np.zeros(len(present), dtype=np.uint64)
+    for column in signatures[present, band * rows:(band + 1) * rows].T:
+        keys = keys * _BAND_MULTIPLIER + column.astype(np.uint64)
+    order = np.argsort(keys, kind='stable')
+    members = present[order]
+    starts = np.flatnonzero(np.diff(keys[order], prepend=keys[order][:1] + np.uint64(1)))
+    sizes = np.diff(np.append(starts, len(members)))
+    # Most buckets that pair anything hold two documents; take those in one step
+    pairs = [np.column_stack((members[starts[sizes == 2]], members[starts[sizes == 2] + 1]))]
+    for start, size in zip(starts[sizes > 2].tolist(), sizes[sizes > 2].tolist()):
+        bucket = members[start:start + size]
+        if size > MAX_BUCKET_PAIRS:
+            pairs.append(np.column_stack((np.full(size - 1, bucket[0]), bucket[1:])))
+        else:
+            left, right = np.triu_indices(size, 1)
+            pairs.append(np.column_stack((bucket[left], bucket[right])))
+    return np.concatenate(pairs)
+
+def similar_pairs(signatures, bands, rows, threshold):
+    """(left, right, similarity, candidates) of the distinct pairs sharing a bucket and reaching the threshold
+
+    Candidates are verified band by band, so memory follows the accepted
+    pairs rather than everything the buckets propose.
+    """
+    present = np.flatnonzero(signatures[:, 0] != _EMPTY)
+    count = len(signatures)
+    accepted = [np.zeros(0, dtype=np.int64)]
+    candidates = 0
+    for band in range(bands):
+        pairs = _band_candidates(signatures, present, band, rows)
+        candidates += len(pairs)
+        similarity = estimated_similarity(signatures, pairs[:, 0], pairs[:, 1])
+        pairs = pairs[similarity >= threshold]
+        # One integer per unordered pair de-duplicates across bands
+        accepted.append(pairs.min(axis=1) * count + pairs.max(axis=1))
+    codes = np.unique(np.concatenate(accepted))
+    left, right = codes // count, codes % count
+    return left, right, estimated_similarity(signatures, left, right), candidates
+
+def estimated_similarity(signatures, left, right):
+    """Share of equal MinHash values, an unbiased estimate of the Jaccard similarity"""
+    return (signatures[left] == signatures[right]).mean(axis=1)
+
+def _clusters(signatures, left, right, threshold):
+    """(positions, similarities) per cluster; every member reaches the threshold against the first position
+
+    The accepted pairs only propose groups: each connected component is split
+    by taking its smallest unassigned position as representative and attaching
+    the positions similar enough to it, so similarity cannot chain through a
+    drift of rewordings.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    for first, second in zip(left.tolist(), right.tolist()):
+        first, second = find(first), find(second)
+        if first != second:
+            parent[max(first, second)] = min(first, second)
+    components = {}
+    for position in sorted(set(left.tolist()) | set(right.tolist())):
+        components.setdefault(find(position), []).append(position)
+
+    clusters = []
+    for component in components.values():
+        remaining = np.asarray(component)
+        while len(remaining) > 1:
+            representative, others = remaining[0], remaining[1:]
+            scores = estimated_similarity(signatures, np.full(len(others), representative), others)
+            attached = scores >= threshold
+            if attached.any():
+                clusters.append(([int(representative)] + others[attached].tolist(), scores[attached]))
+            remaining = others[~attached]
+    return sorted(clusters, key=lambda cluster: cluster[0][0])
+
+
+class DuplicateDetector:
+    """Finds clusters of reworded requirements"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE,
+                 seed=DEFAULT_SEED):
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("shingle_size must be between 1 and 8 bytes")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+
+    def find(self, requirements):
+        """JSON-serialisable report of the duplicate clusters; the first requirement of each is kept"""
+        requirements = list(requirements)
+        signatures = minhash_signatures((req.get('description') for req in requirements),
+                                        self.num_perm, self.shingle_size, self.seed)
+        left, right, _, candidates = similar_pairs(signatures, self.bands, self.rows, self.threshold)
+
+        clusters = []
+        for positions, scores in _clusters(signatures, left, right, self.threshold):
+            clusters.append({
+                'representative': requirements[positions[0]].get('req_id'),
+                'members': [{'req_id': requirements[member].get('req_id'), 'similarity': round(float(score), 3)}
+                            for member, score in zip(positions[1:], scores)]
+            })
+
+        return {
+            'requirements': len(requirements),
+            'threshold': self.threshold,
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'rows': self.rows,
+            'candidate_pairs': candidates,
+            'duplicate_pairs': int(len(left)),
+            'clusters': clusters
+        }
+
+def apply_duplicates(requirements, report, mode='link'):
+    """Link duplicates to their representative or merge them into it
+
+    link keeps every requirement, marks the members with status Duplicate and
+    a duplicate_of reference. merge drops the members, records them as
+    merged_from on the representative and redirects references to them.
+    """
+    if mode not in ('link', 'merge'):
+        raise ValueError(f"Unknown duplicate handling mode: {mode}")
+    representative_of = {member['req_id']: cluster['representative']
+                         for cluster in report['clusters'] for member in cluster['members']}
+    if not representative_of:
+        return requirements
+
+    if mode == 'link':
+        for req in requirements:
+            representative = representative_of.get(req.get('req_id'))
+            if representative is not None:
+                req['status'] = DUPLICATE_STATUS
+                req['duplicate_of'] = representative
+        return requirements
+
+    merged = {cluster['representative']: [member['req_id'] for member in cluster['members']]
+              for cluster in report['clusters']}
+    kept = []
+    for req in requirements:
+        req_id = req.get('req_id')
+        if req_id in representative_of:
+            continue
+        if req_id in merged:
+            req['merged_from'] = merged[req_id]
+        for field in ('parent_requirements', 'child_requirements'):
+            links = req.get(field)
+            if links and any(link in representative_of for link in links):
+                redirected = (representative_of.get(link, link) for link in links)
+                req[field] = [link for link in dict.fromkeys(redirected) if link != req_id]
+        kept.append(req)
+    return kept
+
+
+def main():
+    import argparse
+    from requirement_record import json_default
+    from requirement_stream import iter_requirement_records
+
+    parser = argparse.ArgumentParser(description="Find reworded copies among the requirements")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json',
+                        help="requirements.json or a Parquet/Arrow export")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum estimated Jaccard similarity of the description shingles")
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM)
+    parser.add_argument('--report', help="Write the JSON cluster report here (stdout when omitted)")
+    parser.add_argument('--apply', choices=['link', 'merge'],
+                        help="Link or merge the duplicates and write the requirements to --output")
+    parser.add_argument('--output', help="requirements.json written by --apply")
+    args = parser.parse_args()
+
+    if args.apply and not args.output:
+        parser.error("--apply needs --output")
+
+    requirements = list(iter_requirement_records(args.requirements))
+    detector = DuplicateDetector(args.threshold, args.num_perm)
+    report = detector.find(requirements)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.apply:
+        requirements = apply_duplicates(requirements, report, args.apply)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(requirements, f, indent=2, default=json_default)
+
+    duplicates = sum(len(cluster['members']) for cluster in report['clusters'])
+    print(f"🔁 {len(report['clusters'])} duplicate clusters, {duplicates} duplicates among "
+          f"{report['requirements']} requirements ({report['candidate_pairs']} candidate pairs, "
+          f"{detector.bands} bands x {detector.rows} rows)", file=sys.stderr)
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Streaming Requirement Extraction Engine
+Reads DOCX (ZIP/XML) and text-layer PDF specifications section by section
+and emits requirement records in the generator's req_data schema
+"""
+
+import os
+import re
+import json
+import zipfile
+import logging
+from collections import deque
+from xml.etree import ElementTree
+
+from quantity_extraction import QUANTITY_PATTERN, extract_quantities
+from requirement_graph import section_key
+
+logger = logging.getLogger(__name__)
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+SHALL_PATTERN = re.compile(r'\bshall\b', re.IGNORECASE)
+REQ_ID_PATTERN = re.compile(r'^\s*\[?((?:RTM|REQ|SRS|TR)[-_]\d+(?:\.\d+)*)\]?\s*[:.\-–]?\s*')
+HEADING_PATTERN = re.compile(r'^(\d+(?:\.\d+){1,6}|\d+)\.?\s+([A-Z][^\n]{2,118})$')
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z(“"])')
+HEADING_STYLE_PATTERN = re.compile(r'^(?:heading|titre|berschrift)\s*(\d)$', re.IGNORECASE)
+
+CATEGORY_KEYWORDS = [
+    ('Maintenance', ['maintenance', 'standby', 'warm stop']),
+    ('Lifetime', ['lifetime', 'life time']),
+    ('Safety', ['safety', 'purge', 'relief', 'interlock']),
+    ('Performance', ['capacity', 'rate', 'flow', 'performance', 'efficiency']),
+    ('Interface', ['interface', 'connection']),
+]
+
+# Trailing revision stamps: 'Spec_1209_0948.pdf' and 'Spec_1209_1547.docx' are one specification
+REVISION_SUFFIX = re.compile(r'(?:[ _-](?:v|rev)?\d+)+$', re.IGNORECASE)
+
+# Upper bound for a single buffered requirement unit, keeps memory flat on
+# malformed documents that never terminate a sentence
+MAX_UNIT_CHARS = 8000
+
+def _normalise(text):
+    """Collapse whitespace in extracted text"""
+    return ' '.join(text.split())
+
+def specification_key(name):
+    """Document name without extension and revision stamps"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return REVISION_SUFFIX.sub('', stem).strip().lower() or stem.lower()
+
+def _categorise(section, text):
+    """Derive the requirement category from section title and text"""
+    haystack = f"{section} {text}".lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in haystack for keyword in keywords):
+            return category
+    return 'Operational'
+
+def _numerical_value(text):
+    """Return the quantities mentioned in a requirement, N/A when none"""
+    values = list(dict.fromkeys(quantity.text for quantity in extract_quantities(text)))
+    return ', '.join(values) if values else 'N/A'
+
+
+class SectionSegmenter:
+    """Turns a stream of text blocks into requirement records with constant state"""
+
+    def __init__(self, source_document, id_prefix='RTM', start_index=1):
+        self.source_document = source_document
+        self.id_prefix = id_prefix
+        self.next_index = start_index
+        self.section = ''
+        self.pending = ''
+        self.pending_id = None
+        self.heading_counters = []
+
+    def heading(self, title, number=None, level=None):
+        """Start a new section; numbers are synthesised from levels when missing"""
+        yield from self.flush()
+        if number is None and level is not None:
+            del self.heading_counters[level:]
+            while len(self.heading_counters) < level:
+                self.heading_counters.append(0)
+            self.heading_counters[level - 1] += 1
+            number = '.'.join(str(counter) for counter in self.heading_counters)
+        elif number is not None:
+            self.heading_counters = [int(part) for part in number.split('.') if part.isdigit()]
+        self.section = f"{number} {title}".strip() if number else title
+
+    def feed(self, block, paragraph=False):
+        """Consume one paragraph (DOCX) or line (PDF/text)"""
+        block = _normalise(block)
+        if not block:
+            if not paragraph:
+                yield from self.flush()
+            return
+
+        heading = HEADING_PATTERN.match(block)
+        if heading and not SHALL_PATTERN.search(block) and not block.endswith('.') \
+                and not self._sentence_open() and not QUANTITY_PATTERN.match(block):
+            yield from self.heading(heading.group(2).strip(), number=heading.group(1))
+            return
+
+        tagged = REQ_ID_PATTERN.match(block)
+        if tagged:
+            yield from self.flush()
+            self.pending_id = tagged.group(1).replace('_', '-')
+            block = block[tagged.end():]
+            if not block:
+                return  # ID in its own table cell, text follows in the next block
+
+        self.pending = f"{self.pending} {block}".strip()
+
+        if self.pending_id is None:
+            parts = SENTENCE_END_PATTERN.split(self.pending)
+            self.pending = parts.pop()
+            for sentence in parts:
+                yield from self._emit(sentence)
+            if paragraph or len(self.pending) > MAX_UNIT_CHARS:
+                yield from self.flush()
+        elif paragraph or len(self.pending) > MAX_UNIT_CHARS:
+            yield from self.flush()
+
+    def _sentence_open(self):
+        """True while the buffered text stops mid-sentence, so the next line continues it"""
+        return bool(self.pending) and self.pending[-1] not in '.!?:;'
+
+    def flush(self):
+        """Emit whatever is buffered for the current unit"""
+        if self.pending_id is not None:
+            yield from self._emit(self.pending, self.pending_id)
+        else:
+            for sentence in SENTENCE_END_PATTERN.split(self.pending):
+                yield from self._emit(sentence)
+        self.pending = ''
+        self.pending_id = None
+
+    def _emit(self, text, req_id=None):
+        """Build a record when the text is a shall statement"""
+        text = text.strip()
+        if not text or not SHALL_PATTERN.search(text):
+            return
+        explicit_id = req_id is not None
+        if req_id is None:
+            req_id = f"{self.id_prefix}-{self.next_index:03d}"
+            self.next_index += 1
+        yield {
+            'req_id': req_id,
+            'description': text,
+            'section': self.section,
+            'category': _categorise(self.section, text),
+            'numerical_value': _numerical_value(text),
+            'source_document': os.path.basename(self.source_document),
+            'explicit_id': explicit_id
+        }
+
+
+def merge_records(records, id_prefix='RTM'):
+    """Collapse revisions of the same requirement read from several specifications; returns (records, conflicts)
+
+    Only documents sharing a specification_key are revisions of each other
+    ('Spec_1209_0948.pdf' and 'Spec_1209_1547.docx'); they are read in the
+    order project.yml lists them, so the later record wins but keeps the
+    position where the requirement first appeared. Requirements with an ID in
+    the document are matched by that ID, the others by section number and
+    ordinal within the section of the same specification; unrelated
+    specifications never collapse. Generated IDs are renumbered so they stay
+    unique. Differing descriptions are reported as conflicts.
+    """
+    merged = {}
+    replaced = {}
+    ordinals = {}
+    for record in records:
+        if record.get('explicit_id', True):
+            key = ('id', record['req_id'])
+        else:
+            document = record.get('source_document') or ''
+            section = section_key(record.get('section'))
+            counter = (document, section)
+            ordinals[counter] = ordinals.get(counter, 0) + 1
+            key = ('section', specification_key(document), section, ordinals[counter])
+        previous = merged.get(key)
+        if previous is not None and _normalise(previous['description']) != _normalise(record['description']):
+            replaced[key] = previous.get('source_document')
+        merged[key] = record
+
+    results = []
+    conflicts = []
+    next_index = 1
+    for key, record in merged.items():
+        if not record.get('explicit_id', True):
+            record = dict(record, req_id=f"{id_prefix}-{next_index:03d}")
+            next_index += 1
+        if key in replaced:
+            conflicts.append({
+                'req_id': record['req_id'],
+                'kept': record.get('source_document'),
+                'replaced': replaced[key]
+            })
+        results.append(record)
+    return results, conflicts
+
+
+def iter_docx_blocks(path):
+    """Stream (kind, text, level) tuples from word/document.xml without loading the tree"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open('word/document.xml') as document:
+            body = None
+            style = None
+            texts = []
+            depth = 0
+            for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+                if event == 'start' and element.tag == f'{WORD_NS}body':
+                    body = element
+                elif element.tag == f'{WORD_NS}p':
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            style, texts = None, []
+                        continue
+                    depth -= 1
+                    if depth == 0:
+                        text = ''.join(texts)
+                        level = HEADING_STYLE_PATTERN.match(style or '')
+                        if level:
+                            yield 'heading', text, int(level.group(1))
+                        else:
+                            yield 'paragraph', text, None
+                        # Drop finished elements so memory stays flat on huge documents
+                        element.clear()
+                        if body is not None:
+                            body.clear()
+                elif event == 'end' and depth:
+                    if element.tag == f'{WORD_NS}t' and element.text:
+                        texts.append(element.text)
+                    elif element.tag in (f'{WORD_NS}tab', f'{WORD_NS}br'):
+                        texts.append(' ')
+                    elif element.tag == f'{WORD_NS}pStyle':
+                        style = element.get(f'{WORD_NS}val')
+
+
+def _pdf_page_count(path):
+    """Number of pages in a PDF"""
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_pdf_pages(path, start, stop):
+    """Extract the text layer of a page range (runs inside worker processes)"""
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return [reader.pages[index].extract_text() or '' for index in range(start, stop)]
+
+
+def _bounded_ordered_map(executor, function, argument_tuples, max_in_flight):
+    """Like executor.map, but never queues more than max_in_flight tasks"""
+    in_flight = deque()
+    for arguments in argument_tuples:
+        in_flight.append(executor.submit(function, *arguments))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+class RequirementExtractor:
+    """Streams requirement records out of specification documents"""
+
+    def __init__(self, workers=None, pages_per_task=16, id_prefix='RTM'):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.id_prefix = id_prefix
+
+    def iter_requirements(self, paths):
+        """Yield req_data records for every document in order"""
+        next_index = 1
+        for path in paths:
+            segmenter = SectionSegmenter(path, self.id_prefix, next_index)
+            extension = os.path.splitext(path)[1].lower()
+            count = 0
+
+            if extension == '.docx':
+                blocks = self._docx_records(path, segmenter)
+            elif extension == '.pdf':
+                blocks = self._pdf_records(path, segmenter)
+            elif extension in ('.txt', '.text'):
+                blocks = self._text_records(path, segmenter)
+            else:
+                logger.warning(f"Unsupported specification format: {path}")
+                continue
+
+            for record in blocks:
+                count += 1
+                yield record
+            next_index = segmenter.next_index
+            logger.info(f"Extracted {count} requirements from {os.path.basename(path)}")
+
+    def _docx_records(self, path, segmenter):
+        """Requirements from a DOCX document, paragraph by paragraph"""
+        for kind, text, level in iter_docx_blocks(path):
+            if kind == 'heading':
+                text = _normalise(text)
+                numbered = HEADING_PATTERN.match(text)
+                if numbered:
+                    yield from segmenter.heading(numbered.group(2), number=numbered.group(1))
+                elif text:
+                    yield from segmenter.heading(text, level=level)
+            else:
+                yield from segmenter.feed(text, paragraph=True)
+        yield from segmenter.flush()
+
+    def _pdf_records(self, path, segmenter):
+        """Requirements from a text-layer PDF, extracting page ranges in parallel"""
+        page_count = _pdf_page_count(path)
+        ranges = [(path, start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+
+        if self.workers == 1 or len(ranges) == 1:
+            pages = (_extract_pdf_pages(*arguments) for arguments in ranges)
+            yield from self._feed_pages(pages, segmenter)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                pages = _bounded_ordered_map(executor, _extract_pdf_pages, ranges, self.workers * 2)
+                yield from self._feed_pages(pages, segmenter)
+        yield from segmenter.flush()
+
+    def _feed_pages(self, page_batches, segmenter):
+        """Feed page text line by line; sentences may continue across pages"""
+        for batch in page_batches:
+            for page_text in batch:
+                for line in page_text.splitlines():
+                    yield from segmenter.feed(line)
+
+    def _text_records(self, path, segmenter):
+        """Requirements from a plain text dump (e.g. pdftotext output)"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                yield from segmenter.feed(line.replace('\f', ''))
+        yield from segmenter.flush()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream requirements out of specification documents")
+    parser.add_argument('documents', nargs='+', help="DOCX, PDF or text specification files")
+    parser.add_argument('--output', help="JSON Lines output file (stdout when omitted)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--pages-per-task', type=int, default=16)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    extractor = RequirementExtractor(workers=args.workers, pages_per_task=args.pages_per_task)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        count = 0
+        for record in extractor.iter_requirements(args.documents):
+            line = json.dumps(record, ensure_ascii=False)
+            if output:
+                output.write(line + '\n')
+            else:
+                print(line)
+            count += 1
+        logger.info(f"Extracted {count} requirements in total")
+    finally:
+        if output:
+            output.close()
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Requirement Graph
+Indexes requirements by req_id with parent/child adjacency lists, derives the
+hierarchy from source section numbers and configured grouping rules, and
+answers impact, depth and cycle queries without rescanning the RTM
+"""
+
+import os
+import re
+from collections import deque
+
+import yaml
+
+HIERARCHY_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config',
+                                'requirement_hierarchy.yml')
+
+SECTION_NUMBER_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)*)')
+
+def load_hierarchy_rules(config_path=HIERARCHY_CONFIG):
+    """Grouping rules from requirement_hierarchy.yml"""
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    rules = config.get('rules') or []
+    for rule in rules:
+        if rule.get('type') not in ('section', 'group'):
+            raise ValueError(f"{os.path.basename(config_path)}: unknown rule type {rule.get('type')!r}")
+    return rules
+
+def section_key(source_section):
+    """Section number of a source section ('3.2.1 Lifetime' -> '3.2.1'), else the title"""
+    match = SECTION_NUMBER_PATTERN.match(source_section or '')
+    return match.group(1) if match else (source_section or '').strip()
+
+class RequirementGraph:
+    """Directed parent -> child graph over requirement IDs"""
+
+    def __init__(self, req_ids=()):
+        # Insertion-ordered dicts double as ordered sets
+        self.index = {}
+        self.parents = {}
+        self.children = {}
+        self._depths = None
+        for req_id in req_ids:
+            self.add_node(req_id)
+
+    @classmethod
+    def from_requirements(cls, requirements, keep_links=True):
+        """Index requirements; existing parent/child fields become edges when keep_links is set"""
+        graph = cls(req['req_id'] for req in requirements)
+        if keep_links:
+            for req in requirements:
+                for parent_id in req.get('parent_requirements', []):
+                    graph.add_edge(parent_id, req['req_id'])
+                for child_id in req.get('child_requirements', []):
+                    graph.add_edge(req['req_id'], child_id)
+        return graph
+
+    def add_node(self, req_id):
+        if req_id not in self.index:
+            self.index[req_id] = len(self.index)
+            self.parents[req_id] = {}
+            self.children[req_id] = {}
+
+    def add_edge(self, parent_id, child_id):
+        """Link two known requirements; returns False for unknown IDs and self links"""
+        if parent_id == child_id or parent_id not in self.index or child_id not in self.index:
+            return False
+        self.children[parent_id][child_id] = None
+        self.parents[child_id][parent_id] = None
+        self._depths = None
+        return True
+
+    def __contains__(self, req_id):
+        return req_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def edge_count(self):
+        return sum(len(children) for children in self.children.values())
+
+    # Hierarchy derivation
+
+    def apply_rules(self, rules, requirements):
+        """Add the edges described by the grouping rules"""
+        for rule in rules:
+            if rule['type'] == 'section':
+                self.link_sections(requirements, nest=rule.get('nest', True))
+            elif rule['type'] == 'group':
+                members = [req_id for req_id in rule.get('members', []) if req_id in self.index]
+                for child_id in members[1:]:
+                    self.add_edge(members[0], child_id)
+
+    def link_sections(self, requirements, nest=True):
+        """First requirement of a section is the parent of the rest of that section"""
+        leads = {}
+        for req in requirements:
+            key = section_key(req.get('source_section', ''))
+            if not key:
+                continue
+            lead = leads.get(key)
+            if lead is None:
+                leads[key] = req['req_id']
+                if nest:
+                    parent_lead = self._enclosing_lead(key, leads)
+                    if parent_lead is not None:
+                        self.add_edge(parent_lead, req['req_id'])
+            else:
+                self.add_edge(lead, req['req_id'])
+
+    @staticmethod
+    def _enclosing_lead(key, leads):
+        """Lead requirement of the nearest enclosing numbered section seen so far"""
+        parts = key.split('.')
+        if not parts[0].isdigit():
+            return None
+        for length in range(len(parts) - 1, 0, -1):
+            lead = leads.get('.'.join(parts[:length]))
+            if lead is not None:
+                return lead
+        return None
+
+    # Queries
+
+    def _walk(self, start_ids, adjacency):
+        seen = {}
+        queue = deque(req_id for req_id in start_ids if req_id in self.index)
+        starts = set(queue)
+        while queue:
+            for neighbour in adjacency[queue.popleft()]:
+                if neighbour not in seen and neighbour not in starts:
+                    seen[neighbour] = None
+                    queue.append(neighbour)
+        return list(seen)
+
+    def upstream(self, *req_ids):
+        """All ancestors of the given requirements, nearest first"""
+        return self._walk(req_ids, self.parents)
+
+    def downstream(self, *req_ids):
+        """All descendants of the given requirements, nearest first"""
+        return self._walk(req_ids, self.children)
+
+    def impact(self, *req_ids):
+        """Requirements affected by a change: everything up and down the trace"""
+        return {'upstream': self.upstream(*req_ids), 'downstream': self.downstream(*req_ids)}
+
+    def topological_order(self):
+        """Kahn's algorithm; returns (order, nodes left on cycles)"""
+        remaining = {req_id: len(parents) for req_id, parents in self.parents.items()}
+        queue = deque(req_id for req_id, count in remaining.items() if count == 0)
+        order = []
+        while queue:
+            req_id = queue.popleft()
+            order.append(req_id)
+            for child_id in self.children[req_id]:
+                remaining[child_id] -= 1
+                if remaining[child_id] == 0:
+                    queue.append(child_id)
+        cyclic = [req_id for req_id, count in remaining.items() if count > 0]
+        return order, cyclic
+
+    def cyclic_nodes(self):
+        """Requirements on a cycle or on a path between two cycles"""
+        _, cyclic = self.topological_order()
+        # Kahn leaves nodes below a cycle too; peel those off from the child side
+        on_cycle = set(cyclic)
+        out_degree = {req_id: sum(child in on_cycle for child in self.children[req_id]) for req_id in cyclic}
+        queue = deque(req_id for req_id, count in out_degree.items() if count == 0)
+        while queue:
+            req_id = queue.popleft()
+            on_cycle.discard(req_id)
+            for parent_id in self.parents[req_id]:
+                if parent_id in on_cycle:
+                    out_degree[parent_id] -= 1
+                    if out_degree[parent_id] == 0:
+                        queue.append(parent_id)
+        return [req_id for req_id in cyclic if req_id in on_cycle]
+
+    def strongly_connected_components(self):
+        """Tarjan's algorithm over the cyclic remainder; components of two or more requirements, sorted by ID"""
+        _, remaining = self.topological_order()
+        candidates = set(remaining)
+        order, low = {}, {}
+        stack, on_stack = [], set()
+        components = []
+        for root in remaining:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.children[root]))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in candidates:
+                        continue
+                    if child not in order:
+                        order[child] = low[child] = len(order)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.children[child])))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], order[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == order[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            components.append(sorted(component))
+        return sorted(components)
+
+    def find_cycles(self):
+        """One representative cycle per strongly connected component, as ID lists
+
+        The cycle is the shortest one through the component's smallest ID, searched
+        in ID order so it depends neither on record order nor on link order.
+        """
+        cycles = []
+        for component in self.strongly_connected_components():
+            members = set(component)
+            start = component[0]
+            previous = {start: None}
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                children = sorted(child for child in self.children[node] if child in members)
+                if start in children:
+                    break
+                for child in children:
+                    if child not in previous:
+                        previous[child] = node
+                        queue.append(child)
+            cycle = []
+            while node is not None:
+                cycle.append(node)
+                node = previous[node]
+            cycles.append(cycle[::-1])
+        return cycles
+
+    def depths(self):
+        """Longest distance from a root for every acyclic requirement"""
+        order, _ = self.topological_order()
+        depth = {}
+        for req_id in order:
+            depth[req_id] = max((depth[parent] + 1 for parent in self.parents[req_id]), default=0)
+        return depth
+
+    def depth(self, req_id):
+        """Depth of one requirement (0 for roots), None when it sits on or below a cycle"""
+        if self._depths is None:
+            self._depths = self.depths()
+        return self._depths.get(req_id)
+
+    # Serialisation
+
+    def write_links(self, requirements):
+        """Store the adjacency lists in parent_requirements / child_requirements"""
+        for req in requirements:
+            req['parent_requirements'] = list(self.parents.get(req['req_id'], ()))
+            req['child_requirements'] = list(self.children.get(req['req_id'], ()))
+        return requirements
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Query the requirement trace graph")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json')
+    parser.add_argument('--impact', nargs='+', metavar='REQ_ID', help="Upstream and downstream requirements")
+    parser.add_argument('--depth', nargs='+', metavar='REQ_ID')
+    parser.add_argument('--cycles', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.requirements, 'r') as f:
+        graph = RequirementGraph.from_requirements(json.load(f))
+    print(f"🔗 {len(graph)} requirements, {graph.edge_count()} links")
+
+    if args.impact:
+        impact = graph.impact(*args.impact)
+        print(f"⬆️ Upstream: {', '.join(impact['upstream']) or '-'}")
+        print(f"⬇️ Downstream: {', '.join(impact['downstream']) or '-'}")
+    for req_id in args.depth or []:
+        print(f"📏 {req_id}: depth {graph.depth(req_id) if req_id in graph else 'unknown'}")
+    if args.cycles:
+        cycles = graph.find_cycles()
+        for cycle in cycles:
+            print(f"🔁 {' -> '.join(cycle + cycle[:1])}")
+        print(f"{'❌' if cycles else '✅'} {len(cycles)} cycles")
+        return not cycles
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Compact Requirement Records
+Slotted stand-in for the 18-key requirement dict: enum-like values are
+interned, full_description is only stored when it differs from description,
+empty link lists cost nothing, and the record still behaves as a mapping:
+link lists are stored and handed out as the same list, so in-place edits stick
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+
+# Requirement fields in the order the generator writes them
+FIELDS = (
+    'req_id', 'description', 'full_description', 'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3',
+    'requirement_type', 'verification_method', 'acceptance_criteria', 'priority', 'source_section',
+    'parent_requirements', 'child_requirements', 'status', 'rationale', 'category', 'numerical_value'
+)
+# Values drawn from a small vocabulary; every record shares one string object per value
+INTERNED_FIELDS = frozenset((
+    'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'requirement_type', 'verification_method', 'priority',
+    'status', 'category', 'rationale', 'source_section', 'acceptance_criteria', 'numerical_value'
+))
+LINK_FIELDS = frozenset(('parent_requirements', 'child_requirements'))
+
+_MISSING = object()
+_SAME_AS_DESCRIPTION = object()
+_NO_LINKS = object()
+
+def _store(field, value):
+    """Internal representation of a field value"""
+    if field in LINK_FIELDS and type(value) is list and not value:
+        return _NO_LINKS
+    if field in INTERNED_FIELDS and type(value) is str:
+        return sys.intern(value)
+    return value
+
+def _load(record, field, value):
+    if value is _NO_LINKS:
+        return _EmptyLinks(record, field)
+    return value
+
+
+class _EmptyLinks(list):
+    """Empty link list read from a record; stores itself in the record once it is added to"""
+
+    __slots__ = ('_record', '_field')
+
+    def __init__(self, record, field):
+        super().__init__()
+        self._record = record
+        self._field = field
+
+    def _attach(self):
+        # Only while the record still has no links of its own for the field
+        if self._record is not None and getattr(self._record, self._field) is _NO_LINKS:
+            setattr(self._record, self._field, self)
+        self._record = None
+
+    def append(self, value):
+        self._attach()
+        super().append(value)
+
+    def extend(self, values):
+        self._attach()
+        super().extend(values)
+
+    def insert(self, index, value):
+        self._attach()
+        super().insert(index, value)
+
+    def __iadd__(self, values):
+        self._attach()
+        return super().__iadd__(values)
+
+    def __setitem__(self, index, value):
+        self._attach()
+        super().__setitem__(index, value)
+
+
+class RequirementRecord(MutableMapping):
+    """One requirement; reads and writes like the dict produced by the generator"""
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, fields=(), **kwargs):
+        fields = dict(fields, **kwargs) if kwargs or not isinstance(fields, dict) else fields
+        present = 0
+        for field in FIELDS:
+            value = fields.get(field, _MISSING)
+            if value is not _MISSING:
+                present += 1
+                value = _store(field, value)
+            setattr(self, field, value)
+        if self.full_description is not _MISSING and self.full_description == self.description:
+            self.full_description = _SAME_AS_DESCRIPTION
+        self._extra = None
+        if present < len(fields):
+            self._extra = {field: value for field, value in fields.items() if field not in _SLOT_FIELDS}
+
+    @classmethod
+    def from_dict(cls, req):
+        return req if isinstance(req, cls) else cls(req)
+
+    def to_dict(self):
+        """Plain dict in the generator's field order, equal to the one the record was built from"""
+        req = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is _MISSING:
+                continue
+            if value is _SAME_AS_DESCRIPTION:
+                value = self.description
+            elif field in LINK_FIELDS:
+                value = [] if value is _NO_LINKS else list(value)
+            req[field] = value
+        if self._extra:
+            req.update(self._extra)
+        return req
+
+    def __getitem__(self, field):
+        if field in _SLOT_FIELDS:
+            value = getattr(self, field)
+            if value is _MISSING:
+                raise KeyError(field)
+            if value is _SAME_AS_DESCRIPTION:
+                return self.description
+            return _load(self, field, value)
+        if self._extra is None or field not in self._extra:
+            raise KeyError(field)
+        return self._extra[field]
+
+    def get(self, field, default=None):
+        # Mapping.get goes through a KeyError for every absent field; this is the hot path
+        if field in _SLOT_FIELDS:
+            value = getattr(self, field)
+            if value is _MISSING:
+                return default
+            if value is _SAME_AS_DESCRIPTION:
+                return self.description
+            return _load(self, field, value)
+        return default if self._extra is None else self._extra.get(field, default)
+
+    def __setitem__(self, field, value):
+        if field == 'full_description' and value is not _MISSING and value == self.get('description', _MISSING):
+            value = _SAME_AS_DESCRIPTION
+        elif field == 'description' and self.full_description is not _MISSING:
+            # Keep full_description's value when only description changes
+            full = self['full_description']
+            self.full_description = _SAME_AS_DESCRIPTION if full == value else full
+        if field in _SLOT_FIELDS:
+            setattr(self, field, _store(field, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[field] = value
+
+    def __delitem__(self, field):
+        if field in _SLOT_FIELDS:
+            if getattr(self, field) is _MISSING:
+                raise KeyError(field)
+            if field == 'description' and self.full_description is _SAME_AS_DESCRIPTION:
+                self.full_description = self.description
+            setattr(self, field, _MISSING)
+        elif self._extra is not None and field in self._extra:
+            del self._extra[field]
+        else:
+            raise KeyError(field)
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, field):
+        if field in _SLOT_FIELDS:
+            return getattr(self, field) is not _MISSING
+        return self._extra is not None and field in self._extra
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RequirementRecord({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+_SLOT_FIELDS = frozenset(FIELDS)
+
+
+def json_default(value):
+    """json.dump default= hook that writes records as their dicts"""
+    if isinstance(value, RequirementRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def compact_requirements(requirements):
+    """Records for dicts (records pass through)"""
+    return [RequirementRecord.from_dict(req) for req in requirements]
+
+def requirement_dicts(requirements):
+    """Plain dicts for records (dicts pass through), e.g. before json.dump"""
+    return [req.to_dict() if isinstance(req, RequirementRecord) else req for req in requirements]
+
+
+def _deep_size(objects):
+    """Bytes allocated for the objects, measured by building them under tracemalloc"""
+    import tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = objects()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return built, size
+
+def main():
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Compare memory and speed of dict and slotted requirements")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json')
+    parser.add_argument('--count', type=int, default=1000000, help="Requirements to synthesise from the input")
+    args = parser.parse_args()
+
+    from requirement_stream import iter_requirement_records
+    from rtm_statistics import RequirementStatistics
+
+    base = list(iter_requirement_records(args.requirements))
+    if not base:
+        print("❌ No requirements to sample")
+        return False
+
+    def synthetic_dicts():
+        # Fresh strings per requirement, as json.load would produce them
+        requirements = []
+        for index in range(args.count):
+            req = json.loads(json.dumps(base[index % len(base)]))
+            req['req_id'] = f"RTM-{index + 1:07d}"
+            requirements.append(req)
+        return requirements
+
+    # Parse outside the measurement so both sides see identical inputs
+    source = synthetic_dicts()
+    dicts, dict_bytes = _deep_size(lambda: [json.loads(json.dumps(req)) for req in source])
+    records, record_bytes = _deep_size(lambda: compact_requirements(json.loads(json.dumps(req)) for req in source))
+    del source
+
+    timings = {}
+    start = time.perf_counter()
+    compact_requirements(dicts)
+    timings['to records'] = time.perf_counter() - start
+    start = time.perf_counter()
+    lossless = requirement_dicts(records) == dicts
+    timings['to dicts'] = time.perf_counter() - start
+    for name, requirements in (('dicts', dicts), ('records', records)):
+        start = time.perf_counter()
+        RequirementStatistics.from_requirements(requirements)
+        timings[f"statistics over {name}"] = time.perf_counter() - start
+
+    print(f"📊 Requirements: {args.count}")
+    print(f"🐢 dicts: {dict_bytes / 1e6:.1f} MB ({dict_bytes / args.count:.0f} bytes each)")
+    print(f"🚀 records: {record_bytes / 1e6:.1f} MB ({record_bytes / args.count:.0f} bytes each), "
+          f"{dict_bytes / max(record_bytes, 1):.1f}x smaller")
+    for name, seconds in timings.items():
+        print(f"⏱️ {name}: {seconds:.2f} s")
+    print(f"{'✅' if lossless else '❌'} Round trip {'is lossless' if lossless else 'differs'}")
+    return lossless
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
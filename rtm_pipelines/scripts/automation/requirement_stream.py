@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Streaming Requirement Reader
+Parses a requirements.json array one element at a time and keeps a compact
+hashed set of requirement IDs for duplicate detection on multi-GB exports
+"""
+
+import json
+import hashlib
+from array import array
+
+CHUNK_SIZE = 1 << 20
+# A single element larger than this is treated as malformed input
+MAX_ELEMENT_CHARS = 64 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE, with_text=False):
+    """Yield the elements of a top-level JSON array without loading the file
+
+    With with_text, yields (element, source text) pairs so callers can hash
+    records without serialising them again.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        offset = 0  # characters dropped from the front of the buffer
+        eof = False
+
+        def fill():
+            nonlocal buffer, position, offset, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            offset += position
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in _WHITESPACE:
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        fill()
+        skip_whitespace()
+        if position >= len(buffer) or buffer[position] != '[':
+            raise ValueError(f"{path}: expected a JSON array")
+        position += 1
+
+        expect_value = True
+        separated = False  # a comma was read since the last element
+        while True:
+            skip_whitespace()
+            if position >= len(buffer):
+                raise ValueError(f"{path}: unterminated JSON array")
+            char = buffer[position]
+            if char == ']':
+                if separated:
+                    raise ValueError(f"{path}: trailing comma before ']' at character {offset + position}")
+                return
+            if char == ',':
+                if expect_value:
+                    raise ValueError(f"{path}: unexpected ',' at character {offset + position}")
+                position += 1
+                expect_value = separated = True
+                continue
+            if not expect_value:
+                raise ValueError(f"{path}: missing ',' between array elements at character {offset + position}")
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError:
+                    if eof or len(buffer) - position > MAX_ELEMENT_CHARS:
+                        raise
+                    fill()  # the element continues in the next chunk
+            # A number cut at the chunk edge decodes short ('3.5e|10' reads as 3.5);
+            # objects and strings cannot, and a complete scalar is followed by a delimiter
+            if not eof and not isinstance(value, (dict, list, str)) and len(buffer) - end <= 2 \
+                    and buffer[end:end + 1] not in (',', ']', *_WHITESPACE):
+                fill()
+                continue
+            start, position = position, end
+            expect_value = separated = False
+            yield (value, buffer[start:end]) if with_text else value
+
+
+def iter_requirement_records(path):
+    """Stream requirements from requirements.json or a Parquet/Arrow export"""
+    from rtm_columnar import is_columnar, iter_requirements, load_table
+    if is_columnar(path):
+        return iter_requirements(load_table(path))
+    return iter_json_array(path)
+
+
+def id_hash(req_id):
+    """64-bit digest of a requirement ID"""
+    return int.from_bytes(hashlib.blake2b(str(req_id).encode('utf-8'), digest_size=8).digest(), 'little')
+
+class CompactIdSet:
+    """Open-addressing set of 64-bit ID digests remembering the first position of each
+
+    Uses two flat arrays (16 bytes per slot) instead of Python objects per ID.
+    Distinct IDs sharing a 64-bit digest would be reported as duplicates; the
+    chance is negligible below billions of IDs.
+    """
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity * 2:
+            size <<= 1
+        self._keys = array('Q', bytes(8 * size))
+        self._positions = array('q', [-1]) * size
+        self._mask = size - 1
+        self.count = 0
+
+    def add(self, req_id, position):
+        """Insert an ID; returns the first position when it was already present, else None"""
+        key = id_hash(req_id) or 1  # 0 marks empty slots
+        slot = key & self._mask
+        keys = self._keys
+        while keys[slot]:
+            if keys[slot] == key:
+                return self._positions[slot]
+            slot = (slot + 1) & self._mask
+        keys[slot] = key
+        self._positions[slot] = position
+        self.count += 1
+        if self.count * 2 > len(keys):
+            self._grow()
+        return None
+
+    def _grow(self):
+        old_keys, old_positions = self._keys, self._positions
+        size = len(old_keys) * 2
+        self._keys = array('Q', bytes(8 * size))
+        self._positions = array('q', [-1]) * size
+        self._mask = size - 1
+        for key, position in zip(old_keys, old_positions):
+            if key:
+                slot = key & self._mask
+                while self._keys[slot]:
+                    slot = (slot + 1) & self._mask
+                self._keys[slot] = key
+                self._positions[slot] = position
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return self._keys.itemsize * len(self._keys) + self._positions.itemsize * len(self._positions)
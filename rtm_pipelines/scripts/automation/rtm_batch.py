@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Multi-Project RTM Batch Generation
+Discovers project.yml files and generates every project's RTM in a process
+pool. The compiled classification rules reach each worker once through the
+pool initializer; requirements extracted from several specifications of a
+project are merged per requirement across revisions, and all projects end up in one cross-project index
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+PROJECT_FILENAMES = ('project.yml', 'project.yaml')
+DEFAULT_OUTPUT_ROOT = 'data/rtm/projects'
+INDEX_NAME = 'rtm_index.json'
+
+# Requirement fields copied into the cross-project index
+INDEX_FIELDS = (
+    'req_id', 'description', 'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'requirement_type',
+    'verification_method', 'priority', 'category', 'status', 'source_section'
+)
+
+def discover_projects(paths):
+    """project.yml files given directly or found below the given directories, in a stable order"""
+    found = set()
+    for path in paths:
+        if os.path.isfile(path):
+            found.add(os.path.abspath(path))
+            continue
+        for directory, _, files in os.walk(path):
+            found.update(os.path.abspath(os.path.join(directory, name)) for name in files
+                         if name in PROJECT_FILENAMES)
+    return sorted(found)
+
+def load_project(config_path, source_dir, output_root):
+    """Batch job description of one project.yml
+
+    rtm.source_dir and rtm.output_dir are optional and resolved against the
+    config file; project.code names the output directory and files.
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    project = config.get('project') or {}
+    rtm = config.get('rtm') or {}
+    name = project.get('name') or os.path.basename(os.path.dirname(config_path))
+    code = project.get('code') or re.sub(r'\W+', '_', name).strip('_')
+    base = os.path.dirname(config_path)
+    return {
+        'config': config_path,
+        'name': name,
+        'code': code,
+        'source_dir': os.path.join(base, rtm['source_dir']) if rtm.get('source_dir') else source_dir,
+        'output_dir': os.path.join(base, rtm['output_dir']) if rtm.get('output_dir') else
+        os.path.join(output_root, code),
+        'id_prefix': rtm.get('id_prefix', 'RTM'),
+    }
+
+
+# Worker processes receive the compiled rules once through the pool initializer
+_worker_rule_engine = None
+
+def _init_worker(rule_engine):
+    global _worker_rule_engine
+    _worker_rule_engine = rule_engine
+
+def generate_project(project, excel_writer='streaming', use_memo=True):
+    """Extract, classify and write one project's RTM; returns its summary and index rows"""
+    from generate_rtm import find_source_documents, write_excel
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+    from requirement_extractor import RequirementExtractor, merge_records
+    from requirement_record import json_default
+    from classification_memo import ClassificationMemo
+    from rtm_statistics import RequirementStatistics
+
+    start = time.perf_counter()
+    summary = {'name': project['name'], 'code': project['code'], 'config': project['config']}
+    documents = find_source_documents(project['source_dir'], project['config'])
+    if not documents:
+        logger.warning(f"{project['code']}: no source documents found in {project['source_dir']}, skipped")
+        return dict(summary, status='skipped', requirements=0, conflicts=[]), []
+
+    generator = ImprovedCryoplantRTMGenerator(rule_engine=_worker_rule_engine)
+    os.makedirs(project['output_dir'], exist_ok=True)
+    memo = None
+    if use_memo:
+        memo = ClassificationMemo(os.path.join(project['output_dir'], 'classification_memo.sqlite'),
+                                  generator.classification_version)
+        generator.memo = memo
+    try:
+        # One process per project already keeps the cores busy; extract in-process
+        extractor = RequirementExtractor(workers=1, id_prefix=project['id_prefix'])
+        records, conflicts = merge_records(extractor.iter_requirements(documents), project['id_prefix'])
+        requirements = generator.establish_parent_child_relationships(generator.build_requirements(records))
+        statistics = RequirementStatistics.from_requirements(requirements)
+
+        outputs = {
+            'excel': os.path.join(project['output_dir'], f"{project['code']}_RTM.xlsx"),
+            'markdown': os.path.join(project['output_dir'], f"{project['code']}_RTM.md"),
+            'json': os.path.join(project['output_dir'], 'requirements.json'),
+        }
+        write_excel(generator, requirements, outputs['excel'], statistics, excel_writer)
+        generator.create_markdown_document(requirements, outputs['markdown'], statistics=statistics)
+        with open(outputs['json'], 'w') as f:
+            json.dump(requirements, f, indent=2, default=json_default)
+    finally:
+        if memo is not None:
+            memo.close()
+
+    rows = [dict({field: req.get(field) for field in INDEX_FIELDS}, project=project['code'])
+            for req in requirements]
+    summary.update(status='generated', requirements=len(requirements), conflicts=conflicts,
+                   outputs=outputs, seconds=round(time.perf_counter() - start, 3))
+    return summary, rows
+
+def run_batch(config_paths, source_dir='docs/specs', output_root=DEFAULT_OUTPUT_ROOT, workers=None,
+              excel_writer='streaming', use_memo=True):
+    """Generate every project in a process pool and write the cross-project index; returns the index"""
+    from rule_engine import RuleEngine
+
+    projects = [load_project(path, source_dir, output_root) for path in config_paths]
+    codes = [project['code'] for project in projects]
+    clashes = sorted({code for code in codes if codes.count(code) > 1})
+    if clashes:
+        raise ValueError(f"Several projects share the code(s) {', '.join(clashes)}; set project.code")
+
+    # Compile (or load the cached) rule set once; workers get it through the initializer
+    rule_engine = RuleEngine()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(projects) or 1))
+    start = time.perf_counter()
+    summaries = []
+    requirements = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rule_engine,)) as executor:
+        futures = [executor.submit(generate_project, project, excel_writer, use_memo) for project in projects]
+        # Collect in discovery order so the index does not depend on which worker finished first
+        for project, future in zip(projects, futures):
+            try:
+                summary, rows = future.result()
+            except Exception as e:
+                logger.error(f"{project['code']}: RTM generation failed: {e}")
+                summary, rows = {'name': project['name'], 'code': project['code'], 'config': project['config'],
+                                 'status': 'failed', 'error': str(e), 'requirements': 0, 'conflicts': []}, []
+            summaries.append(summary)
+            requirements.extend(rows)
+
+    index = {
+        'generated': len([summary for summary in summaries if summary['status'] == 'generated']),
+        'workers': workers,
+        'seconds': round(time.perf_counter() - start, 3),
+        'projects': summaries,
+        'requirements': requirements
+    }
+    os.makedirs(output_root, exist_ok=True)
+    index_path = os.path.join(output_root, INDEX_NAME)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(index, indent=2, ensure_ascii=False))
+    logger.info(f"Cross-project index of {len(requirements)} requirements written to {index_path}")
+    return index
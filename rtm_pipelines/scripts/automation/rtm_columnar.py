@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Columnar RTM Export
+Writes the RTM and SBS tables as Parquet or Arrow IPC files with typed,
+dictionary-encoded columns and reads them back memory-mapped
+"""
+
+import os
+
+# Requirement fields with a small set of repeated values, stored dictionary-encoded
+CATEGORICAL_FIELDS = (
+    'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'requirement_type', 'verification_method',
+    'priority', 'source_section', 'status', 'rationale', 'category'
+)
+LIST_FIELDS = ('acceptance_criteria', 'parent_requirements', 'child_requirements', 'merged_from')
+
+# Acceptance criteria are generated as '; '-joined items and stored as a list
+CRITERIA_SEPARATOR = '; '
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+def _pyarrow():
+    import pyarrow
+    return pyarrow
+
+def rtm_schema():
+    """Arrow schema of the RTM table, in requirement field order"""
+    pa = _pyarrow()
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('req_id', pa.string()),
+        ('description', pa.string()),
+        ('full_description', pa.string()),
+        ('sbs_l0', categorical),
+        ('sbs_l1', categorical),
+        ('sbs_l2', categorical),
+        ('sbs_l3', categorical),
+        ('requirement_type', categorical),
+        ('verification_method', categorical),
+        ('acceptance_criteria', pa.list_(pa.string())),
+        ('priority', categorical),
+        ('source_section', categorical),
+        ('parent_requirements', pa.list_(pa.string())),
+        ('child_requirements', pa.list_(pa.string())),
+        ('status', categorical),
+        ('rationale', categorical),
+        ('category', categorical),
+        ('numerical_value', pa.string()),
+        # Set by duplicate detection (--dedup link / merge), null otherwise
+        ('duplicate_of', pa.string()),
+        ('merged_from', pa.list_(pa.string())),
+    ])
+
+def sbs_schema():
+    """Arrow schema of the SBS table"""
+    pa = _pyarrow()
+    return pa.schema([
+        ('sbs_id', pa.string()),
+        ('name', pa.string()),
+        ('level', pa.int8()),
+        ('parent', pa.string()),
+        ('children', pa.list_(pa.string())),
+        ('description', pa.string()),
+    ])
+
+
+class _BatchEncoder:
+    """Builds record batches whose dictionaries only ever grow
+
+    Every batch re-uses the vocabulary of the previous ones, so the Arrow IPC
+    file writer can emit dictionary deltas instead of rejecting replacements.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.vocabularies = {field.name: {} for field in schema
+                             if _pyarrow().types.is_dictionary(field.type)}
+
+    def encode(self, rows):
+        pa = _pyarrow()
+        arrays = []
+        for field in self.schema:
+            values = [row.get(field.name) for row in rows]
+            vocabulary = self.vocabularies.get(field.name)
+            if vocabulary is None:
+                arrays.append(pa.array(values, type=field.type))
+                continue
+            indices = [None if value is None else vocabulary.setdefault(value, len(vocabulary))
+                       for value in values]
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(indices, type=field.type.index_type),
+                pa.array(list(vocabulary), type=field.type.value_type)
+            ))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _open_writer(path, schema, fmt):
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, compression='zstd')
+    # Uncompressed IPC so readers can map the buffers without copying
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    return pa.ipc.new_file(path, schema, options=options)
+
+def write_table(rows, path, schema, fmt='parquet', batch_size=50000):
+    """Stream dict rows into a Parquet or Arrow IPC file in bounded batches; returns the row count"""
+    encoder = _BatchEncoder(schema)
+    count = 0
+    writer = _open_writer(path, schema, fmt)
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_batch(encoder.encode(batch))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_batch(encoder.encode(batch))
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+def _rtm_record(req, fields):
+    record = dict(req)
+    unknown = [field for field in record if field not in fields]
+    if unknown:
+        # A silently dropped field would make the export lossy
+        raise ValueError(f"{record.get('req_id')}: fields not in the RTM schema: {', '.join(unknown)}")
+    criteria = record.get('acceptance_criteria')
+    if isinstance(criteria, str):
+        record['acceptance_criteria'] = criteria.split(CRITERIA_SEPARATOR)
+    return record
+
+def _sbs_records(sbs_structure):
+    for sbs_id, sbs_info in sbs_structure.items():
+        yield {
+            'sbs_id': sbs_id,
+            'name': sbs_info['name'],
+            'level': sbs_info['level'],
+            'parent': sbs_info['parent'],
+            'children': list(sbs_info['children']),
+            'description': sbs_info['description'],
+        }
+
+def export_rtm(requirements, sbs_structure, output_dir, fmt='parquet', batch_size=50000):
+    """Write requirements.<ext> and sbs.<ext>; returns the written paths"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    rtm_path = os.path.join(output_dir, f"requirements{FORMATS[fmt]}")
+    sbs_path = os.path.join(output_dir, f"sbs{FORMATS[fmt]}")
+    schema = rtm_schema()
+    fields = frozenset(schema.names)
+    write_table((_rtm_record(req, fields) for req in requirements), rtm_path, schema, fmt, batch_size)
+    write_table(_sbs_records(sbs_structure), sbs_path, sbs_schema(), fmt, batch_size)
+    return {'requirements': rtm_path, 'sbs': sbs_path}
+
+def is_columnar(path):
+    return os.path.splitext(str(path))[1].lower() in ('.parquet', '.arrow', '.feather')
+
+def load_table(path, columns=None):
+    """Memory-map a Parquet or Arrow IPC file; Arrow IPC reads are zero-copy"""
+    pa = _pyarrow()
+    if os.path.splitext(str(path))[1].lower() == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True)
+    # The table keeps the mapping alive through its buffers
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.select(columns) if columns else table
+
+def iter_requirements(table):
+    """Yield requirement dicts in the generator schema from an RTM table"""
+    for batch in table.to_batches():
+        for record in batch.to_pylist():
+            criteria = record.get('acceptance_criteria')
+            if isinstance(criteria, list):
+                record['acceptance_criteria'] = CRITERIA_SEPARATOR.join(criteria)
+            yield {field: value for field, value in record.items() if value is not None}
+
+def load_requirements(path):
+    """Requirements from requirements.json or a columnar export"""
+    if is_columnar(path):
+        return list(iter_requirements(load_table(path)))
+    import json
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Convert requirements.json to Parquet or Arrow IPC")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+    parser.add_argument('--output-dir', default='data/rtm')
+    args = parser.parse_args()
+
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    with open(args.requirements, 'r') as f:
+        requirements = json.load(f)
+    paths = export_rtm(requirements, ImprovedCryoplantRTMGenerator().sbs_structure, args.output_dir, args.format)
+
+    reloaded = list(iter_requirements(load_table(paths['requirements'])))
+    lossless = reloaded == requirements
+    print(f"📦 {paths['requirements']} ({os.path.getsize(paths['requirements'])} bytes)")
+    print(f"📦 {paths['sbs']} ({os.path.getsize(paths['sbs'])} bytes)")
+    print(f"{'✅' if lossless else '❌'} Round trip {'is lossless' if lossless else 'differs from the JSON'}")
+    return lossless
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
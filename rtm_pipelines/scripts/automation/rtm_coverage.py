@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+RTM Coverage Engine
+SBS node x verification method and SBS node x requirement type matrices with
+subtree rollups and gap detection. Requirements are reduced to integer-coded
+columns in one pass; the matrices are bincounts over those codes by deepest
+assigned node, rolled up as prefix-sum differences over the SBS pre-order
+intervals with a sparse correction for paths through a second listed parent
+"""
+
+import os
+import json
+import time
+from array import array
+
+import numpy as np
+
+from rtm_workbook import COVERAGE_SHEETS, GAP_SHEET
+from sbs_index import ASSIGNED_FIELDS
+
+REQUIREMENTS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config',
+                                   'requirements.yml')
+
+# Matrix column field -> value list in requirements.yml
+COVERAGE_FIELDS = {
+    'verification_method': 'verification_methods',
+    'requirement_type': 'requirement_types',
+}
+
+# A node is covered when its subtree holds a requirement matching every field
+GAP_RULE = {'requirement_type': 'Safety', 'verification_method': 'Test'}
+
+UNSPECIFIED = '(unspecified)'
+
+def default_vocabularies(config_path=REQUIREMENTS_CONFIG):
+    """Configured values of every matrix field, so unused methods and types still get a column"""
+    import yaml
+    if not os.path.exists(config_path):
+        return {field: [] for field in COVERAGE_FIELDS}
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    return {field: list(config.get(key) or ()) for field, key in COVERAGE_FIELDS.items()}
+
+
+class CoverageBuilder:
+    """Folds requirements into integer codes: assigned SBS path and one code per matrix field"""
+
+    def __init__(self, sbs_index, vocabularies=None):
+        self.sbs_index = sbs_index
+        vocabularies = default_vocabularies() if vocabularies is None else vocabularies
+        self.lookup = {field: {value: code for code, value in enumerate(vocabularies.get(field, ()))}
+                       for field in COVERAGE_FIELDS}
+        # Distinct assigned code tuples -> path code; () is no known node
+        self._paths = {(): -1}
+        self._raw_paths = {}
+        self.paths = array('l')
+        self.codes = {field: array('l') for field in COVERAGE_FIELDS}
+
+    def add(self, req):
+        raw = tuple(map(req.get, ASSIGNED_FIELDS))
+        path = self._raw_paths.get(raw)
+        if path is None:
+            codes = self.sbs_index.assigned(req)
+            path = self._paths.get(codes)
+            if path is None:
+                path = self._paths[codes] = len(self._paths) - 1
+            self._raw_paths[raw] = path
+        self.paths.append(path)
+        for field, lookup in self.lookup.items():
+            value = req.get(field) or UNSPECIFIED
+            self.codes[field].append(lookup.setdefault(value, len(lookup)))
+
+    def extend(self, requirements):
+        for req in requirements:
+            self.add(req)
+        return self
+
+    def result(self):
+        return Coverage(self.sbs_index, {field: list(lookup) for field, lookup in self.lookup.items()},
+                        [codes for codes in self._paths if codes], np.asarray(self.paths, dtype=np.int64),
+                        {field: np.asarray(codes, dtype=np.int64) for field, codes in self.codes.items()})
+
+
+class Coverage:
+    """Direct and subtree matrices over the SBS pre-order; rows follow sbs_index.order
+
+    assigned lists the distinct assigned code tuples and paths indexes it
+    per requirement (-1 when no node is known). Direct counts go to the
+    deepest code of a path. Subtree counts are prefix-sum differences over
+    the pre-order intervals, which credit the parent-pointer ancestors of
+    that code, corrected per path where credited() takes another listed
+    parent (QINFRA instead of QPLANT above QRB).
+    """
+
+    def __init__(self, sbs_index, vocabularies, assigned, paths, codes, gap_rule=None):
+        self.sbs_index = sbs_index
+        self.vocabularies = vocabularies
+        self.gap_rule = dict(GAP_RULE if gap_rule is None else gap_rule)
+        count = len(sbs_index.order)
+        # Subtree of pre-order row i is rows i .. leave[i]-1
+        self._leave = np.fromiter((sbs_index.leave[sbs_id] for sbs_id in sbs_index.order),
+                                  dtype=np.int64, count=count)
+        position = {sbs_id: row for row, sbs_id in enumerate(sbs_index.order)}
+        deepest = np.fromiter((position[path[-1]] for path in assigned), dtype=np.int64, count=len(assigned))
+
+        # (path, node row, +1/-1) where the credited nodes differ from the interval ancestors
+        corrections = []
+        for row, path in enumerate(assigned):
+            tree = sbs_index.path(path[-1])
+            credited = sbs_index.credited(path)
+            if credited != tree:
+                corrections.extend((row, position[sbs_id], 1) for sbs_id in set(credited).difference(tree))
+                corrections.extend((row, position[sbs_id], -1) for sbs_id in set(tree).difference(credited))
+        corrections = np.array(corrections, dtype=np.int64).reshape(-1, 3)
+        path_rows, node_rows, signs = corrections.T
+
+        known = paths >= 0
+        self.unassigned = int(len(paths) - known.sum())
+        paths = paths[known]
+        self.direct = {}
+        self.subtree = {}
+        for field, values in vocabularies.items():
+            width = len(values)
+            by_path = np.bincount(paths * width + codes[field][known],
+                                  minlength=len(assigned) * width).reshape(len(assigned), width)
+            self.direct[field] = np.zeros((count, width), dtype=np.int64)
+            np.add.at(self.direct[field], deepest, by_path)
+            self.subtree[field] = self._rollup(self.direct[field])
+            np.add.at(self.subtree[field], node_rows, signs[:, None] * by_path[path_rows])
+
+        matches = np.ones(len(paths), dtype=bool)
+        for field, value in self.gap_rule.items():
+            code = vocabularies[field].index(value) if value in vocabularies[field] else -1
+            matches &= codes[field][known] == code
+        by_path = np.bincount(paths[matches], minlength=len(assigned))
+        self.gap_direct = np.bincount(deepest, weights=by_path, minlength=count).astype(np.int64)
+        self.gap_subtree = self._rollup(self.gap_direct[:, None])[:, 0] + \
+            np.bincount(node_rows, weights=signs * by_path[path_rows], minlength=count).astype(np.int64)
+
+    def _rollup(self, direct):
+        """Subtree sums for every node at once from one cumulative sum down the pre-order"""
+        cumulative = np.zeros((direct.shape[0] + 1, direct.shape[1]), dtype=np.int64)
+        np.cumsum(direct, axis=0, out=cumulative[1:])
+        return cumulative[self._leave] - cumulative[:-1]
+
+    def totals(self, scope='subtree'):
+        matrices = self.subtree if scope == 'subtree' else self.direct
+        return next(iter(matrices.values())).sum(axis=1)
+
+    def gap_nodes(self):
+        """SBS IDs whose subtree has no requirement matching the gap rule, in pre-order"""
+        return [self.sbs_index.order[row] for row in np.flatnonzero(self.gap_subtree == 0)]
+
+    def frame(self, field, scope='subtree'):
+        """Matrix as a DataFrame indexed by SBS ID"""
+        import pandas as pd
+        matrices = self.subtree if scope == 'subtree' else self.direct
+        return pd.DataFrame(matrices[field], index=pd.Index(self.sbs_index.order, name='SBS ID'),
+                            columns=self.vocabularies[field])
+
+    def _node_columns(self, row):
+        sbs_id = self.sbs_index.order[row]
+        info = self.sbs_index.structure[sbs_id]
+        return [sbs_id, info.get('name', ''), info.get('level', self.sbs_index.depth[sbs_id])]
+
+    def sheet_rows(self, field):
+        """Header then one row per node: direct total, subtree total and subtree counts per value"""
+        yield ['SBS ID', 'Name', 'Level', 'Direct Requirements', 'Subtree Requirements'] + self.vocabularies[field]
+        direct_totals = self.totals('direct')
+        subtree_totals = self.totals('subtree')
+        matrix = self.subtree[field]
+        for row in range(len(self.sbs_index.order)):
+            yield self._node_columns(row) + [int(direct_totals[row]), int(subtree_totals[row])] + \
+                matrix[row].tolist()
+
+    def gap_rows(self):
+        """Header then one row per gap: subtree total and subtree count of each value in the rule"""
+        rule = [(field, value, self.vocabularies[field].index(value) if value in self.vocabularies[field] else None)
+                for field, value in self.gap_rule.items()]
+        yield ['SBS ID', 'Name', 'Level', 'Parent', 'Subtree Requirements'] + \
+            [f"Subtree {value} Requirements" for _, value, _ in rule]
+        subtree_totals = self.totals('subtree')
+        for row in np.flatnonzero(self.gap_subtree == 0):
+            sbs_id = self.sbs_index.order[row]
+            yield self._node_columns(row) + [self.sbs_index.parent[sbs_id] or '', int(subtree_totals[row])] + \
+                [0 if code is None else int(self.subtree[field][row, code]) for field, _, code in rule]
+
+    def sheets(self):
+        """(sheet name, rows) for every coverage sheet of the workbook"""
+        for sheet_name, field, _ in COVERAGE_SHEETS:
+            yield sheet_name, self.sheet_rows(field)
+        yield GAP_SHEET[0], self.gap_rows()
+
+    def to_dict(self):
+        """JSON-serialisable report; matrix rows are aligned with 'nodes'"""
+        return {
+            'nodes': list(self.sbs_index.order),
+            'unassigned': self.unassigned,
+            'columns': self.vocabularies,
+            'direct': {field: matrix.tolist() for field, matrix in self.direct.items()},
+            'subtree': {field: matrix.tolist() for field, matrix in self.subtree.items()},
+            'gap_rule': self.gap_rule,
+            'gaps': self.gap_nodes()
+        }
+
+def compute_coverage(requirements, sbs_index, vocabularies=None):
+    """Coverage of any iterable of requirements"""
+    return CoverageBuilder(sbs_index, vocabularies).extend(requirements).result()
+
+
+def main():
+    import argparse
+    import sys
+    from requirement_stream import iter_requirement_records
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    parser = argparse.ArgumentParser(description="SBS coverage matrices and gaps")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json',
+                        help="requirements.json or a Parquet/Arrow export")
+    parser.add_argument('--output', help="Write the JSON report here (stdout when omitted)")
+    args = parser.parse_args()
+
+    sbs_index = ImprovedCryoplantRTMGenerator().sbs_index
+    start = time.perf_counter()
+    coverage = compute_coverage(iter_requirement_records(args.requirements), sbs_index)
+    elapsed = time.perf_counter() - start
+
+    report = coverage.to_dict()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"📄 Coverage written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    gaps = report['gaps']
+    print(f"📊 {len(sbs_index)} SBS nodes covered in {elapsed * 1000:.0f} ms", file=sys.stderr)
+    if coverage.unassigned:
+        print(f"⚠️ {coverage.unassigned} requirements without a known SBS node", file=sys.stderr)
+    print(f"{'⚠️' if gaps else '✅'} {len(gaps)} nodes without a Test-verified Safety requirement"
+          f"{': ' + ', '.join(gaps[:20]) if gaps else ''}{' ...' if len(gaps) > 20 else ''}", file=sys.stderr)
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Requirement-Level RTM Diff
+Compares two generations of requirements.json by req_id and per-field hashes
+and decides which outputs (and Markdown sections) need to be rebuilt
+"""
+
+import json
+import hashlib
+from datetime import datetime
+
+from rtm_workbook import RTM_COLUMNS
+
+# Requirement fields rendered into each output; the workbook's sheets are all built from the RTM columns
+EXCEL_FIELDS = frozenset(field for _, field in RTM_COLUMNS)
+# Read by ImprovedCryoplantRTMGenerator._markdown_category_section and the statistics in the
+# header and footer; keep in step with the renderer
+MARKDOWN_FIELDS = frozenset((
+    'req_id', 'description', 'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'requirement_type',
+    'category', 'priority', 'verification_method', 'acceptance_criteria', 'rationale',
+    'parent_requirements', 'child_requirements', 'status', 'duplicate_of', 'merged_from'
+))
+
+def requirement_keys(requirements):
+    """Stable keys by req_id; repeated IDs get an occurrence suffix"""
+    seen = {}
+    keys = []
+    for req in requirements:
+        req_id = req.get('req_id', '')
+        seen[req_id] = seen.get(req_id, 0) + 1
+        keys.append(req_id if seen[req_id] == 1 else f"{req_id}#{seen[req_id]}")
+    return keys
+
+def field_hashes(req):
+    """Short hash of every field value"""
+    return {
+        field: hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+        for field, value in req.items()
+    }
+
+def diff_requirements(previous, current):
+    """Added, removed and modified requirements keyed by req_id"""
+    previous_keys = requirement_keys(previous)
+    current_keys = requirement_keys(current)
+    previous_by_key = dict(zip(previous_keys, previous))
+    current_by_key = dict(zip(current_keys, current))
+
+    added = [key for key in current_keys if key not in previous_by_key]
+    removed = [key for key in previous_keys if key not in current_by_key]
+
+    modified = {}
+    for key in current_keys:
+        old = previous_by_key.get(key)
+        if old is None:
+            continue
+        new = current_by_key[key]
+        if old == new:
+            continue
+        old_hashes, new_hashes = field_hashes(old), field_hashes(new)
+        modified[key] = sorted(field for field in set(old_hashes) | set(new_hashes)
+                               if old_hashes.get(field) != new_hashes.get(field))
+
+    common_previous = [key for key in previous_keys if key in current_by_key]
+    common_current = [key for key in current_keys if key in previous_by_key]
+
+    return {
+        'added': added,
+        'removed': removed,
+        'modified': modified,
+        'unchanged': len(common_current) - len(modified),
+        'order_changed': common_previous != common_current
+    }
+
+def has_changes(diff):
+    return bool(diff['added'] or diff['removed'] or diff['modified'] or diff['order_changed'])
+
+def _touches(diff, fields):
+    return (bool(diff['added'] or diff['removed'] or diff['order_changed']) or
+            any(fields.intersection(changed) for changed in diff['modified'].values()))
+
+def plan_outputs(diff):
+    """Which outputs must be regenerated for this diff"""
+    return {
+        'json': has_changes(diff),
+        'excel': _touches(diff, EXCEL_FIELDS),
+        'markdown': _touches(diff, MARKDOWN_FIELDS)
+    }
+
+def affected_categories(previous, current, diff):
+    """Markdown category sections whose content or requirement order changed"""
+    def members(requirements):
+        groups = {}
+        for key, req in zip(requirement_keys(requirements), requirements):
+            groups.setdefault(req.get('category', 'General'), []).append(key)
+        return groups
+
+    previous_members = members(previous)
+    current_members = members(current)
+    markdown_modified = {key for key, fields in diff['modified'].items() if MARKDOWN_FIELDS.intersection(fields)}
+
+    affected = set()
+    for category in set(previous_members) | set(current_members):
+        keys = current_members.get(category, [])
+        if keys != previous_members.get(category) or markdown_modified.intersection(keys):
+            affected.add(category)
+    return sorted(affected)
+
+def change_report(diff, outputs, affected_sections=None):
+    """Machine-readable summary of an incremental run"""
+    return {
+        'generated': datetime.now().isoformat(),
+        'added': diff['added'],
+        'removed': diff['removed'],
+        'modified': diff['modified'],
+        'unchanged': diff['unchanged'],
+        'order_changed': diff['order_changed'],
+        'outputs': outputs,
+        'markdown_sections_rebuilt': affected_sections or []
+    }
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Bitmap-Indexed Requirement Query
+Keeps one packed bitset per value of every categorical requirement field,
+persisted next to requirements.json or the columnar export, and answers
+AND/OR/NOT filters and counts with word-wide bit operations. The SI-normalised
+quantities of every description are kept as a numeric column for range filters
+"""
+
+import os
+import re
+import json
+import time
+import operator
+
+import numpy as np
+
+from quantity_extraction import QUANTITY_KINDS, parse_quantity, quantity_columns
+
+INDEX_FIELDS = (
+    'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'requirement_type', 'priority',
+    'verification_method', 'category', 'status'
+)
+SBS_LEVEL_FIELDS = ('sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3')
+
+# Short names accepted in filters
+FIELD_ALIASES = {
+    'type': 'requirement_type',
+    'verification': 'verification_method',
+    'l0': 'sbs_l0', 'l1': 'sbs_l1', 'l2': 'sbs_l2', 'l3': 'sbs_l3',
+}
+
+# Quantity kinds by the names used in range filters, e.g. heat_load>5kW
+QUANTITY_ALIASES = {
+    'heat_load': 'power',
+    'flow': 'mass_flow',
+    'duration': 'time',
+    'cycles': 'count',
+}
+RANGE_OPERATORS = {
+    '>=': operator.ge, '≥': operator.ge, '<=': operator.le, '≤': operator.le,
+    '>': operator.gt, '<': operator.lt, '=': operator.eq,
+}
+RANGE_TERM_PATTERN = re.compile(r'^\s*(\w+)\s*(>=|<=|≥|≤|>|<|=)\s*(.+)$')
+
+# Descriptions scanned for quantities per batch while building
+QUANTITY_BATCH = 50000
+
+# Bump when the persisted layout changes
+INDEX_VERSION = 3
+
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def index_path_for(data_path):
+    return f"{data_path}.bitmaps.npz"
+
+def _source_signature(data_path):
+    stat = os.stat(data_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class BitmapIndex:
+    """Packed bitsets over requirement positions, one per (field, value)"""
+
+    def __init__(self, count, vocabularies, bitmaps, id_bytes, id_offsets, quantities):
+        self.count = count
+        self.vocabularies = vocabularies  # {field: [values]}
+        self.bitmaps = bitmaps            # {field: uint8 array (values, bytes)}
+        # IDs stay one UTF-8 blob so loading does not create a million strings
+        self.id_bytes = id_bytes
+        self.id_offsets = id_offsets
+        # Quantities of requirement i are entries offsets[i]:offsets[i + 1] of kinds/values
+        self.quantity_offsets, self.quantity_kinds, self.quantity_values = quantities
+        self._lookup = {field: {value: row for row, value in enumerate(values)}
+                        for field, values in vocabularies.items()}
+        # Zero the padding bits of the last byte after NOT
+        self._valid = np.packbits(np.ones(count, dtype=bool))
+
+    @classmethod
+    def build(cls, records):
+        """Encode every requirement once, then pack one bitset per distinct value"""
+        codes = {field: [] for field in INDEX_FIELDS}
+        lookup = {field: {} for field in INDEX_FIELDS}
+        req_ids = []
+        descriptions = []
+        quantity_batches = []
+        for req in records:
+            req_ids.append(req.get('req_id') or '')
+            descriptions.append(req.get('description') or '')
+            for field in INDEX_FIELDS:
+                value = req.get(field) or ''
+                codes[field].append(lookup[field].setdefault(value, len(lookup[field])))
+            if len(descriptions) >= QUANTITY_BATCH:
+                quantity_batches.append(quantity_columns(descriptions))
+                descriptions = []
+        quantity_batches.append(quantity_columns(descriptions))
+
+        count = len(req_ids)
+        positions = np.arange(count, dtype=np.int64)
+        byte_positions = positions >> 3
+        masks = (0x80 >> (positions & 7)).astype(np.uint8)
+        vocabularies = {}
+        bitmaps = {}
+        for field in INDEX_FIELDS:
+            # Set bit i of row codes[i]: one scatter per field, whatever the number of values
+            bitmap = np.zeros((len(lookup[field]), (count + 7) // 8), dtype=np.uint8)
+            np.bitwise_or.at(bitmap, (np.asarray(codes[field], dtype=np.int64), byte_positions), masks)
+            vocabularies[field] = list(lookup[field])
+            bitmaps[field] = bitmap
+
+        encoded = [req_id.encode('utf-8') for req_id in req_ids]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(count, vocabularies, bitmaps, np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets,
+                   _concatenate_quantities(quantity_batches))
+
+    def req_id(self, position):
+        start, end = self.id_offsets[position], self.id_offsets[position + 1]
+        return self.id_bytes[start:end].tobytes().decode('utf-8')
+
+    def save(self, path, signature):
+        meta = {'version': INDEX_VERSION, 'count': self.count, 'source': signature,
+                'vocabularies': self.vocabularies}
+        temporary = f"{path}.tmp.npz"
+        np.savez(temporary, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                 id_bytes=self.id_bytes, id_offsets=self.id_offsets,
+                 quantity_offsets=self.quantity_offsets, quantity_kinds=self.quantity_kinds,
+                 quantity_values=self.quantity_values,
+                 **{f"bitmap_{field}": bitmap for field, bitmap in self.bitmaps.items()})
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, signature=None):
+        """Persisted index, None when missing, stale or from another layout"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as archive:
+            meta = json.loads(archive['meta'].tobytes().decode('utf-8'))
+            if meta.get('version') != INDEX_VERSION or (signature is not None and meta.get('source') != signature):
+                return None
+            bitmaps = {field: archive[f"bitmap_{field}"] for field in INDEX_FIELDS}
+            quantities = (archive['quantity_offsets'], archive['quantity_kinds'], archive['quantity_values'])
+            return cls(meta['count'], meta['vocabularies'], bitmaps, archive['id_bytes'], archive['id_offsets'],
+                       quantities)
+
+    # Bit operations on packed rows
+
+    def empty(self):
+        return np.zeros_like(self._valid)
+
+    def value_bits(self, field, value):
+        row = self._lookup[field].get(value)
+        return self.empty() if row is None else self.bitmaps[field][row]
+
+    def any_of(self, field, values):
+        bits = self.empty()
+        for value in values:
+            bits |= self.value_bits(field, value)
+        return bits
+
+    def under(self, sbs_index, sbs_id):
+        """Requirements assigned anywhere in the subtree of an SBS node"""
+        subtree = sbs_index.subtree(sbs_id)
+        bits = self.empty()
+        for field in SBS_LEVEL_FIELDS:
+            bits |= self.any_of(field, subtree)
+        return bits
+
+    def quantity_bits(self, kind, compare, si_value):
+        """Requirements mentioning a quantity of the kind whose SI value passes the comparison"""
+        matched = (self.quantity_kinds == QUANTITY_KINDS.index(kind)) & compare(self.quantity_values, si_value)
+        rows = np.searchsorted(self.quantity_offsets, np.flatnonzero(matched), side='right') - 1
+        hits = np.zeros(self.count, dtype=bool)
+        hits[rows] = True
+        return np.packbits(hits)
+
+    def negate(self, bits):
+        return ~bits & self._valid
+
+    def count_bits(self, bits):
+        return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+    def positions(self, bits):
+        return np.flatnonzero(np.unpackbits(bits, count=self.count))
+
+    def counts_by(self, field, bits):
+        """Matching requirements per value of a field"""
+        return {value: self.count_bits(self.bitmaps[field][row] & bits)
+                for row, value in enumerate(self.vocabularies[field])}
+
+
+def _concatenate_quantities(batches):
+    """Join per-batch quantity columns, shifting each batch's offsets"""
+    offsets = [np.zeros(1, dtype=np.int64)]
+    for batch_offsets, kinds, _ in batches:
+        offsets.append(batch_offsets[1:] + offsets[-1][-1])
+    return (np.concatenate(offsets),
+            np.concatenate([kinds for _, kinds, _ in batches]),
+            np.concatenate([values for _, _, values in batches]))
+
+def parse_range(term):
+    """'heat_load>5kW' -> (kind, comparison, SI value), None when the term is not a range filter"""
+    match = RANGE_TERM_PATTERN.match(term)
+    if not match:
+        return None
+    kind = QUANTITY_ALIASES.get(match.group(1), match.group(1))
+    if kind not in QUANTITY_KINDS:
+        return None
+    unit_kind, si_value = parse_quantity(match.group(3))
+    if unit_kind not in (None, kind):
+        raise ValueError(f"{match.group(3).strip()} is a {unit_kind} value, not a {kind} value")
+    return kind, RANGE_OPERATORS[match.group(2)], si_value
+
+def parse_term(term):
+    """'field=a,b' / 'field!=a' -> (field, values, negated)"""
+    negated = '!=' in term
+    field, separator, values = term.partition('!=' if negated else '=')
+    if not separator:
+        raise ValueError(f"Filter term must look like field=value[,value]: {term!r}")
+    field = FIELD_ALIASES.get(field.strip(), field.strip())
+    if field not in INDEX_FIELDS and field not in ('sbs', 'under'):
+        raise ValueError(f"Unknown filter field {field!r}; use one of {', '.join(INDEX_FIELDS + ('under',))}")
+    return field, [value.strip() for value in values.split(',')], negated
+
+def evaluate(index, conditions, sbs_index=None):
+    """AND of conditions; each condition is an OR of '|'-separated terms"""
+    result = index.negate(index.empty())
+    for condition in conditions:
+        matched = index.empty()
+        for term in condition.split('|'):
+            quantity_range = parse_range(term)
+            if quantity_range is not None:
+                matched |= index.quantity_bits(*quantity_range)
+                continue
+            field, values, negated = parse_term(term)
+            if field in ('sbs', 'under'):
+                if sbs_index is None:
+                    raise ValueError("SBS subtree filters need the SBS structure")
+                unknown = [value for value in values if value not in sbs_index]
+                if unknown:
+                    raise ValueError(f"Unknown SBS node(s): {', '.join(unknown)}")
+                bits = index.empty()
+                for value in values:
+                    bits |= index.under(sbs_index, value)
+            else:
+                bits = index.any_of(field, values)
+            matched |= index.negate(bits) if negated else bits
+        result &= matched
+    return result
+
+def open_index(data_path, index_path=None, rebuild=False):
+    """Load the persisted index for the data file, building and saving it when missing or stale"""
+    from requirement_stream import iter_requirement_records
+
+    index_path = index_path or index_path_for(data_path)
+    signature = _source_signature(data_path)
+    index = None if rebuild else BitmapIndex.load(index_path, signature)
+    built = index is None
+    if built:
+        index = BitmapIndex.build(iter_requirement_records(data_path))
+        index.save(index_path, signature)
+    return index, built
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Filter requirements through persisted bitmap indexes",
+        epilog="Conditions are ANDed; inside one condition '|' ORs terms and ',' ORs values, "
+               "e.g. priority=High type=Safety under=QRB 'verification=Test|verification=Analysis'. "
+               f"Range filters compare the quantities in the description: {', '.join(QUANTITY_KINDS)} "
+               "(or heat_load, flow, duration, cycles) with >, >=, <, <= or =, e.g. 'heat_load>5kW' "
+               "'temperature<=4.5K'"
+    )
+    parser.add_argument('conditions', nargs='*',
+                        help="field=value[,value], field!=value, under=SBS_ID or kind>quantity")
+    parser.add_argument('--data', default='data/rtm/requirements.json',
+                        help="requirements.json or a Parquet/Arrow export")
+    parser.add_argument('--index', help="Index file (default: next to the data)")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index even when it is current")
+    parser.add_argument('--count', action='store_true', help="Only print the number of matches")
+    parser.add_argument('--group-by', choices=INDEX_FIELDS, help="Count matches per value of a field")
+    parser.add_argument('--limit', type=int, default=50, help="Matching IDs to print")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, built = open_index(args.data, args.index, args.rebuild)
+    opened = time.perf_counter()
+
+    sbs_index = None
+    if any(term.split('=')[0].strip() in ('sbs', 'under') for condition in args.conditions
+           for term in condition.split('|')):
+        from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+        sbs_index = ImprovedCryoplantRTMGenerator().sbs_index
+
+    try:
+        query_start = time.perf_counter()
+        bits = evaluate(index, args.conditions, sbs_index)
+        matches = index.count_bits(bits)
+        groups = index.counts_by(args.group_by, bits) if args.group_by else None
+        positions = index.positions(bits)[:args.limit] if not args.count else []
+        query_ms = (time.perf_counter() - query_start) * 1000
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    print(f"🗂️ Index {'built' if built else 'loaded'} in {(opened - start) * 1000:.0f} ms "
+          f"({index.count} requirements)", file=sys.stderr)
+    print(f"🔎 {matches} matching requirements in {query_ms:.2f} ms")
+    if groups:
+        for value, count in sorted(groups.items(), key=lambda item: -item[1]):
+            if count:
+                print(f"   {value or '(empty)'}: {count}")
+    for position in positions:
+        print(f"   {index.req_id(position)}")
+    if len(positions) < matches and not args.count:
+        print(f"   ... {matches - len(positions)} more")
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+RTM Statistics Engine
+Aggregates every count used by the Excel workbook, the Markdown handover
+document and the command line summaries in a single pass over the requirements
+"""
+
+from collections import Counter
+
+COUNT_FIELDS = (
+    'priority', 'requirement_type', 'verification_method', 'category',
+    'sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3', 'status'
+)
+CROSSTABS = (
+    ('sbs_l1', 'requirement_type'),
+    ('category', 'requirement_type'),
+    ('requirement_type', 'verification_method'),
+)
+SBS_LEVELS = ('sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3')
+
+# RTM sheet column headers, used to accept frames built by create_rtm_dataframe
+COLUMN_LABELS = {
+    'priority': 'Priority',
+    'requirement_type': 'Requirement Type',
+    'verification_method': 'Verification Method',
+    'category': 'Category',
+    'sbs_l0': 'SBS Level 0',
+    'sbs_l1': 'SBS Level 1',
+    'sbs_l2': 'SBS Level 2',
+    'sbs_l3': 'SBS Level 3',
+    'status': 'Status',
+}
+
+# Summary sheet rows: (metric, field, value); field None counts everything
+SUMMARY_METRICS = [
+    ('Total Requirements', None, None),
+    ('High Priority Requirements', 'priority', 'High'),
+    ('Medium Priority Requirements', 'priority', 'Medium'),
+    ('Safety Requirements', 'requirement_type', 'Safety'),
+    ('Performance Requirements', 'requirement_type', 'Performance'),
+    ('Functional Requirements', 'requirement_type', 'Functional'),
+    ('Design Requirements', 'requirement_type', 'Design'),
+    ('Interface Requirements', 'requirement_type', 'Interface'),
+    ('Requirements Needing Test Verification', 'verification_method', 'Test'),
+    ('Requirements Needing Analysis Verification', 'verification_method', 'Analysis'),
+    ('Requirements Needing Demonstration', 'verification_method', 'Demonstration'),
+    ('Operational Requirements', 'category', 'Operational'),
+    ('Maintenance Requirements', 'category', 'Maintenance'),
+    ('Lifetime Requirements', 'category', 'Lifetime'),
+]
+
+class RequirementStatistics:
+    """Counts, SBS rollups and crosstabs; dictionaries keep first-appearance order"""
+
+    def __init__(self):
+        self.total = 0
+        self.counts = {field: Counter() for field in COUNT_FIELDS}
+        self.crosstabs = {pair: Counter() for pair in CROSSTABS}
+        # {level field: {code: {'total', 'high', 'safety'}}}
+        self.sbs_rollup = {level: {} for level in SBS_LEVELS}
+
+    @classmethod
+    def from_requirements(cls, requirements):
+        """Aggregate a list of requirement dicts in one pass"""
+        stats = cls()
+        for req in requirements:
+            stats.add(req)
+        return stats
+
+    def add(self, req):
+        """Fold one requirement into the aggregates"""
+        self.total += 1
+        values = {field: req.get(field, 'General' if field == 'category' else '') for field in COUNT_FIELDS}
+
+        for field, value in values.items():
+            self.counts[field][value] += 1
+        for pair, counter in self.crosstabs.items():
+            counter[(values[pair[0]], values[pair[1]])] += 1
+
+        high = values['priority'] == 'High'
+        safety = values['requirement_type'] == 'Safety'
+        for level in SBS_LEVELS:
+            code = values[level]
+            if not code:
+                continue
+            node = self.sbs_rollup[level].setdefault(code, {'total': 0, 'high': 0, 'safety': 0})
+            node['total'] += 1
+            node['high'] += high
+            node['safety'] += safety
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Aggregate a DataFrame with vectorised groupby; accepts field names or RTM sheet headers"""
+        frame = frame.rename(columns={label: field for field, label in COLUMN_LABELS.items()})
+        # Dictionary-encoded columns arrive as categoricals; count their values, not their categories
+        frame = frame.astype({name: object for name, dtype in frame.dtypes.items() if dtype == 'category'})
+        stats = cls()
+        stats.total = len(frame)
+
+        for field in COUNT_FIELDS:
+            if field in frame:
+                column = frame[field].fillna('General' if field == 'category' else '')
+                stats.counts[field] = Counter({key: int(count) for key, count in
+                                               column.value_counts(sort=False).items()})
+
+        for pair in CROSSTABS:
+            if pair[0] in frame and pair[1] in frame:
+                sizes = frame.groupby(list(pair), sort=False).size()
+                stats.crosstabs[pair] = Counter({key: int(count) for key, count in sizes.items()})
+
+        flags = frame.assign(
+            _high=frame['priority'].eq('High') if 'priority' in frame else False,
+            _safety=frame['requirement_type'].eq('Safety') if 'requirement_type' in frame else False
+        )
+        for level in SBS_LEVELS:
+            if level not in frame:
+                continue
+            grouped = flags[flags[level].fillna('') != ''].groupby(level, sort=False)
+            totals = grouped.size()
+            sums = grouped[['_high', '_safety']].sum()
+            stats.sbs_rollup[level] = {
+                code: {'total': int(totals[code]), 'high': int(sums.at[code, '_high']),
+                       'safety': int(sums.at[code, '_safety'])}
+                for code in totals.index
+            }
+        return stats
+
+    def count(self, field, value):
+        return self.counts[field].get(value, 0)
+
+    def summary_rows(self):
+        """(metric, count) rows for the Summary sheet"""
+        return [(metric, self.total if field is None else self.count(field, value))
+                for metric, field, value in SUMMARY_METRICS]
+
+    def crosstab_frame(self, row_field, column_field):
+        """Crosstab as a DataFrame shaped like groupby(...).size().unstack(fill_value=0)"""
+        import pandas as pd
+
+        counter = self.crosstabs[(row_field, column_field)]
+        rows = sorted({row for row, _ in counter})
+        columns = sorted({column for _, column in counter})
+        return pd.DataFrame(
+            [[counter.get((row, column), 0) for column in columns] for row in rows],
+            index=pd.Index(rows, name=COLUMN_LABELS[row_field]),
+            columns=pd.Index(columns, name=COLUMN_LABELS[column_field])
+        )
+
+    def to_dict(self):
+        """JSON-friendly view of all aggregates"""
+        return {
+            'total': self.total,
+            'counts': {field: dict(counter) for field, counter in self.counts.items()},
+            'crosstabs': {
+                f"{row}_by_{column}": {f"{a}|{b}": count for (a, b), count in counter.items()}
+                for (row, column), counter in self.crosstabs.items()
+            },
+            'sbs_rollup': self.sbs_rollup
+        }
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Summarise an RTM requirements.json")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json')
+    parser.add_argument('--json', action='store_true', help="Print all aggregates as JSON")
+    args = parser.parse_args()
+
+    from rtm_columnar import is_columnar, load_table
+    if is_columnar(args.requirements):
+        # Only the aggregated columns are mapped, then counted with groupby
+        columns = sorted(set(COUNT_FIELDS) | {field for pair in CROSSTABS for field in pair})
+        stats = RequirementStatistics.from_frame(load_table(args.requirements, columns).to_pandas())
+    else:
+        with open(args.requirements, 'r') as f:
+            stats = RequirementStatistics.from_requirements(json.load(f))
+
+    if args.json:
+        print(json.dumps(stats.to_dict(), indent=2))
+        return True
+
+    print("📋 Summary:")
+    for metric, count in stats.summary_rows():
+        print(f"   {metric}: {count}")
+    print("🏗️ SBS Level 1:")
+    for code, node in stats.sbs_rollup['sbs_l1'].items():
+        print(f"   {code}: {node['total']} ({node['high']} high priority, {node['safety']} safety)")
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
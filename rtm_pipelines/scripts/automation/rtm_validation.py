@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+RTM Conformance Validation Engine
+Checks requirements against the SBS tree and config/requirements.yml: SBS
+levels must form a real path, enum fields must take allowed values, and
+parent/child references must resolve, be symmetric and free of cycles.
+Record rules run in parallel over shards; every lookup is a precomputed index
+"""
+
+import os
+import json
+import logging
+from collections import Counter
+from collections.abc import Mapping
+
+import yaml
+
+from requirement_extractor import _bounded_ordered_map
+from requirement_graph import RequirementGraph
+from sbs_index import SBSIndex
+
+logger = logging.getLogger(__name__)
+
+REQUIREMENTS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config',
+                                   'requirements.yml')
+
+# Rule groups in report order; the first three only look at one requirement
+RULE_GROUPS = ('enums', 'sbs_path', 'links', 'references', 'symmetry', 'cycles')
+RECORD_GROUPS = ('enums', 'sbs_path', 'links')
+
+# Requirement field -> value list in requirements.yml
+ENUM_FIELDS = {
+    'requirement_type': 'requirement_types',
+    'priority': 'priorities',
+    'verification_method': 'verification_methods',
+}
+SBS_LEVEL_FIELDS = ('sbs_l0', 'sbs_l1', 'sbs_l2', 'sbs_l3')
+LINK_FIELDS = ('parent_requirements', 'child_requirements')
+
+def _violation(rule, req_id, position, message, field=None, value=None):
+    violation = {'rule': rule, 'req_id': req_id, 'position': position, 'message': message}
+    if field is not None:
+        violation['field'] = field
+    if value is not None:
+        violation['value'] = value
+    return violation
+
+class ConformanceContext:
+    """Indexes shared by every shard: allowed values, SBS levels and the SBS tree"""
+
+    def __init__(self, sbs_structure, requirements_config):
+        self.allowed = {field: frozenset(requirements_config.get(key) or ())
+                        for field, key in ENUM_FIELDS.items()}
+        levels = requirements_config.get('sbs_structure') or {}
+        self.sbs_levels = {field: frozenset(levels.get(f"level_{number}") or ())
+                           for number, field in enumerate(SBS_LEVEL_FIELDS)}
+        self.node_level = {sbs_id: info.get('level') for sbs_id, info in sbs_structure.items()}
+        self.sbs_index = SBSIndex(sbs_structure)
+
+    @classmethod
+    def load(cls, sbs_structure, config_path=REQUIREMENTS_CONFIG):
+        with open(config_path, 'r') as f:
+            return cls(sbs_structure, yaml.safe_load(f) or {})
+
+    def check_enums(self, req, position):
+        req_id = req.get('req_id')
+        for field, allowed in self.allowed.items():
+            value = req.get(field)
+            if value and value not in allowed:
+                yield _violation('enums', req_id, position, f"{field} '{value}' is not one of {sorted(allowed)}",
+                                 field, value)
+
+    def check_sbs_path(self, req, position):
+        """Each assigned level must be a known node of that level listed below the previous assigned one"""
+        req_id = req.get('req_id')
+        above = None
+        for number, field in enumerate(SBS_LEVEL_FIELDS):
+            code = req.get(field)
+            if not code:
+                if above is None or above[1] is not None:
+                    above = (field, None)
+                continue
+            if code not in self.sbs_index:
+                yield _violation('sbs_path', req_id, position, f"{field} '{code}' is not an SBS node", field, code)
+                return
+            if code not in self.sbs_levels[field] or self.node_level.get(code) != number:
+                yield _violation('sbs_path', req_id, position, f"{field} '{code}' is not a level {number} node",
+                                 field, code)
+                return
+            if above is not None:
+                above_field, above_code = above
+                if above_code is None:
+                    yield _violation('sbs_path', req_id, position, f"{field} is set but {above_field} is empty",
+                                     field, code)
+                    return
+                if not self.sbs_index.is_below(code, above_code):
+                    yield _violation('sbs_path', req_id, position,
+                                     f"{field} '{code}' is not below {above_field} '{above_code}'", field, code)
+                    return
+            above = (field, code)
+
+    def check_links(self, req, position):
+        req_id = req.get('req_id')
+        for field in LINK_FIELDS:
+            value = req.get(field, [])
+            if not isinstance(value, list):
+                yield _violation('links', req_id, position, f"{field} must be a list", field, value)
+            elif req_id in value:
+                yield _violation('links', req_id, position, f"{field} references the requirement itself",
+                                 field, req_id)
+
+    def check_shard(self, shard, groups):
+        """Run the record rule groups over (position, requirement) pairs
+
+        Returns the violations plus the IDs and declared links needed by the
+        cross-record groups, which are resolved once all shards are in.
+        """
+        checks = [getattr(self, f"check_{group}") for group in RECORD_GROUPS if group in groups]
+        violations = []
+        ids = []
+        declared_parents = []  # (parent, child) listed by the child
+        declared_children = []  # (parent, child) listed by the parent
+        for position, req in shard:
+            if not isinstance(req, Mapping):
+                violations.append(_violation('links', None, position, "Entry is not a requirement object"))
+                continue
+            for check in checks:
+                violations.extend(check(req, position))
+            req_id = req.get('req_id')
+            ids.append((req_id, position))
+            parents = req.get('parent_requirements', [])
+            children = req.get('child_requirements', [])
+            if isinstance(parents, list):
+                declared_parents.extend((parent_id, req_id) for parent_id in parents)
+            if isinstance(children, list):
+                declared_children.extend((req_id, child_id) for child_id in children)
+        return violations, ids, declared_parents, declared_children
+
+
+# Worker processes receive the context once through the pool initializer
+_worker_context = None
+
+def _init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+def _check_shard_in_worker(shard, groups):
+    return _worker_context.check_shard(shard, groups)
+
+def _check_rows_in_worker(path, start, stop, groups):
+    """Check a row range of a mapped Arrow file, so records never cross the process boundary"""
+    from rtm_columnar import iter_requirements, load_table
+    table = load_table(path).slice(start, stop - start)
+    return _worker_context.check_shard(zip(range(start, stop), iter_requirements(table)), groups)
+
+def _shards(records, shard_size):
+    shard = []
+    for position, req in enumerate(records):
+        shard.append((position, req))
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def _is_mapped_arrow(source):
+    return isinstance(source, (str, os.PathLike)) and \
+        os.path.splitext(str(source))[1].lower() in ('.arrow', '.feather')
+
+
+def validate_conformance(source, context, groups=RULE_GROUPS, workers=None, shard_size=20000):
+    """Validate requirements; returns a JSON-serialisable report
+
+    source is an iterable of requirement dicts or a requirements.json,
+    Parquet or Arrow path. Arrow files are split into row ranges that each
+    worker maps itself; other inputs are streamed and shipped in shards.
+    """
+    groups = tuple(group for group in RULE_GROUPS if group in groups)
+    workers = workers or os.cpu_count() or 1
+
+    violations = []
+    positions = {}
+    duplicates = {}
+    declared_parents = []
+    declared_children = []
+    count = 0
+
+    if isinstance(source, (str, os.PathLike)) and not (workers > 1 and _is_mapped_arrow(source)):
+        from requirement_stream import iter_requirement_records
+        source = iter_requirement_records(source)
+
+    executor = None
+    if workers == 1:
+        results = (context.check_shard(shard, groups) for shard in _shards(source, shard_size))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,))
+        if _is_mapped_arrow(source):
+            from rtm_columnar import load_table
+            rows = load_table(source, ['req_id']).num_rows
+            tasks = ((str(source), start, min(start + shard_size, rows), groups)
+                     for start in range(0, rows, shard_size))
+            results = _bounded_ordered_map(executor, _check_rows_in_worker, tasks, workers * 2)
+        else:
+            results = _bounded_ordered_map(executor, _check_shard_in_worker,
+                                           ((shard, groups) for shard in _shards(source, shard_size)),
+                                           workers * 2)
+    try:
+        for shard_violations, ids, parents, children in results:
+            violations.extend(shard_violations)
+            count += len(ids)
+            for req_id, position in ids:
+                first = positions.setdefault(req_id, position)
+                if first != position:
+                    duplicates.setdefault(req_id, [first]).append(position)
+            declared_parents.extend(parents)
+            declared_children.extend(children)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if 'references' in groups:
+        for req_id, occurrences in duplicates.items():
+            violations.append(_violation('references', req_id, occurrences[0],
+                                         f"Requirement ID appears at positions {occurrences}", 'req_id', req_id))
+        for parent_id, child_id in declared_parents:
+            if parent_id not in positions:
+                violations.append(_violation('references', child_id, positions.get(child_id),
+                                             f"Unknown parent requirement '{parent_id}'",
+                                             'parent_requirements', parent_id))
+        for parent_id, child_id in declared_children:
+            if child_id not in positions:
+                violations.append(_violation('references', parent_id, positions.get(parent_id),
+                                             f"Unknown child requirement '{child_id}'",
+                                             'child_requirements', child_id))
+
+    if 'symmetry' in groups:
+        # Ordered de-duplication keeps the report stable when a record is repeated
+        parent_links = dict.fromkeys(declared_parents)
+        child_links = dict.fromkeys(declared_children)
+        for parent_id, child_id in child_links:
+            if (parent_id, child_id) not in parent_links and child_id in positions:
+                violations.append(_violation('symmetry', child_id, positions[child_id],
+                                             f"'{parent_id}' lists it as a child but it does not list "
+                                             f"'{parent_id}' as a parent", 'parent_requirements', parent_id))
+        for parent_id, child_id in parent_links:
+            if (parent_id, child_id) not in child_links and parent_id in positions:
+                violations.append(_violation('symmetry', parent_id, positions[parent_id],
+                                             f"'{child_id}' lists it as a parent but it does not list "
+                                             f"'{child_id}' as a child", 'child_requirements', child_id))
+
+    if 'cycles' in groups:
+        graph = RequirementGraph(positions)
+        for parent_id, child_id in declared_parents + declared_children:
+            graph.add_edge(parent_id, child_id)
+        for cycle in graph.find_cycles():
+            violations.append(_violation('cycles', cycle[0], positions[cycle[0]],
+                                         f"Hierarchy cycle: {' -> '.join(cycle + cycle[:1])}"))
+
+    by_rule = Counter(violation['rule'] for violation in violations)
+    return {
+        'requirements': count,
+        'rule_groups': list(groups),
+        'violation_count': len(violations),
+        'by_rule': {group: by_rule.get(group, 0) for group in groups},
+        'violations': violations
+    }
+
+
+def main():
+    import argparse
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    parser = argparse.ArgumentParser(description="Check requirements against the SBS tree and requirements.yml")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json',
+                        help="requirements.json or a Parquet/Arrow export")
+    parser.add_argument('--output', help="Write the JSON report here (stdout when omitted)")
+    parser.add_argument('--rules', nargs='+', choices=RULE_GROUPS, default=list(RULE_GROUPS))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    context = ConformanceContext.load(ImprovedCryoplantRTMGenerator().sbs_structure)
+    report = validate_conformance(args.requirements, context,
+                                  args.rules, args.workers, args.shard_size)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    logger.info(f"Checked {report['requirements']} requirements: {report['violation_count']} violations")
+    for group, violations in report['by_rule'].items():
+        logger.info(f"  {group}: {violations}")
+    return report['violation_count'] == 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
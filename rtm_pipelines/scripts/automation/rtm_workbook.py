@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Streaming RTM Workbook Writer
+Writes the RTM workbook with openpyxl's write-only mode: rows are serialised
+as they are produced, so memory stays flat regardless of the RTM size
+"""
+
+import os
+import sys
+import json
+
+from rtm_statistics import COLUMN_LABELS, RequirementStatistics
+from sbs_index import SBSIndex
+
+# RTM sheet columns and the requirement field each one is taken from
+RTM_COLUMNS = [
+    ('Requirement ID', 'req_id'),
+    ('Description', 'description'),
+    ('Full Description', 'full_description'),
+    ('SBS Level 0', 'sbs_l0'),
+    ('SBS Level 1', 'sbs_l1'),
+    ('SBS Level 2', 'sbs_l2'),
+    ('SBS Level 3', 'sbs_l3'),
+    ('Requirement Type', 'requirement_type'),
+    ('Category', 'category'),
+    ('Priority', 'priority'),
+    ('Verification Method', 'verification_method'),
+    ('Acceptance Criteria', 'acceptance_criteria'),
+    ('Source Section', 'source_section'),
+    ('Parent Requirements', 'parent_requirements'),
+    ('Child Requirements', 'child_requirements'),
+    ('Status', 'status'),
+    ('Rationale', 'rationale'),
+    ('Numerical Value', 'numerical_value'),
+    ('Duplicate Of', 'duplicate_of'),
+    ('Merged From', 'merged_from'),
+]
+
+# Coverage sheets: (sheet name, matrix field, navigation description), filled by rtm_coverage
+COVERAGE_SHEETS = [
+    ('CoverageByVerification', 'verification_method', 'Requirements per SBS subtree and verification method'),
+    ('CoverageByType', 'requirement_type', 'Requirements per SBS subtree and requirement type'),
+]
+GAP_SHEET = ('CoverageGaps', 'SBS nodes without a Test-verified Safety requirement in their subtree')
+
+NAVIGATION_ROWS = [
+    ('Requirements_Traceability_Matrix', 'Complete RTM with all requirements and traceability'),
+    ('SBS_Structure', 'System Breakdown Structure hierarchy'),
+    ('Summary_Statistics', 'Summary statistics and metrics'),
+    ('Requirements_by_SBS', 'Requirements organized by SBS levels'),
+    ('Requirements_by_Type', 'Requirements organized by type and category'),
+] + [(sheet_name, description) for sheet_name, _, description in COVERAGE_SHEETS] + [GAP_SHEET]
+
+SBS_COLUMNS = ['SBS ID', 'Name', 'Level', 'Parent', 'Children', 'Description']
+
+def rtm_row(req):
+    """RTM sheet values for one requirement, in RTM_COLUMNS order"""
+    return [
+        req['req_id'],
+        req['description'],
+        req['full_description'],
+        req['sbs_l0'],
+        req['sbs_l1'],
+        req['sbs_l2'],
+        req['sbs_l3'],
+        req['requirement_type'],
+        req.get('category', 'General'),
+        req['priority'],
+        req['verification_method'],
+        req['acceptance_criteria'],
+        req['source_section'],
+        ', '.join(req['parent_requirements']),
+        ', '.join(req['child_requirements']),
+        req['status'],
+        req['rationale'],
+        req.get('numerical_value', 'N/A'),
+        req.get('duplicate_of', ''),
+        ', '.join(req.get('merged_from', ())),
+    ]
+
+def sbs_rows(sbs_structure):
+    """SBS sheet rows"""
+    for sbs_id, sbs_info in sbs_structure.items():
+        yield [
+            sbs_id,
+            sbs_info['name'],
+            sbs_info['level'],
+            sbs_info['parent'] if sbs_info['parent'] else '',
+            ', '.join(sbs_info['children']),
+            sbs_info['description'],
+        ]
+
+def _cell(value):
+    # pandas leaves empty strings blank; keep both writers interchangeable
+    return None if value == '' else value
+
+def _append(sheet, values):
+    sheet.append([_cell(value) for value in values])
+
+def write_streaming_workbook(requirements, output_path, sbs_structure, statistics=None):
+    """Stream requirements (any iterable) into the RTM workbook; returns the statistics
+
+    When no statistics are passed they are folded in while the RTM rows are
+    written, so the requirements are only iterated once; the coverage codes
+    are collected in the same pass.
+    """
+    from openpyxl import Workbook
+    from rtm_coverage import CoverageBuilder
+
+    workbook = Workbook(write_only=True)
+    # Create every sheet up front to keep the sheet order of the pandas writer
+    navigation = workbook.create_sheet('Navigation')
+    rtm = workbook.create_sheet('RTM')
+    sbs = workbook.create_sheet('SBS')
+    summary = workbook.create_sheet('Summary')
+
+    _append(navigation, ['Sheet Name', 'Description'])
+    for row in NAVIGATION_ROWS:
+        _append(navigation, row)
+
+    fold = statistics is None
+    if fold:
+        statistics = RequirementStatistics()
+    coverage = CoverageBuilder(SBSIndex(sbs_structure))
+
+    _append(rtm, [label for label, _ in RTM_COLUMNS])
+    for req in requirements:
+        _append(rtm, rtm_row(req))
+        coverage.add(req)
+        if fold:
+            statistics.add(req)
+
+    _append(sbs, SBS_COLUMNS)
+    for row in sbs_rows(sbs_structure):
+        _append(sbs, row)
+
+    _append(summary, ['Metric', 'Count'])
+    for row in statistics.summary_rows():
+        _append(summary, row)
+
+    if statistics.total > 0:
+        for sheet_name, (row_field, column_field) in (('BySystem', ('sbs_l1', 'requirement_type')),
+                                                      ('ByType', ('category', 'requirement_type'))):
+            sheet = workbook.create_sheet(sheet_name)
+            _append_crosstab(sheet, statistics, row_field, column_field)
+        for sheet_name, rows in coverage.result().sheets():
+            sheet = workbook.create_sheet(sheet_name)
+            for row in rows:
+                _append(sheet, row)
+
+    workbook.save(output_path)
+    return statistics
+
+def _append_crosstab(sheet, statistics, row_field, column_field):
+    """Pivot sheet laid out like DataFrame.to_excel of groupby(...).size().unstack()"""
+    counter = statistics.crosstabs[(row_field, column_field)]
+    rows = sorted({row for row, _ in counter})
+    columns = sorted({column for _, column in counter})
+    _append(sheet, [COLUMN_LABELS[row_field]] + columns)
+    for row in rows:
+        _append(sheet, [row] + [counter.get((row, column), 0) for column in columns])
+
+
+def _synthetic_requirements(count, description_words):
+    """Lazily generate benchmark requirements from the curated list"""
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    base = ImprovedCryoplantRTMGenerator().extract_requirements_from_pdf_text()
+    filler = ' '.join(['cryogenic'] * description_words)
+    for index in range(count):
+        req = dict(base[index % len(base)])
+        req['req_id'] = f"RTM-{index + 1:06d}"
+        req['description'] = req['full_description'] = f"{req['description']} {filler}"
+        yield req
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_writer(mode, count, description_words, output_path):
+    """Write one workbook in this process and report time and peak memory"""
+    import time
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    generator = ImprovedCryoplantRTMGenerator()
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    requirements = _synthetic_requirements(count, description_words)
+    if mode == 'streaming':
+        generator.generate_rtm_excel_streaming(requirements, output_path)
+    else:
+        generator.generate_rtm_excel(list(requirements), output_path)
+    return {
+        'mode': mode,
+        'seconds': round(time.perf_counter() - start, 2),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'baseline_rss_mb': round(baseline, 1),
+        'file_mb': round(os.path.getsize(output_path) / (1024 * 1024), 1)
+    }
+
+def main():
+    import argparse
+    import subprocess
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Compare peak memory of the streaming and pandas RTM writers")
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--description-words', type=int, default=40,
+                        help="Filler words appended to each description")
+    parser.add_argument('--mode', choices=['streaming', 'pandas'], help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: run a single writer so peak RSS is not shared
+        print(json.dumps(_run_writer(args.mode, args.count, args.description_words, args.output)))
+        return True
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode in ('streaming', 'pandas'):
+            output = os.path.join(temp_dir, f"{mode}.xlsx")
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--mode', mode, '--count', str(args.count),
+                 '--description-words', str(args.description_words), '--output', output],
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                print(f"❌ {mode} writer failed:\n{completed.stderr}")
+                return False
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"📊 Requirements: {args.count}")
+    for result in results:
+        print(f"{'🚀' if result['mode'] == 'streaming' else '🐢'} {result['mode']}: "
+              f"{result['seconds']} s, peak RSS {result['peak_rss_mb']} MB "
+              f"(startup {result['baseline_rss_mb']} MB), workbook {result['file_mb']} MB")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
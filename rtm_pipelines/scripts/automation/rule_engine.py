@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Compiled Keyword Rule Engine
+Loads the classification rule tables from config/classification_rules.yml,
+compiles every keyword into one trie-shaped regular expression and resolves
+all tables from a single scan of each description
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import defaultdict
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'config')
+RULES_CONFIG = os.path.join(CONFIG_DIR, 'classification_rules.yml')
+REQUIREMENTS_CONFIG = os.path.join(CONFIG_DIR, 'requirements.yml')
+DEFAULT_CACHE_DIR = os.environ.get(
+    'RTM_RULE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'rtm_pipelines')
+)
+
+# Bump when the compiled layout changes so stale cache files are ignored
+ENGINE_VERSION = 1
+# Entries of the per-token and per-rule-set caches behind classify()
+TOKEN_CACHE_SIZE = 200000
+
+
+class WordKeyword(str):
+    """Keyword that only matches when not surrounded by word characters"""
+
+    def regex(self):
+        return rf'(?<!\w){re.escape(self)}(?!\w)'
+
+    def found_in(self, text_lower):
+        return re.search(self.regex(), text_lower) is not None
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def _lookup(config, dotted_path):
+    """Resolve 'a.b' inside a nested mapping, None when missing"""
+    node = config
+    for part in dotted_path.split('.'):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def _parse_keyword(keyword, where):
+    if isinstance(keyword, dict) and set(keyword) == {'word'}:
+        return WordKeyword(str(keyword['word']).lower())
+    if isinstance(keyword, (str, int, float)) and not isinstance(keyword, bool):
+        return str(keyword).lower()
+    raise ValueError(f"{where}: keywords must be strings or {{word: ...}} mappings, got {keyword!r}")
+
+
+def load_rule_config(rules_path=RULES_CONFIG, requirements_path=REQUIREMENTS_CONFIG):
+    """Load and validate the rule tables; returns them in evaluation order"""
+    with open(rules_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    with open(requirements_path, 'r') as f:
+        requirements = yaml.safe_load(f) or {}
+
+    tables = []
+    seen = set()
+    for name, spec in (config.get('tables') or {}).items():
+        where = f"{os.path.basename(rules_path)}: table '{name}'"
+        spec = spec or {}
+
+        allowed = None
+        if spec.get('allowed'):
+            allowed = _lookup(requirements, spec['allowed'])
+            if allowed is None:
+                raise ValueError(f"{where}: unknown value list '{spec['allowed']}' in requirements.yml")
+
+        def check_value(value, context):
+            if value != '' and allowed is not None and value not in allowed:
+                raise ValueError(f"{where}: {context} '{value}' is not one of {allowed}")
+
+        default = spec.get('default', '')
+        check_value(default, 'default')
+
+        default_by = spec.get('default_by')
+        if default_by:
+            if default_by.get('field') not in seen:
+                raise ValueError(f"{where}: default_by must refer to an earlier table")
+            for value in default_by.get('values', {}).values():
+                check_value(value, 'default_by value')
+
+        scope = spec.get('scope')
+        if scope and scope not in seen:
+            raise ValueError(f"{where}: scope must refer to an earlier table")
+
+        rules = []
+        rule_ids = set()
+        for index, rule in enumerate(spec.get('rules') or []):
+            rule_id = str(rule.get('id') or f"{name}[{index}]")
+            if rule_id in rule_ids:
+                raise ValueError(f"{where}: duplicate rule id '{rule_id}'")
+            rule_ids.add(rule_id)
+            if 'value' not in rule:
+                raise ValueError(f"{where}: rule '{rule_id}' has no value")
+            check_value(rule['value'], f"rule '{rule_id}' value")
+            if ('when' in rule) != bool(scope):
+                raise ValueError(f"{where}: rule '{rule_id}' needs 'when' exactly when the table has a scope")
+            keywords = [_parse_keyword(keyword, f"{where} rule '{rule_id}'") for keyword in rule.get('keywords') or []]
+            if not keywords:
+                raise ValueError(f"{where}: rule '{rule_id}' has no keywords")
+            rules.append({
+                'id': rule_id,
+                'value': rule['value'],
+                'when': rule.get('when'),
+                'keywords': keywords
+            })
+
+        tables.append({
+            'name': name,
+            'default': default,
+            'default_by': default_by,
+            'scope': scope,
+            'rules': rules
+        })
+        seen.add(name)
+
+    return tables
+
+
+def _trie_regex(terms):
+    """Build one regex matching the longest term at a position by walking a character trie"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if '' in node:
+            return f"(?:{body})?"  # greedy: prefer extending to a longer term
+        return body
+
+    return render(trie)
+
+
+def compile_rules(tables):
+    """Compile rule tables into a JSON-serialisable matcher description"""
+    references = defaultdict(list)
+    for table_index, table in enumerate(tables):
+        for rule_index, rule in enumerate(table['rules']):
+            for keyword in rule['keywords']:
+                references[str(keyword)].append(
+                    [table_index, rule_index, isinstance(keyword, WordKeyword)]
+                )
+
+    terms = sorted(references, key=lambda term: (-len(term), term))
+    term_set = set(terms)
+
+    # The scan only reports the longest term starting at each position; any
+    # shorter term matching there is necessarily a prefix of it
+    prefixes = {
+        term: [term[:length] for length in range(1, len(term) + 1) if term[:length] in term_set]
+        for term in terms
+    }
+
+    return {
+        'engine_version': ENGINE_VERSION,
+        'pattern': f"(?=({_trie_regex(terms)}))" if terms else '(?!)',
+        'prefixes': prefixes,
+        'references': dict(references),
+        'tables': [{
+            'name': table['name'],
+            'default': table['default'],
+            'default_by': table['default_by'],
+            'scope': table['scope'],
+            'rules': [{
+                'id': rule['id'],
+                'value': rule['value'],
+                'when': rule['when'],
+                'keywords': [{'word': str(k)} if isinstance(k, WordKeyword) else str(k) for k in rule['keywords']]
+            } for rule in table['rules']]
+        } for table in tables]
+    }
+
+
+def config_digest(rules_path=RULES_CONFIG, requirements_path=REQUIREMENTS_CONFIG):
+    """Hash of everything the compiled matcher depends on"""
+    digest = hashlib.sha256(f"rule-engine-v{ENGINE_VERSION}".encode('utf-8'))
+    for path in (rules_path, requirements_path):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class RuleEngine:
+    """Single-pass classifier driven by the configured rule tables"""
+
+    def __init__(self, rules_path=RULES_CONFIG, requirements_path=REQUIREMENTS_CONFIG,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        self.rules_path = rules_path
+        self.requirements_path = requirements_path
+        self.digest = config_digest(rules_path, requirements_path)
+        self.cache_path = os.path.join(cache_dir, f"rules-{self.digest[:16]}.json") if cache_dir else None
+        self.from_cache = False
+
+        compiled = self._load_cached()
+        if compiled is None:
+            compiled = compile_rules(load_rule_config(rules_path, requirements_path))
+            self._store_cached(compiled)
+
+        self.tables = compiled['tables']
+        self.fields = [table['name'] for table in self.tables]
+        self.regex = re.compile(compiled['pattern'])
+        self.prefixes = compiled['prefixes']
+        self.references = compiled['references']
+
+        # Terms without whitespace always fall inside one whitespace token, and
+        # a token edge is a word boundary, so their hits are cached per token;
+        # the few multi-word terms are checked with substring searches
+        self.phrases = [(term, references) for term, references in self.references.items()
+                        if any(char.isspace() for char in term)]
+        self._token_rules = {}
+        self._decisions = {}  # fired rule set -> classification
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_token_rules'] = {}  # workers build their own caches
+        state['_decisions'] = {}
+        return state
+
+    def _load_cached(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                compiled = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rule cache {self.cache_path}: {e}")
+            return None
+        if compiled.get('engine_version') != ENGINE_VERSION or compiled.get('digest') != self.digest:
+            return None
+        self.from_cache = True
+        return compiled
+
+    def _store_cached(self, compiled):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({**compiled, 'digest': self.digest}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write rule cache {self.cache_path}: {e}")
+
+    def _fired_rules(self, text_lower):
+        """Scan the text once; returns {table_index: {rule_index: keyword}}"""
+        fired = defaultdict(dict)
+        for match in self.regex.finditer(text_lower):
+            start = match.start()
+            for term in self.prefixes[match.group(1)]:
+                end = start + len(term)
+                bounded = None
+                for table_index, rule_index, word in self.references[term]:
+                    if word:
+                        if bounded is None:
+                            bounded = ((start == 0 or not _is_word_char(text_lower[start - 1])) and
+                                       (end == len(text_lower) or not _is_word_char(text_lower[end])))
+                        if not bounded:
+                            continue
+                    fired[table_index].setdefault(rule_index, term)
+        return fired
+
+    def _fired_pairs(self, text_lower):
+        """Same rules as _fired_rules without keywords: frozenset of (table_index, rule_index)"""
+        cache = self._token_rules
+        tokens = set(text_lower.split())
+        missing = tokens.difference(cache)
+        if missing:
+            if len(cache) + len(missing) > TOKEN_CACHE_SIZE:
+                cache.clear()
+                missing = tokens
+            for token in missing:
+                cache[token] = tuple((table_index, rule_index)
+                                     for table_index, hits in self._fired_rules(token).items()
+                                     for rule_index in hits)
+        fired = set().union(*map(cache.__getitem__, tokens))
+
+        for term, references in self.phrases:
+            start = text_lower.find(term)
+            if start < 0:
+                continue
+            bounded = None
+            for table_index, rule_index, word in references:
+                if word:
+                    if bounded is None:
+                        bounded = self._bounded_occurrence(text_lower, term, start)
+                    if not bounded:
+                        continue
+                fired.add((table_index, rule_index))
+        return frozenset(fired)
+
+    @staticmethod
+    def _bounded_occurrence(text_lower, term, start):
+        """True when some occurrence of term from start on is not inside a word"""
+        while start >= 0:
+            end = start + len(term)
+            if ((start == 0 or not _is_word_char(text_lower[start - 1])) and
+                    (end == len(text_lower) or not _is_word_char(text_lower[end]))):
+                return True
+            start = text_lower.find(term, start + 1)
+        return False
+
+    def _resolve(self, fired):
+        """Yield (field, value, rule_index) in table order; fired maps table index -> fired rule indices"""
+        result = {}
+
+        for table_index, table in enumerate(self.tables):
+            value = decided = None
+            for rule_index in sorted(fired.get(table_index, ())):
+                rule = table['rules'][rule_index]
+                if table['scope'] and rule['when'] != result.get(table['scope']):
+                    continue
+                value, decided = rule['value'], rule_index
+                break
+
+            if decided is None:
+                value = table['default']
+                default_by = table['default_by']
+                if default_by:
+                    value = default_by.get('values', {}).get(result.get(default_by['field']), value)
+
+            result[table['name']] = value
+            yield table_index, value, decided
+
+    def classify_values(self, description):
+        """Classification as a tuple ordered like self.fields; cheap to call for large batches"""
+        fired = self._fired_pairs((description or '').lower())
+        values = self._decisions.get(fired)
+        if values is None:
+            by_table = defaultdict(list)
+            for table_index, rule_index in fired:
+                by_table[table_index].append(rule_index)
+            if len(self._decisions) >= TOKEN_CACHE_SIZE:
+                self._decisions.clear()
+            values = self._decisions[fired] = tuple(value for _, value, _ in self._resolve(by_table))
+        return values
+
+    def classify(self, description):
+        """Return {field: value} for every configured table"""
+        return dict(zip(self.fields, self.classify_values(description)))
+
+    def explain(self, description):
+        """Classify a description and report which rule (and keyword) decided each field"""
+        fired = self._fired_rules((description or '').lower())
+        explanation = {}
+        for table_index, value, rule_index in self._resolve(fired):
+            rule = self.tables[table_index]['rules'][rule_index] if rule_index is not None else None
+            explanation[self.fields[table_index]] = {
+                'value': value,
+                'rule': rule['id'] if rule else None,
+                'keyword': fired[table_index][rule_index] if rule else None
+            }
+        return explanation
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Explain how requirement descriptions are classified")
+    parser.add_argument('descriptions', nargs='*', help="Descriptions to classify (stdin lines when omitted)")
+    parser.add_argument('--rules', default=RULES_CONFIG)
+    parser.add_argument('--requirements', default=REQUIREMENTS_CONFIG)
+    parser.add_argument('--no-cache', action='store_true', help="Always recompile the rule tables")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        engine = RuleEngine(args.rules, args.requirements, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid classification rules: {e}")
+        return False
+
+    logger.info(f"Rules {engine.digest[:12]} {'loaded from cache' if engine.from_cache else 'compiled'}")
+
+    import sys
+    descriptions = args.descriptions or (line.strip() for line in sys.stdin if line.strip())
+    for description in descriptions:
+        print(description)
+        for field, decision in engine.explain(description).items():
+            reason = (f"rule {decision['rule']} on '{decision['keyword']}'"
+                      if decision['rule'] else 'default')
+            print(f"  {field}: {decision['value']!r} ({reason})")
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
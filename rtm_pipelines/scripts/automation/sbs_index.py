@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SBS Tree Index
+Numbers the System Breakdown Structure once with an Euler-tour (pre-order
+interval) layout over the parent pointers, keeps the children lists as a DAG
+(a node may be listed by several parents) and rolls requirement counts up
+each requirement's own assigned path
+"""
+
+from collections import Counter
+
+ROLLUP_FIELDS = ('requirement_type', 'priority', 'verification_method')
+SBS_FIELDS = ('sbs_l3', 'sbs_l2', 'sbs_l1', 'sbs_l0')  # deepest first
+ASSIGNED_FIELDS = SBS_FIELDS[::-1]
+
+def _empty_counts():
+    return {'total': 0, **{field: Counter() for field in ROLLUP_FIELDS}}
+
+class SBSIndex:
+    """Interval-numbered view of an sbs_structure dict"""
+
+    def __init__(self, sbs_structure):
+        self.structure = sbs_structure
+
+        # A node without a parent pointer hangs below the node listing it as a child
+        listed_by = {}
+        for sbs_id, info in sbs_structure.items():
+            for child in info.get('children', []):
+                listed_by.setdefault(child, sbs_id)
+        self.parent = {}
+        for sbs_id, info in sbs_structure.items():
+            parent = info.get('parent') or listed_by.get(sbs_id)
+            self.parent[sbs_id] = parent if parent in sbs_structure and parent != sbs_id else None
+
+        self.children = {sbs_id: [] for sbs_id in sbs_structure}
+        roots = []
+        for sbs_id, parent in self.parent.items():
+            (self.children[parent] if parent else roots).append(sbs_id)
+
+        # Pre-order numbering: the subtree of X is order[enter[X]:leave[X]]
+        self.order = []
+        self.enter = {}
+        self.leave = {}
+        self.depth = {}
+        self.ancestors = {}
+        stack = [(root, False) for root in reversed(roots)]
+        while stack:
+            sbs_id, done = stack.pop()
+            if done:
+                self.leave[sbs_id] = len(self.order)
+                continue
+            parent = self.parent[sbs_id]
+            self.enter[sbs_id] = len(self.order)
+            self.order.append(sbs_id)
+            self.depth[sbs_id] = self.depth[parent] + 1 if parent else 0
+            self.ancestors[sbs_id] = self.ancestors[parent] + (parent,) if parent else ()
+            stack.append((sbs_id, True))
+            stack.extend((child, False) for child in reversed(self.children[sbs_id]))
+
+        unreachable = [sbs_id for sbs_id in sbs_structure if sbs_id not in self.enter]
+        if unreachable:
+            raise ValueError(f"SBS parent cycle involving: {', '.join(unreachable)}")
+
+        # Every listed edge counts: WCS and QRB hang below both QPLANT and QINFRA
+        # while the numbering above only follows their parent pointer
+        self.linked = {sbs_id: [] for sbs_id in sbs_structure}
+        self.linked_by = {sbs_id: [] for sbs_id in sbs_structure}
+        edges = [(sbs_id, child) for sbs_id, info in sbs_structure.items() for child in info.get('children', [])]
+        edges.extend((parent, sbs_id) for sbs_id, parent in self.parent.items() if parent)
+        for parent, child in dict.fromkeys(edges):
+            if child in sbs_structure and child != parent:
+                self.linked[parent].append(child)
+                self.linked_by[child].append(parent)
+        self._below = {}
+        self._above = {}
+        self._credited = {}
+
+    def __contains__(self, sbs_id):
+        return sbs_id in self.enter
+
+    def __len__(self):
+        return len(self.order)
+
+    def is_under(self, sbs_id, ancestor_id, strict=False):
+        """True when sbs_id lies in the subtree of ancestor_id (O(1))"""
+        if sbs_id not in self.enter or ancestor_id not in self.enter:
+            return False
+        if strict and sbs_id == ancestor_id:
+            return False
+        return self.enter[ancestor_id] <= self.enter[sbs_id] < self.leave[ancestor_id]
+
+    @staticmethod
+    def _reach(sbs_id, edges, cache):
+        """Nodes reachable from sbs_id along edges, excluding sbs_id unless on a cycle"""
+        reached = cache.get(sbs_id)
+        if reached is None:
+            found = set()
+            stack = [sbs_id]
+            while stack:
+                for other in edges[stack.pop()]:
+                    if other not in found:
+                        found.add(other)
+                        stack.append(other)
+            reached = cache[sbs_id] = frozenset(found)
+        return reached
+
+    def is_below(self, sbs_id, ancestor_id):
+        """True when sbs_id is listed, directly or through other nodes, below ancestor_id"""
+        if sbs_id not in self.enter or ancestor_id not in self.enter:
+            return False
+        return sbs_id in self._reach(ancestor_id, self.linked, self._below)
+
+    def path(self, sbs_id):
+        """Root-to-node chain including the node itself"""
+        return self.ancestors[sbs_id] + (sbs_id,)
+
+    def subtree(self, sbs_id):
+        """Node and all its descendants in pre-order"""
+        return self.order[self.enter[sbs_id]:self.leave[sbs_id]]
+
+    def attachment(self, req):
+        """Deepest SBS node a requirement is assigned to, None when none is known"""
+        for field in SBS_FIELDS:
+            code = req.get(field)
+            if code and code in self.enter:
+                return code
+        return None
+
+    def assigned(self, req):
+        """Known SBS codes of a requirement, shallowest first"""
+        return tuple(code for code in map(req.get, ASSIGNED_FIELDS) if code and code in self.enter)
+
+    def credited(self, codes):
+        """Nodes whose subtree counts include a requirement with these assigned codes, in pre-order
+
+        These are the codes themselves, the nodes linking consecutive codes and
+        every node above the shallowest one, so a requirement assigned to
+        QINFRA/QRB counts towards QINFRA and not towards QRB's parent QPLANT.
+        """
+        nodes = self._credited.get(codes)
+        if nodes is None:
+            found = set(codes)
+            if codes:
+                found.update(self._reach(codes[0], self.linked_by, self._above))
+            for upper, lower in zip(codes, codes[1:]):
+                found.update(self._reach(upper, self.linked, self._below) &
+                             self._reach(lower, self.linked_by, self._above))
+            nodes = self._credited[codes] = tuple(sorted(found, key=self.enter.get))
+        return nodes
+
+    def rollup(self, requirements):
+        """Direct and subtree counts by type, priority and verification per node
+
+        Requirements are visited once: the direct counts go to the deepest
+        assigned node, the subtree counts to every node credited() with it.
+        """
+        direct = {sbs_id: _empty_counts() for sbs_id in self.order}
+        subtree = {sbs_id: _empty_counts() for sbs_id in self.order}
+        unassigned = 0
+        for req in requirements:
+            node = self.attachment(req)
+            if node is None:
+                unassigned += 1
+                continue
+            values = [req.get(field, '') for field in ROLLUP_FIELDS]
+            for counts in [direct[node]] + [subtree[sbs_id] for sbs_id in self.credited(self.assigned(req))]:
+                counts['total'] += 1
+                for field, value in zip(ROLLUP_FIELDS, values):
+                    counts[field][value] += 1
+
+        return {
+            'nodes': {sbs_id: {'direct': direct[sbs_id], 'subtree': subtree[sbs_id]} for sbs_id in self.order},
+            'unassigned': unassigned
+        }
+
+
+def main():
+    import argparse
+    import json
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    parser = argparse.ArgumentParser(description="Show the SBS tree with requirement rollups")
+    parser.add_argument('requirements', nargs='?', default='data/rtm/requirements.json')
+    args = parser.parse_args()
+
+    with open(args.requirements, 'r') as f:
+        requirements = json.load(f)
+    index = ImprovedCryoplantRTMGenerator().sbs_index
+    rollup = index.rollup(requirements)
+
+    for sbs_id in index.order:
+        counts = rollup['nodes'][sbs_id]
+        types = ', '.join(f"{name} {count}" for name, count in counts['subtree']['requirement_type'].most_common())
+        print(f"{'  ' * index.depth[sbs_id]}🏗️ {sbs_id}: {counts['direct']['total']} direct, "
+              f"{counts['subtree']['total']} in subtree{f' ({types})' if types else ''}")
+    if rollup['unassigned']:
+        print(f"⚠️ {rollup['unassigned']} requirements without a known SBS node")
+    return True
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -1,50 +1,112 @@
 #!/usr/bin/env python3
 """
 Requirements Validation Script
-Validates RTM data integrity and completeness
+Validates RTM data integrity and completeness in a single streaming pass
 """
 
-import json
 import sys
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 
+from requirement_stream import CompactIdSet, iter_requirement_records
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def validate_requirements(json_path):
-    """Validate requirements data"""
+REQUIRED_FIELDS = ['req_id', 'description', 'sbs_l0', 'sbs_l1', 'requirement_type', 'priority']
+
+# Only the first messages are kept; the counts stay exact
+MAX_REPORTED_ERRORS = 1000
+
+def record_errors(req, position):
+    """Checks that only look at one requirement"""
+    if not isinstance(req, Mapping):
+        return [f"Entry {position} is not a requirement object"]
+
+    errors = []
+    label = req.get('req_id') or f"UNKNOWN (entry {position})"
+
+    # Check required fields
+    for field in REQUIRED_FIELDS:
+        if not req.get(field):
+            errors.append(f"Missing {field} in {label}")
+
+    # Check SBS consistency
+    if req.get('sbs_l2') and not req.get('sbs_l1'):
+        errors.append(f"SBS inconsistency in {label}: L2 without L1")
+    return errors
+
+def validate_stream(records):
+    """Run every check on each requirement as it streams past"""
+    ids = CompactIdSet()
+    duplicates = {}
+    errors = []
+    error_count = 0
+    count = 0
+
+    def error(message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(message)
+
+    for position, req in enumerate(records):
+        count += 1
+        for message in record_errors(req, position):
+            error(message)
+
+        # Check for duplicate IDs
+        req_id = req.get('req_id') if isinstance(req, Mapping) else None
+        if req_id:
+            first = ids.add(req_id, position)
+            if first is not None:
+                duplicates.setdefault(req_id, [first]).append(position)
+
+    for req_id, positions in duplicates.items():
+        error(f"Duplicate requirement ID {req_id} at positions {', '.join(map(str, positions))}")
+
+    return {
+        'requirements': count,
+        'errors': errors,
+        'error_count': error_count,
+        'duplicates': duplicates,
+        'id_index_bytes': ids.memory_bytes()
+    }
+
+def validate_incremental(json_path, cache_path, full=False):
+    """Also check SBS paths, enums and references, re-checking only what changed since the cached run"""
+    from incremental_validation import IncrementalValidator
+    from improved_rtm_generator import ImprovedCryoplantRTMGenerator
+
+    validator = IncrementalValidator(ImprovedCryoplantRTMGenerator().sbs_structure, cache_path)
+    report = validator.validate_path(json_path, full=full)
+    if report['full']:
+        logger.info(f"Full validation, verdicts cached in {cache_path}")
+    else:
+        logger.info(f"Incremental validation: {report['rechecked']} changed, {report['removed']} removed, "
+                    f"{report['relinked']} reference checks re-run")
+    report['errors'] = report['errors'][:MAX_REPORTED_ERRORS]
+    return report
+
+def validate_requirements(json_path, cache_path=None, full=False):
+    """Validate requirements data (requirements.json or a Parquet/Arrow export)"""
     try:
-        with open(json_path, 'r') as f:
-            requirements = json.load(f)
-        
-        errors = []
+        if cache_path:
+            report = validate_incremental(json_path, cache_path, full)
+        else:
+            report = validate_stream(iter_requirement_records(json_path))
+        errors = report['errors']
         warnings = []
         
-        # Check required fields
-        required_fields = ['req_id', 'description', 'sbs_l0', 'sbs_l1', 'requirement_type', 'priority']
-        
-        for req in requirements:
-            for field in required_fields:
-                if not req.get(field):
-                    errors.append(f"Missing {field} in {req.get('req_id', 'UNKNOWN')}")
+        logger.info(f"Validated {report['requirements']} requirements")
         
-        # Check for duplicate IDs
-        req_ids = [req['req_id'] for req in requirements]
-        if len(req_ids) != len(set(req_ids)):
-            errors.append("Duplicate requirement IDs found")
-        
-        # Check SBS consistency
-        for req in requirements:
-            if req['sbs_l2'] and not req['sbs_l1']:
-                errors.append(f"SBS inconsistency in {req['req_id']}: L2 without L1")
-        
-        logger.info(f"Validated {len(requirements)} requirements")
-        
-        if errors:
-            logger.error(f"Validation failed with {len(errors)} errors:")
+        if report['error_count']:
+            logger.error(f"Validation failed with {report['error_count']} errors:")
             for error in errors:
                 logger.error(f"  - {error}")
+            if report['error_count'] > len(errors):
+                logger.error(f"  ... {report['error_count'] - len(errors)} more")
             return False
         
         if warnings:
@@ -60,12 +122,25 @@ def validate_requirements(json_path):
         return False
 
 def main():
-    json_path = Path("data/rtm/requirements.json")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate RTM requirements")
+    parser.add_argument('requirements', nargs='?', default="data/rtm/requirements.json",
+                        help="requirements.json or a Parquet/Arrow export")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Add SBS, enum and reference checks and only re-check what changed")
+    parser.add_argument('--cache', default="data/rtm/validation_cache.json",
+                        help="Per-requirement hashes and verdicts used by --incremental")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore the cached verdicts and re-validate everything")
+    args = parser.parse_args()
+
+    json_path = Path(args.requirements)
     if not json_path.exists():
         logger.error(f"Requirements file not found: {json_path}")
         return False
     
-    return validate_requirements(json_path)
+    return validate_requirements(json_path, args.cache if args.incremental or args.full else None, args.full)
 
 if __name__ == "__main__":
     success = main()
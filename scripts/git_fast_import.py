@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Git Fast-Import Commit Backend for Pipeline Automation Hub
+Streams generated outputs onto a dedicated branch without touching the index
+"""
+
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+class FastImportCommitter:
+    def __init__(self, repo_path: str, branch: str = "pipeline-outputs",
+                 author_name: str = "Pipeline Automation Hub",
+                 author_email: str = "pipeline@automation.hub"):
+        self.repo_path = Path(repo_path)
+        self.branch = branch
+        self.ref = f"refs/heads/{branch}"
+        self.author_name = author_name
+        self.author_email = author_email
+
+    def _git(self, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+        """Run a git command inside the target repository"""
+        return subprocess.run(['git', *args],
+                              cwd=self.repo_path,
+                              capture_output=True,
+                              check=check)
+
+    def branch_exists(self) -> bool:
+        """Check whether the outputs branch already exists"""
+        result = self._git('rev-parse', '--verify', '--quiet', self.ref, check=False)
+        return result.returncode == 0
+
+    def _ensure_branch_not_checked_out(self) -> None:
+        """Refuse to move a branch that has a working tree checked out"""
+        result = self._git('symbolic-ref', '--quiet', 'HEAD', check=False)
+        is_bare = self._git('rev-parse', '--is-bare-repository').stdout.strip() == b'true'
+        if not is_bare and result.stdout.strip().decode() == self.ref:
+            raise ValueError(f"Branch '{self.branch}' is checked out; fast-import would desync the working tree")
+
+    def list_tree(self) -> Dict[str, int]:
+        """Return path -> blob size for the current tip of the outputs branch"""
+        if not self.branch_exists():
+            return {}
+
+        result = self._git('ls-tree', '-r', '-l', '-z', self.ref)
+        tree = {}
+        for entry in result.stdout.split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            size = info.split()[3]
+            tree[path.decode('utf-8')] = int(size) if size != b'-' else 0
+        return tree
+
+    def tip_blobs(self, paths: List[str]) -> Dict[str, Optional[str]]:
+        """Return path -> blob id on the tip of the outputs branch, None where the path is absent"""
+        if not paths or not self.branch_exists():
+            return {path: None for path in paths}
+
+        # One batch-check round for every '<branch>:<path>'; missing paths answer '<name> missing'
+        request = ''.join(f"{self.ref}:{path}\n" for path in paths).encode('utf-8')
+        result = subprocess.run(['git', 'cat-file', '--batch-check=%(objectname) %(objecttype)'],
+                                cwd=self.repo_path, input=request, capture_output=True, check=True)
+        blobs = {}
+        for path, line in zip(paths, result.stdout.decode('utf-8').splitlines()):
+            oid, _, kind = line.rpartition(' ')
+            blobs[path] = oid if kind == 'blob' else None
+        return blobs
+
+    def unchanged_files(self, files: Dict[str, Path]) -> List[str]:
+        """Paths whose source content already matches the blob on the branch tip"""
+        tip = self.tip_blobs(sorted(files))
+        candidates = [path for path, oid in tip.items() if oid]
+        if not candidates:
+            return []
+        result = subprocess.run(['git', 'hash-object', '--no-filters', '--stdin-paths'],
+                                cwd=self.repo_path,
+                                input=''.join(f"{files[path]}\n" for path in candidates).encode('utf-8'),
+                                capture_output=True, check=True)
+        local = result.stdout.decode('ascii').split()
+        return [path for path, oid in zip(candidates, local) if oid == tip[path]]
+
+    def _resulting_tree(self, files: Dict[str, Path], deleted: List[str], replace: bool) -> Dict[str, int]:
+        """Overlay the pending changes on the current branch tree, or on an empty one when replacing it"""
+        tree = {} if replace else self.list_tree()
+        for path in deleted:
+            tree.pop(path, None)
+        for path, source in files.items():
+            tree[path] = source.stat().st_size
+        return tree
+
+    def _write_commit_stream(self, stream, files: Dict[str, Path], deleted: List[str],
+                             message: str, parent_exists: bool, replace: bool) -> Dict[str, int]:
+        """Write a single fast-import commit with inline blobs to the stream
+
+        Each file is read once and its length taken from that read, so a file
+        rewritten meanwhile cannot desync the stream. Returns path -> bytes written.
+        """
+        timestamp = int(time.time())
+        offset = time.strftime('%z')
+        message_bytes = message.encode('utf-8')
+
+        header = [
+            f"commit {self.ref}",
+            f"committer {self.author_name} <{self.author_email}> {timestamp} {offset}",
+            f"data {len(message_bytes)}"
+        ]
+        stream.write(('\n'.join(header) + '\n').encode('utf-8'))
+        stream.write(message_bytes + b'\n')
+        if parent_exists:
+            stream.write(f"from {self.ref}^0\n".encode('utf-8'))
+        if replace:
+            stream.write(b'deleteall\n')
+
+        for path in deleted:
+            stream.write(f'D "{self._quote(path)}"\n'.encode('utf-8'))
+
+        sizes = {}
+        for path, source in sorted(files.items()):
+            content = source.read_bytes()
+            sizes[path] = len(content)
+            stream.write(f'M 100644 inline "{self._quote(path)}"\ndata {len(content)}\n'.encode('utf-8'))
+            stream.write(content)
+            stream.write(b'\n')
+
+        stream.write(b'done\n')
+        return sizes
+
+    @staticmethod
+    def _quote(path: str) -> str:
+        """Quote a path for the fast-import command stream"""
+        return path.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def commit(self, files: Dict[str, Path], deleted: Optional[List[str]] = None,
+               message: str = "Update generated outputs", dry_run: bool = False,
+               replace: bool = False) -> Dict[str, Any]:
+        """Commit files (repo path -> source file) and deletions onto the outputs branch
+
+        With replace, the commit tree is exactly files (a deleteall precedes
+        them); use it to seed a new branch with every output, not just the changed ones.
+        """
+        deleted = [] if replace else sorted(set(deleted or []) - set(files))
+        tree = self._resulting_tree(files, deleted, replace)
+
+        report = {
+            "branch": self.branch,
+            "dry_run": dry_run,
+            "files_written": len(files),
+            "files_deleted": len(deleted),
+            "tree_entries": len(tree),
+            "tree_bytes": sum(tree.values()),
+            "replaced": replace,
+            "commit": None
+        }
+
+        if dry_run or (not files and not deleted):
+            return report
+
+        self._ensure_branch_not_checked_out()
+        parent_exists = self.branch_exists()
+
+        process = subprocess.Popen(['git', 'fast-import', '--quiet', '--done'],
+                                   cwd=self.repo_path,
+                                   stdin=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        try:
+            tree.update(self._write_commit_stream(process.stdin, files, deleted, message, parent_exists, replace))
+            report["tree_bytes"] = sum(tree.values())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, 'git fast-import',
+                                                stderr=stderr.decode('utf-8', errors='replace'))
+
+        report["commit"] = self._git('rev-parse', self.ref).stdout.decode().strip()
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Commit a directory onto an outputs branch via git fast-import")
+    parser.add_argument("repo", help="Target repository (bare or non-bare)")
+    parser.add_argument("source", help="Directory whose files are committed")
+    parser.add_argument("--branch", default="pipeline-outputs")
+    parser.add_argument("--prefix", default="", help="Path prefix inside the branch tree")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    source_dir = Path(args.source)
+    prefix = args.prefix.strip('/')
+    files = {
+        f"{prefix}/{path.relative_to(source_dir).as_posix()}".lstrip('/'): path
+        for path in source_dir.rglob('*') if path.is_file()
+    }
+
+    committer = FastImportCommitter(args.repo, args.branch)
+    report = committer.commit(files, dry_run=args.dry_run)
+
+    print(f"🌿 Branch: {report['branch']}")
+    print(f"📝 Files written: {report['files_written']}")
+    print(f"🗑️  Files deleted: {report['files_deleted']}")
+    print(f"📊 Tree: {report['tree_entries']} entries, {report['tree_bytes']} bytes")
+    if report['commit']:
+        print(f"💾 Commit: {report['commit']}")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Persistent Git Session for Pipeline Automation Hub
+Answers repository status and object queries through long-lived git processes
+"""
+
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+class GitSession:
+    def __init__(self, repo_path: str):
+        self.repo_path = Path(repo_path)
+        self.git_dir = None
+        self.common_dir = None
+        self._batch = None
+        self._batch_check = None
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._fingerprint = None
+        self._locate_git_dir()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _locate_git_dir(self) -> None:
+        """Resolve the git and common directories once for the lifetime of the session"""
+        # --path-format=absolute needs git 2.31; --absolute-git-dir (2.13) plus resolving
+        # the common dir, which older versions print relative to the working directory
+        result = subprocess.run(['git', 'rev-parse', '--absolute-git-dir', '--git-common-dir'],
+                                cwd=self.repo_path,
+                                capture_output=True,
+                                text=True)
+        if result.returncode != 0:
+            return
+
+        git_dir, common_dir = result.stdout.splitlines()[:2]
+        self.git_dir = Path(git_dir)
+        self.common_dir = (self.repo_path / common_dir).resolve()
+
+    def is_repository(self) -> bool:
+        """Check whether the session points at a git repository"""
+        return self.git_dir is not None
+
+    def reset(self) -> None:
+        """Drop processes and caches, e.g. after the repository was (re)initialised"""
+        self.close()
+        self._cache.clear()
+        self._fingerprint = None
+        self._locate_git_dir()
+
+    def close(self) -> None:
+        """Terminate the long-lived cat-file processes"""
+        for process in (self._batch, self._batch_check):
+            if process and process.poll() is None:
+                process.stdin.close()
+                process.wait()
+        self._batch = None
+        self._batch_check = None
+
+    def _start(self, mode: str) -> subprocess.Popen:
+        """Start a cat-file process in the given batch mode"""
+        return subprocess.Popen(['git', 'cat-file', mode],
+                                cwd=self.repo_path,
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL)
+
+    def _stat_key(self, path: Path) -> Optional[Tuple[int, int, int]]:
+        """Identify a file revision by inode, size and modification time"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_head_file(self) -> str:
+        """Read the raw contents of .git/HEAD"""
+        with open(self.git_dir / "HEAD", 'r') as f:
+            return f.read().strip()
+
+    def _current_fingerprint(self) -> Tuple:
+        """Cheap fingerprint of HEAD and the refs it depends on"""
+        head = self._read_head_file()
+        key = [head, self._stat_key(self.common_dir / "packed-refs")]
+        if head.startswith("ref: "):
+            key.append(self._stat_key(self.common_dir / head[5:]))
+        return tuple(key)
+
+    def _cached(self, name: str, compute):
+        """Return a cached value, invalidating all entries when HEAD or refs moved"""
+        fingerprint = self._current_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._cache.clear()
+            self._fingerprint = fingerprint
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def object_info(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Return (oid, type, size) for a revision or None when it does not exist"""
+        with self._lock:
+            if self._batch_check is None or self._batch_check.poll() is not None:
+                self._batch_check = self._start('--batch-check')
+            self._batch_check.stdin.write(rev.encode('utf-8') + b'\n')
+            self._batch_check.stdin.flush()
+            header = self._batch_check.stdout.readline().decode('utf-8').split()
+
+        if len(header) != 3:
+            return None
+        return header[0], header[1], int(header[2])
+
+    def read_object(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (oid, type, content) for a revision or None when it does not exist"""
+        with self._lock:
+            if self._batch is None or self._batch.poll() is not None:
+                self._batch = self._start('--batch')
+            self._batch.stdin.write(rev.encode('utf-8') + b'\n')
+            self._batch.stdin.flush()
+            header = self._batch.stdout.readline().decode('utf-8').split()
+            if len(header) != 3:
+                return None
+            content = self._batch.stdout.read(int(header[2]))
+            self._batch.stdout.read(1)  # trailing newline
+
+        return header[0], header[1], content
+
+    def current_branch(self) -> str:
+        """Return the checked out branch name, empty when HEAD is detached"""
+        def compute():
+            head = self._read_head_file()
+            if head.startswith("ref: refs/heads/"):
+                return head[len("ref: refs/heads/"):]
+            return ""
+        return self._cached("branch", compute)
+
+    def head_commit(self) -> Optional[str]:
+        """Return the commit id of HEAD, None on an unborn branch"""
+        def compute():
+            info = self.object_info("HEAD")
+            return info[0] if info else None
+        return self._cached("head", compute)
+
+    def commit_count(self) -> int:
+        """Count commits reachable from HEAD, cached until HEAD or refs move"""
+        def compute():
+            if not self.head_commit():
+                return 0
+            # One rev-list walks the commit graph (and honours shallow boundaries)
+            # in a single process instead of one cat-file round trip per commit
+            result = subprocess.run(['git', 'rev-list', '--count', 'HEAD'],
+                                    cwd=self.repo_path,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True)
+            return int(result.stdout.strip())
+        return self._cached("commit_count", compute)
+
+    def last_commit(self) -> str:
+        """Return HEAD as '<short id> <subject>' (equivalent to log -1 --oneline)"""
+        def compute():
+            head = self.head_commit()
+            obj = self.read_object(head) if head else None
+            if not obj:
+                return ""
+            _, _, message = obj[2].decode('utf-8', errors='replace').partition('\n\n')
+            subject = message.strip().split('\n', 1)[0] if message.strip() else ""
+            return f"{head[:7]} {subject}"
+        return self._cached("last_commit", compute)
+
+    def object_counts(self) -> Dict[str, Any]:
+        """Loose and packed object statistics read directly from the object store"""
+        def compute():
+            objects_dir = self.common_dir / "objects"
+            loose_count = 0
+            loose_bytes = 0
+            for entry in os.scandir(objects_dir):
+                if len(entry.name) == 2 and entry.is_dir():
+                    for obj in os.scandir(entry.path):
+                        loose_count += 1
+                        loose_bytes += obj.stat().st_size
+
+            in_pack = 0
+            pack_bytes = 0
+            pack_dir = objects_dir / "pack"
+            if pack_dir.exists():
+                for idx in pack_dir.glob("*.idx"):
+                    with open(idx, 'rb') as f:
+                        header = f.read(8 + 256 * 4)
+                    # Version 2 index: magic, version, then 256 fan-out entries
+                    if header[:4] == b'\xfftOc' and len(header) == 8 + 256 * 4:
+                        in_pack += int.from_bytes(header[-4:], 'big')
+                    pack = idx.with_suffix('.pack')
+                    if pack.exists():
+                        pack_bytes += pack.stat().st_size
+
+            return {
+                "count": loose_count,
+                "size_bytes": loose_bytes,
+                "in_pack": in_pack,
+                "size_pack_bytes": pack_bytes
+            }
+        return self._cached("object_counts", compute)
+
+    def status(self) -> Dict[str, Any]:
+        """Aggregate repository status used by the integration dashboard"""
+        return self._cached("status", lambda: {
+            "branch": self.current_branch(),
+            "head": self.head_commit(),
+            "commit_count": self.commit_count(),
+            "last_commit": self.last_commit(),
+            "objects": self.object_counts()
+        })
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    repo = sys.argv[1] if len(sys.argv) > 1 else "."
+    with GitSession(repo) as session:
+        if not session.is_repository():
+            print(f"❌ Not a git repository: {repo}")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        status = session.status()
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        session.status()
+        warm = time.perf_counter() - start
+
+        print(f"📍 Branch: {status['branch']}")
+        print(f"📝 Commits: {status['commit_count']}")
+        print(f"💾 Last Commit: {status['last_commit']}")
+        print(f"⏱️  Cold status: {cold * 1000:.2f} ms, cached status: {warm * 1e6:.1f} µs")
@@ -10,11 +10,19 @@ import subprocess
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from git_fast_import import FastImportCommitter
+from git_session import GitSession
+from processing_manifest import ProcessingManifest
+from ppt_processor import DETAILS_FILENAME, iter_processing_details
 
 class GitHubIntegrator:
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, commit_backend: str = "index",
+                 outputs_branch: str = "pipeline-outputs"):
         self.project_root = Path(project_root)
+        self.commit_backend = commit_backend
+        self.outputs_branch = outputs_branch
         self.outputs_dir = self.project_root / "app" / "public" / "outputs"
         self.repo_structure = {
             "master_input": "Original PowerPoint files",
@@ -23,17 +31,15 @@ class GitHubIntegrator:
             "cross_references": "SCK CEN cross-reference mappings",
             "processing_logs": "Processing and change logs"
         }
+        # Files written by the integrator itself during the current run
+        self.written_files = set()
+        self.git_session = GitSession(str(self.project_root))
     
     def initialize_git_repo(self) -> bool:
         """Initialize Git repository if not already initialized"""
         try:
             # Check if already a git repo
-            result = subprocess.run(['git', 'status'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, 
-                                  text=True)
-            
-            if result.returncode != 0:
+            if not self.git_session.is_repository():
                 # Initialize new git repo
                 print("🔧 Initializing Git repository...")
                 subprocess.run(['git', 'init'], cwd=self.project_root, check=True)
@@ -43,6 +49,7 @@ class GitHubIntegrator:
                              cwd=self.project_root, check=True)
                 subprocess.run(['git', 'config', 'user.email', 'pipeline@automation.hub'], 
                              cwd=self.project_root, check=True)
+                self.git_session.reset()
                 
                 print("✅ Git repository initialized")
             else:
@@ -124,11 +131,16 @@ venv.bak/
 !app/public/outputs/metadata/
 !app/public/outputs/cross_references/
 !app/public/outputs/processing_summary.json
+!app/public/outputs/processing_details.jsonl
+
+# Per-run change set handed from the processor to the integrator
+app/public/outputs/output_changes.json
 """
         
         gitignore_path = self.project_root / ".gitignore"
         with open(gitignore_path, 'w') as f:
             f.write(gitignore_content)
+        self.written_files.add(gitignore_path)
         
         print("📝 Created comprehensive .gitignore file")
     
@@ -162,7 +174,8 @@ app/public/outputs/
 ├── digital_twins/              # Markdown digital twin representations
 ├── metadata/                   # JSON metadata files
 ├── cross_references/           # SCK CEN reference mappings
-└── processing_summary.json     # Overall processing summary
+├── processing_summary.json     # Overall processing summary (counts only)
+└── processing_details.jsonl    # Per-file processing detail (JSON Lines)
 ```
 
 ## 🚀 Features
@@ -252,6 +265,7 @@ This system provides a complete pipeline automation solution with comprehensive
         readme_path = self.project_root / "README.md"
         with open(readme_path, 'w') as f:
             f.write(readme_content)
+        self.written_files.add(readme_path)
         
         print("📚 Created comprehensive README.md")
     
@@ -273,123 +287,255 @@ This system provides a complete pipeline automation solution with comprehensive
         print("📁 Directory structure verified")
     
     def create_processing_manifest(self) -> None:
-        """Create manifest of processed files"""
+        """Record processed files in the content-addressed manifest"""
         try:
             summary_path = self.outputs_dir / "processing_summary.json"
             if summary_path.exists():
                 with open(summary_path, 'r') as f:
                     summary = json.load(f)
                 
-                manifest = {
-                    "generated": datetime.now().isoformat(),
-                    "pipeline_version": "1.0.0",
-                    "processing_summary": summary,
+                # Older summaries still embed the per-file records
+                if (self.outputs_dir / DETAILS_FILENAME).exists():
+                    files_processed = iter_processing_details(str(self.outputs_dir))
+                else:
+                    files_processed = summary.get("files_processed", [])
+                
+                manifest = ProcessingManifest(str(self.project_root))
+                delta = manifest.update(files_processed, extra={
+                    "processing_totals": {
+                        key: summary.get(key) for key in ("total_files", "successful", "failed")
+                    },
                     "repository_structure": self.repo_structure,
                     "git_integration": {
                         "tracking_enabled": True,
                         "change_detection": True,
                         "version_control": True
                     }
-                }
-                
-                manifest_path = self.project_root / "PROCESSING_MANIFEST.json"
-                with open(manifest_path, 'w', encoding='utf-8') as f:
-                    json.dump(manifest, f, indent=2, ensure_ascii=False)
+                })
+                self.written_files.update([manifest.manifest_path, manifest.log_path])
                 
-                print("📋 Created processing manifest")
+                print(f"📋 Updated processing manifest: {delta['added']} added, "
+                      f"{delta['changed']} changed, {delta['removed']} removed")
             else:
                 print("⚠️  Processing summary not found, skipping manifest creation")
                 
         except Exception as e:
             print(f"❌ Failed to create manifest: {e}")
     
-    def stage_and_commit_changes(self) -> bool:
-        """Stage and commit processed files"""
+    def load_output_changes(self) -> Dict[str, List[str]]:
+        """Load the change set recorded by the processor for the last run"""
+        changes = {"created": [], "modified": [], "deleted": []}
+        changes_path = self.outputs_dir / "output_changes.json"
+        
+        if changes_path.exists():
+            with open(changes_path, 'r', encoding='utf-8') as f:
+                for kind, paths in json.load(f).items():
+                    changes.setdefault(kind, []).extend(paths)
+        else:
+            print("⚠️  Output change set not found, only integrator files will be staged")
+        
+        return changes
+    
+    def load_run_summary(self) -> Dict[str, Any]:
+        """Load processing statistics of the last run"""
+        summary_path = self.outputs_dir / "processing_summary.json"
+        if not summary_path.exists():
+            return {}
+        
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def collect_changed_paths(self, changes: Dict[str, List[str]]) -> List[str]:
+        """Resolve changed outputs and integrator files to paths relative to the repository"""
+        paths = set()
+        
+        for kind in ("created", "modified", "deleted"):
+            for output_path in changes.get(kind, []):
+                paths.add((self.outputs_dir / output_path).relative_to(self.project_root).as_posix())
+        
+        for written_path in self.written_files:
+            paths.add(written_path.relative_to(self.project_root).as_posix())
+        
+        return sorted(paths)
+    
+    def list_output_files(self) -> List[Path]:
+        """Every output file that is tracked or not ignored, as the index backend would commit it"""
+        result = subprocess.run(['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard', '--',
+                                 self.outputs_dir.relative_to(self.project_root).as_posix()],
+                                cwd=self.project_root, capture_output=True, check=True)
+        paths = dict.fromkeys(path.decode('utf-8') for path in result.stdout.split(b'\0') if path)
+        return [self.project_root / path for path in paths if (self.project_root / path).is_file()]
+    
+    def ignored_paths(self, paths: List[str]) -> set:
+        """Untracked paths matched by .gitignore, from one git check-ignore call"""
+        if not paths:
+            return set()
+        result = subprocess.run(['git', 'check-ignore', '--stdin', '-z'],
+                                cwd=self.project_root,
+                                input=''.join(f"{path}\0" for path in paths).encode('utf-8'),
+                                capture_output=True)
+        # Exit code 1 means nothing is ignored
+        if result.returncode not in (0, 1):
+            raise subprocess.CalledProcessError(result.returncode, 'git check-ignore',
+                                                stderr=result.stderr.decode('utf-8', errors='replace'))
+        return {path.decode('utf-8') for path in result.stdout.split(b'\0') if path}
+    
+    def build_commit_message(self, summary: Dict[str, Any], changes: Dict[str, List[str]]) -> str:
+        """Build commit message from the statistics of the actual run"""
+        lines = [
+            "Document Processing Pipeline - Output Update",
+            "",
+            f"✅ Processed {summary.get('successful', 0)} of {summary.get('total_files', 0)} files successfully"
+        ]
+        if summary.get('failed'):
+            lines.append(f"❌ Failed: {summary['failed']} files")
+        
+        lines.append(
+            f"📁 Outputs: {len(changes.get('created', []))} created, "
+            f"{len(changes.get('modified', []))} modified, "
+            f"{len(changes.get('deleted', []))} deleted"
+        )
+        
+        categories = summary.get('categories_summary', {})
+        if categories:
+            lines.extend(["", "Categories processed:"])
+            for category, count in sorted(categories.items()):
+                lines.append(f"- {category} ({count} file{'s' if count != 1 else ''})")
+        
+        references = summary.get('cross_references_global', [])
+        if references:
+            lines.extend(["", "Cross-references extracted:", f"- {', '.join(references)}"])
+        
+        lines.extend(["", f"Processing completed: {summary.get('processing_completed', datetime.now().isoformat())}"])
+        
+        return "\n".join(lines) + "\n"
+    
+    def stage_and_commit_changes(self, changes: Optional[Dict[str, List[str]]] = None,
+                                 summary: Optional[Dict[str, Any]] = None) -> bool:
+        """Stage and commit only the outputs changed by the last pipeline run"""
         try:
-            # Add all processed outputs
-            subprocess.run(['git', 'add', '.'], cwd=self.project_root, check=True)
+            if changes is None:
+                changes = self.load_output_changes()
+            if summary is None:
+                summary = self.load_run_summary()
             
-            # Create comprehensive commit message
-            commit_message = f"""Document Processing Pipeline - Complete Integration
-
-✅ Processed 24 PowerPoint files successfully
-📊 Generated digital twins and metadata
-🔗 Extracted SCK CEN cross-references
-📁 Created comprehensive file structure
-
-Categories processed:
-- SYSTEM_ARCHITECTURE (3 files)
-- SYSTEMS (4 files)  
-- COMPLIANCE (2 files)
-- INFRASTRUCTURE (3 files)
-- STANDARDS (2 files)
-- VALUES_POLICY (1 file)
-- PROJECT_STATUS (1 file)
-- GENERAL (8 files)
-
-Cross-references extracted:
-- SCK CEN/0245, SCK CEN/0156, SCK CEN/0334
-- SCK CEN/0567, SCK CEN/0789
-
-Processing completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
+            paths = self.collect_changed_paths(changes)
+            # update-index does not read .gitignore; drop what git add would refuse (tracked paths stay)
+            ignored = self.ignored_paths(paths)
+            if ignored:
+                print(f"ℹ️  Skipping {len(ignored)} ignored outputs")
+                paths = [path for path in paths if path not in ignored]
+            if not paths:
+                print("ℹ️  No outputs changed, skipping commit")
+                return True
             
+            # Stage additions, modifications and deletions in a single index update
+            subprocess.run(['git', 'update-index', '--add', '--remove', '-z', '--stdin'],
+                         cwd=self.project_root,
+                         input=''.join(f"{path}\0" for path in paths),
+                         text=True,
+                         check=True)
+            
+            # Skip the commit when the staged content matches HEAD
+            result = subprocess.run(['git', 'diff', '--cached', '--quiet'],
+                                  cwd=self.project_root)
+            if result.returncode == 0:
+                print("ℹ️  Staged outputs match HEAD, skipping commit")
+                return True
+            
+            commit_message = self.build_commit_message(summary, changes)
             subprocess.run(['git', 'commit', '-m', commit_message], 
                          cwd=self.project_root, check=True)
             
-            print("✅ Changes committed to Git repository")
+            print(f"✅ Committed {len(paths)} changed files to Git repository")
             return True
             
         except subprocess.CalledProcessError as e:
             print(f"❌ Failed to commit changes: {e}")
             return False
     
+    def fast_import_outputs(self, changes: Optional[Dict[str, List[str]]] = None,
+                            summary: Optional[Dict[str, Any]] = None,
+                            dry_run: bool = False) -> bool:
+        """Commit changed outputs onto the outputs branch through git fast-import"""
+        try:
+            if changes is None:
+                changes = self.load_output_changes()
+            if summary is None:
+                summary = self.load_run_summary()
+            
+            committer = FastImportCommitter(str(self.project_root), self.outputs_branch)
+            # A new branch starts from every output, later commits carry only the changes
+            seed = not committer.branch_exists()
+            files = {}
+            if seed:
+                for source in self.list_output_files():
+                    files[source.relative_to(self.project_root).as_posix()] = source
+            else:
+                for kind in ("created", "modified"):
+                    for output_path in changes.get(kind, []):
+                        source = self.outputs_dir / output_path
+                        files[source.relative_to(self.project_root).as_posix()] = source
+            deleted = [
+                (self.outputs_dir / output_path).relative_to(self.project_root).as_posix()
+                for output_path in changes.get("deleted", [])
+            ]
+            
+            # README, .gitignore and the manifest are rewritten on every run; only changed ones go along
+            written = {
+                written_path.relative_to(self.project_root).as_posix(): written_path
+                for written_path in self.written_files if written_path.exists()
+            }
+            if not seed:
+                for path in committer.unchanged_files(written):
+                    del written[path]
+                tip = committer.tip_blobs(deleted)
+                deleted = [path for path in deleted if tip[path]]
+            files.update(written)
+            
+            if not files and not deleted:
+                print("ℹ️  No outputs changed, skipping commit")
+                return True
+            
+            report = committer.commit(files, deleted,
+                                      message=self.build_commit_message(summary, changes),
+                                      dry_run=dry_run, replace=seed)
+            
+            action = "Would commit" if dry_run else "Committed"
+            if seed:
+                print(f"🌱 Seeding new branch '{report['branch']}' with every output")
+            print(f"✅ {action} {report['files_written']} written / {report['files_deleted']} deleted "
+                  f"outputs to '{report['branch']}'")
+            print(f"📊 Resulting tree: {report['tree_entries']} entries, {report['tree_bytes']} bytes")
+            return True
+            
+        except (subprocess.CalledProcessError, ValueError) as e:
+            print(f"❌ Failed to fast-import outputs: {e}")
+            return False
+    
     def display_integration_status(self) -> None:
         """Display current integration status"""
         print("\n🔍 GitHub Integration Status")
         print("-" * 50)
         
         try:
-            # Get current branch
-            result = subprocess.run(['git', 'branch', '--show-current'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            current_branch = result.stdout.strip()
-            print(f"📍 Current Branch: {current_branch}")
+            if not self.git_session.is_repository():
+                print("⚠️  Could not retrieve Git status: not a Git repository")
+                return
             
-            # Get commit count
-            result = subprocess.run(['git', 'rev-list', '--count', 'HEAD'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            commit_count = result.stdout.strip()
-            print(f"📝 Total Commits: {commit_count}")
-            
-            # Get last commit info
-            result = subprocess.run(['git', 'log', '-1', '--oneline'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            last_commit = result.stdout.strip()
-            print(f"💾 Last Commit: {last_commit}")
+            status = self.git_session.status()
+            print(f"📍 Current Branch: {status['branch']}")
+            print(f"📝 Total Commits: {status['commit_count']}")
+            print(f"💾 Last Commit: {status['last_commit']}")
             
             # Repository size
-            result = subprocess.run(['git', 'count-objects', '-vH'], 
-                                  cwd=self.project_root, 
-                                  capture_output=True, 
-                                  text=True, 
-                                  check=True)
-            repo_info = result.stdout
+            objects = status['objects']
             print(f"📊 Repository Info:")
-            for line in repo_info.split('\n')[:3]:  # First 3 lines
-                if line.strip():
-                    print(f"   {line}")
+            print(f"   count: {objects['count']}")
+            print(f"   size: {objects['size_bytes'] / 1024:.2f} KiB")
+            print(f"   in-pack: {objects['in_pack']}")
             
-        except subprocess.CalledProcessError as e:
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
             print(f"⚠️  Could not retrieve Git status: {e}")
     
     def integrate(self) -> bool:
@@ -412,7 +558,10 @@ Processing completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         self.create_processing_manifest()
         
         # Step 4: Commit changes
-        if success and not self.stage_and_commit_changes():
+        if self.commit_backend == "fast-import":
+            if success and not self.fast_import_outputs():
+                success = False
+        elif success and not self.stage_and_commit_changes():
             success = False
         
         # Step 5: Display status
@@ -428,6 +577,7 @@ Processing completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         else:
             print("\n❌ GitHub Integration encountered issues")
         
+        self.git_session.close()
         return success
 
 
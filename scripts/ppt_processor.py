@@ -8,10 +8,24 @@ Extracts metadata, content, and generates Markdown digital twins
 import os
 import json
 import re
+import filecmp
 from datetime import datetime
 from pathlib import Path
 import hashlib
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
+
+DETAILS_FILENAME = "processing_details.jsonl"
+
+def iter_processing_details(output_dir: str) -> Iterator[Dict[str, Any]]:
+    """Stream per-file processing records from the JSON Lines detail file"""
+    details_path = Path(output_dir) / DETAILS_FILENAME
+    if not details_path.exists():
+        return
+    
+    with open(details_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
 
 class PPTProcessor:
     def __init__(self, input_dir: str, output_dir: str):
@@ -24,6 +38,10 @@ class PPTProcessor:
         # Create output directories
         for dir_path in [self.metadata_dir, self.twins_dir, self.cross_refs_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
+        
+        # Outputs touched during the current run, relative to output_dir
+        self.output_changes = {"created": set(), "modified": set(), "deleted": set()}
+        self.produced_outputs = set()
     
     def extract_filename_metadata(self, filename: str) -> Dict[str, Any]:
         """Extract metadata from filename patterns"""
@@ -233,40 +251,102 @@ class PPTProcessor:
             "processing_status": "COMPLETED"
         }
     
+    def _write_output(self, output_path: Path, content: str) -> None:
+        """Write an output file and record whether it was created or modified"""
+        relative_path = output_path.relative_to(self.output_dir).as_posix()
+        self.produced_outputs.add(relative_path)
+        
+        data = content.encode('utf-8')
+        if output_path.exists():
+            if output_path.read_bytes() == data:
+                return
+            self.output_changes["modified"].add(relative_path)
+        else:
+            self.output_changes["created"].add(relative_path)
+        
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    
     def _save_metadata(self, filename: str, metadata: Dict[str, Any]):
         """Save metadata as JSON"""
         json_filename = filename.replace('.pptx', '_metadata.json')
         output_path = self.metadata_dir / json_filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        self._write_output(output_path, json.dumps(metadata, indent=2, ensure_ascii=False))
     
     def _save_cross_references(self, filename: str, cross_refs: List[Dict[str, str]]):
         """Save cross-references as JSON"""
         json_filename = filename.replace('.pptx', '_cross_refs.json')
         output_path = self.cross_refs_dir / json_filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(cross_refs, f, indent=2, ensure_ascii=False)
+        self._write_output(output_path, json.dumps(cross_refs, indent=2, ensure_ascii=False))
     
     def _save_digital_twin(self, filename: str, content: str, metadata: Dict[str, Any]):
         """Save digital twin as Markdown"""
         md_filename = metadata["normalized_name"].replace('.pptx', '.md')
         output_path = self.twins_dir / md_filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_output(output_path, content)
+    
+    def _commit_streamed_output(self, temp_path: Path, output_path: Path) -> None:
+        """Move a streamed temporary file into place, recording it only if it changed"""
+        relative_path = output_path.relative_to(self.output_dir).as_posix()
+        self.produced_outputs.add(relative_path)
+        
+        if output_path.exists():
+            if filecmp.cmp(temp_path, output_path, shallow=False):
+                temp_path.unlink()
+                return
+            self.output_changes["modified"].add(relative_path)
+        else:
+            self.output_changes["created"].add(relative_path)
+        
+        os.replace(temp_path, output_path)
+    
+    def prune_stale_outputs(self, source_filenames: List[str]) -> None:
+        """Remove per-file outputs whose source presentation no longer exists"""
+        expected_outputs = set(self.produced_outputs)
+        for filename in source_filenames:
+            normalized_name = re.sub(r'[^a-zA-Z0-9._-]', '_', filename)
+            expected_outputs.update([
+                f"{self.metadata_dir.name}/{filename.replace('.pptx', '_metadata.json')}",
+                f"{self.cross_refs_dir.name}/{filename.replace('.pptx', '_cross_refs.json')}",
+                f"{self.twins_dir.name}/{normalized_name.replace('.pptx', '.md')}"
+            ])
+        
+        stale_patterns = [
+            (self.metadata_dir, "*_metadata.json"),
+            (self.cross_refs_dir, "*_cross_refs.json"),
+            (self.twins_dir, "*.md")
+        ]
+        
+        for directory, pattern in stale_patterns:
+            for output_path in directory.glob(pattern):
+                relative_path = output_path.relative_to(self.output_dir).as_posix()
+                if relative_path not in expected_outputs:
+                    output_path.unlink()
+                    self.output_changes["deleted"].add(relative_path)
+    
+    def save_output_changes(self) -> Dict[str, List[str]]:
+        """Persist the change set of the current run for the Git integrator"""
+        changes = {kind: sorted(paths) for kind, paths in self.output_changes.items()}
+        
+        changes_path = self.output_dir / "output_changes.json"
+        with open(changes_path, 'w', encoding='utf-8') as f:
+            json.dump(changes, f, indent=2, ensure_ascii=False)
+        
+        return changes
     
     def process_all_files(self) -> Dict[str, Any]:
         """Process all PowerPoint files in input directory"""
         results = {
             "processing_started": datetime.now().isoformat(),
-            "files_processed": [],
             "total_files": 0,
             "successful": 0,
             "failed": 0,
             "cross_references_global": [],
-            "categories_summary": {}
+            "categories_summary": {},
+            "details_file": DETAILS_FILENAME
         }
         
         # Find all PPTX files
@@ -276,36 +356,48 @@ class PPTProcessor:
         categories = {}
         global_refs = set()
         
-        for filepath in pptx_files:
-            try:
-                result = self.process_file(filepath.name)
-                results["files_processed"].append(result)
-                results["successful"] += 1
-                
-                # Collect category statistics
-                category = result["metadata"].get("category", "UNKNOWN")
-                categories[category] = categories.get(category, 0) + 1
-                
-                # Collect global cross-references
-                for ref in result["cross_references"]:
-                    global_refs.add(ref["reference"])
+        # Per-file records are streamed to JSON Lines instead of held in the summary
+        details_path = self.output_dir / DETAILS_FILENAME
+        temp_details_path = details_path.with_suffix(".jsonl.tmp")
+        
+        with open(temp_details_path, 'w', encoding='utf-8') as details:
+            for filepath in pptx_files:
+                try:
+                    result = self.process_file(filepath.name)
+                    results["successful"] += 1
+                    
+                    # Collect category statistics
+                    category = result["metadata"].get("category", "UNKNOWN")
+                    categories[category] = categories.get(category, 0) + 1
+                    
+                    # Collect global cross-references
+                    for ref in result["cross_references"]:
+                        global_refs.add(ref["reference"])
+                    
+                except Exception as e:
+                    results["failed"] += 1
+                    result = {
+                        "filename": filepath.name,
+                        "error": str(e),
+                        "processing_status": "FAILED"
+                    }
                 
-            except Exception as e:
-                results["failed"] += 1
-                results["files_processed"].append({
-                    "filename": filepath.name,
-                    "error": str(e),
-                    "processing_status": "FAILED"
-                })
+                details.write(json.dumps(result, ensure_ascii=False) + "\n")
+        
+        self._commit_streamed_output(temp_details_path, details_path)
         
         results["categories_summary"] = categories
         results["cross_references_global"] = sorted(list(global_refs))
         results["processing_completed"] = datetime.now().isoformat()
         
+        # Drop outputs of presentations removed from the input directory
+        self.prune_stale_outputs([filepath.name for filepath in pptx_files])
+        
         # Save processing summary
         summary_path = self.output_dir / "processing_summary.json"
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        self._write_output(summary_path, json.dumps(results, indent=2, ensure_ascii=False))
+        
+        results["output_changes"] = self.save_output_changes()
         
         return results
 
@@ -328,4 +420,5 @@ if __name__ == "__main__":
     print(f"❌ Failed: {results['failed']}")
     print(f"📁 Categories found: {list(results['categories_summary'].keys())}")
     print(f"🔗 Cross-references: {len(results['cross_references_global'])}")
+    print(f"📝 Outputs changed: {sum(len(paths) for paths in results['output_changes'].values())}")
     print(f"💾 Outputs saved to: {output_directory}")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Processing Manifest for Pipeline Automation Hub
+Content-addressed document manifest with an append-only delta history
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+MANIFEST_FORMAT = "delta-v1"
+
+class ProcessingManifest:
+    """
+    Keeps PROCESSING_MANIFEST.json as a small header and records every run as
+    one delta line in PROCESSING_MANIFEST.log.jsonl.
+
+    Documents are keyed by the SHA256 of their source file. Editing a source
+    therefore shows up as the old hash removed and the new hash added, while
+    renames or re-classification of identical content are "changed" entries.
+    """
+
+    def __init__(self, project_root: str, pipeline_version: str = "1.0.0"):
+        self.project_root = Path(project_root)
+        self.pipeline_version = pipeline_version
+        self.manifest_path = self.project_root / "PROCESSING_MANIFEST.json"
+        self.log_path = self.project_root / "PROCESSING_MANIFEST.log.jsonl"
+
+    @staticmethod
+    def document_entries(files_processed: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Build content-addressed entries from processed file records"""
+        entries = {}
+        for record in files_processed:
+            metadata = record.get("metadata")
+            if not metadata:
+                continue  # failed files have no outputs to track
+
+            filename = metadata.get("original_filename", record.get("filename", ""))
+            content_hash = metadata.get("file_hash") or hashlib.sha256(filename.encode('utf-8')).hexdigest()
+
+            entry = entries.setdefault(content_hash, {
+                "filenames": [],
+                "category": metadata.get("category", "UNKNOWN"),
+                "priority": metadata.get("priority", "MEDIUM"),
+                "sub_category": metadata.get("sub_category", ""),
+                "file_size": metadata.get("file_size", 0),
+                "cross_references": sorted({ref["reference"] for ref in record.get("cross_references", [])})
+            })
+            entry["filenames"] = sorted(set(entry["filenames"]) | {filename})
+
+        return entries
+
+    @staticmethod
+    def compute_delta(previous: Dict[str, Dict[str, Any]],
+                      current: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Return added, changed and removed entries between two states"""
+        return {
+            "added": {key: entry for key, entry in current.items() if key not in previous},
+            "changed": {key: entry for key, entry in current.items()
+                        if key in previous and previous[key] != entry},
+            "removed": sorted(key for key in previous if key not in current)
+        }
+
+    @staticmethod
+    def apply_delta(state: Dict[str, Dict[str, Any]], delta: Dict[str, Any]) -> None:
+        """Apply a delta record to a state in place"""
+        for key in delta.get("removed", []):
+            state.pop(key, None)
+        state.update(delta.get("added", {}))
+        state.update(delta.get("changed", {}))
+
+    @staticmethod
+    def state_digest(state: Dict[str, Dict[str, Any]]) -> str:
+        """Stable digest of a reconstructed state"""
+        canonical = json.dumps(state, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def iter_deltas(self) -> Iterator[Dict[str, Any]]:
+        """Stream delta records from the history log"""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def state_at(self, run: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Reconstruct the document state after the given run (latest by default)"""
+        state = {}
+        for delta in self.iter_deltas():
+            if run is not None and delta["run"] > run:
+                break
+            self.apply_delta(state, delta)
+        return state
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """List recorded runs with their change counts"""
+        return [{
+            "run": delta["run"],
+            "timestamp": delta["timestamp"],
+            "added": len(delta.get("added", {})),
+            "changed": len(delta.get("changed", {})),
+            "removed": len(delta.get("removed", []))
+        } for delta in self.iter_deltas()]
+
+    def load_header(self) -> Dict[str, Any]:
+        """Load the manifest header, empty when missing"""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _append_delta(self, run: int, delta: Dict[str, Any], timestamp: str) -> None:
+        """Append one compact delta line to the history log"""
+        record = {"run": run, "timestamp": timestamp, **delta}
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False) + "\n")
+
+    def _migrate_legacy(self, header: Dict[str, Any]) -> int:
+        """Seed the history from a manifest that still embeds the full summary"""
+        summary = header.get("processing_summary")
+        if not summary or self.log_path.exists():
+            return 0
+        state = self.document_entries(summary.get("files_processed", []))
+        self._append_delta(0, self.compute_delta({}, state), header.get("generated", ""))
+        return 1
+
+    def update(self, files_processed: Iterable[Dict[str, Any]],
+               extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Record the current run and rewrite the header; returns the delta counts"""
+        header = self.load_header()
+        if header.get("manifest_format") != MANIFEST_FORMAT:
+            self._migrate_legacy(header)
+            header = {}
+
+        previous = self.state_at()
+        current = self.document_entries(files_processed)
+        delta = self.compute_delta(previous, current)
+        counts = {kind: len(items) for kind, items in delta.items()}
+
+        if not any(counts.values()) and header:
+            return counts
+
+        timestamp = datetime.now().isoformat()
+        run = header.get("current_run", max((d["run"] for d in self.iter_deltas()), default=-1)) + 1
+        if any(counts.values()):
+            self._append_delta(run, delta, timestamp)
+
+        header = {
+            "manifest_format": MANIFEST_FORMAT,
+            "generated": timestamp,
+            "pipeline_version": self.pipeline_version,
+            "current_run": run,
+            "documents": len(current),
+            "state_digest": self.state_digest(current),
+            "history": self.log_path.name,
+            **(extra or {})
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2, ensure_ascii=False)
+
+        return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    manifest = ProcessingManifest(sys.argv[1] if len(sys.argv) > 1 else ".")
+    run = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    for info in manifest.runs():
+        print(f"🔁 Run {info['run']} ({info['timestamp']}): "
+              f"+{info['added']} ~{info['changed']} -{info['removed']}")
+
+    state = manifest.state_at(run)
+    print(f"📋 Documents at run {run if run is not None else 'latest'}: {len(state)}")
+    for content_hash, entry in sorted(state.items(), key=lambda item: item[1]["filenames"]):
+        print(f"  • {content_hash[:12]} {', '.join(entry['filenames'])} [{entry['category']}]")
@@ -96,6 +96,7 @@ def main():
     print(f"📊 Metadata: {output_base}/metadata/")
     print(f"🔗 Cross-references: {output_base}/cross_references/")
     print(f"📋 Summary: {output_base}/processing_summary.json")
+    print(f"📄 Per-file details: {output_base}/processing_details.jsonl")
 
 if __name__ == "__main__":
     main()